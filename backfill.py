@@ -0,0 +1,351 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+from urllib.parse import urlsplit
+
+from crawler import (
+    ANNOUNCEMENT_SEQUENCE, DB_BATCH_SIZE, create_table_if_not_exists, get_db_connection,
+    insert_exchange_rates_batch, resolve_currencies, select_currency_value,
+)
+from db_pool import release_connection
+from http_fetcher import HTTP_TIMEOUT, RATE_FORM_URL, fetch_rate_page, thread_session
+from metrics import log
+from page_archive import archive_page
+from rate_parser import ALL_CURRENCIES, build_rate_batch, parse_rate_page
+from rate_records import RateBatch
+from resilience import FETCH_RETRY_BASE_SEC, FETCH_RETRY_MAX_SEC, backoff_delay
+
+# 동시 조회 수와 초당 요청 수 (은행 사이트 부하를 고려한 기본값)
+BACKFILL_WORKERS = int(os.environ.get('BACKFILL_WORKERS', '4'))
+BACKFILL_RATE_PER_SEC = float(os.environ.get('BACKFILL_RATE_PER_SEC', '2'))
+# 진행 상황 체크포인트 저장 위치
+BACKFILL_CHECKPOINT_DIR = os.environ.get('BACKFILL_CHECKPOINT_DIR', '/tmp')
+# 조회 폼 요청을 보내는 호스트 (요청 간격 제한 단위)
+RATE_FORM_HOST = urlsplit(RATE_FORM_URL).netloc
+
+
+class RateLimiter:
+    """호스트별로 초당 요청 수를 제한하는 스레드 안전 간격 제한기"""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        # 호스트 -> 다음 요청 가능 시각
+        self._next: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str = ""):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_for = self._next.get(host, 0.0) - now
+            self._next[host] = max(now, self._next.get(host, 0.0)) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+
+class Checkpoint:
+    """DB 저장까지 끝난 조회일을 기록하여 중단된 백필을 이어서 실행"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.completed: Set[str] = set()
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self.completed = set(json.load(f).get("completed_dates", []))
+            except (OSError, ValueError) as e:
+                print(f"체크포인트 읽기 실패, 처음부터 진행합니다: {e}")
+
+    def is_done(self, day: date) -> bool:
+        return day.isoformat() in self.completed
+
+    def mark_done(self, days: List[date]):
+        if not days:
+            return
+        self.completed.update(day.isoformat() for day in days)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"completed_dates": sorted(self.completed), "updated_at": datetime.now().isoformat()}, f)
+        os.replace(tmp_path, self.path)
+
+
+def checkpoint_path(start_date: date, end_date: date, currencies: Union[str, Set[str]],
+                    announcement_type: str) -> str:
+    """백필 조건별 체크포인트 파일 경로"""
+    currency_key = currencies if isinstance(currencies, str) else ','.join(sorted(currencies))
+    key = f"{start_date}:{end_date}:{currency_key}:{announcement_type}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(BACKFILL_CHECKPOINT_DIR, f"backfill_{digest}.json")
+
+
+def iter_dates(start_date: date, end_date: date) -> Iterator[date]:
+    day = start_date
+    while day <= end_date:
+        yield day
+        day += timedelta(days=1)
+
+
+class FetchJob(NamedTuple):
+    """조회 작업 하나 (통화코드 집합 또는 all을 한 페이지로 조회, 조회일, 고시 구분/회차)"""
+    currencies: Union[str, FrozenSet[str]]
+    base_date: date
+    announcement_type: str = "FIRST"
+    sequence: Optional[int] = None
+
+    def label(self) -> str:
+        currency = self.currencies if self.currencies == ALL_CURRENCIES else ','.join(sorted(self.currencies))
+        announcement = f"{self.announcement_type}:{self.sequence}" if self.sequence else self.announcement_type
+        return f"{currency}/{self.base_date.isoformat()}/{announcement}"
+
+
+def fetch_job(job: FetchJob, limiter: RateLimiter, timeout: float = HTTP_TIMEOUT) -> Optional[str]:
+    """작업 하나의 환율 페이지를 조회하고 원본을 보관 (조회 실패 시 None)"""
+    limiter.acquire(RATE_FORM_HOST)
+    html = fetch_rate_page(select_currency_value(job.currencies), job.announcement_type,
+                           inquiry_date=job.base_date, sequence=job.sequence, session=thread_session(),
+                           timeout=timeout)
+    if html:
+        try:
+            archive_page(html, "http", job.currencies, job.announcement_type, job.sequence, job.base_date)
+        except Exception as e:
+            print(f"{job.label()} 원본 페이지 보관 실패: {e}")
+    return html
+
+
+def parse_job(job: FetchJob, html: str, announcement_sequence: int = ANNOUNCEMENT_SEQUENCE) -> Optional[RateBatch]:
+    """조회한 페이지를 저장용 데이터로 변환 (파싱 실패 시 None)"""
+    # 한 작업의 파싱 오류가 전체 실행을 멈추지 않도록 해당 작업만 실패 처리
+    try:
+        page = parse_rate_page(html, job.currencies)
+        # 헤더에 기준일이 없어도 오늘 날짜가 아닌 조회일로 저장 (당일 실시간 행을 덮어쓰지 않음)
+        return build_rate_batch(page, job.sequence or announcement_sequence, job.announcement_type,
+                                fallback_date=job.base_date)
+    except Exception as e:
+        print(f"{job.label()} 환율 페이지 처리 실패: {e}")
+        return None
+
+
+def execute_jobs(connection, jobs: Iterable[FetchJob], workers: int = BACKFILL_WORKERS,
+                 rate_per_sec: float = BACKFILL_RATE_PER_SEC, batch_size: int = DB_BATCH_SIZE,
+                 announcement_sequence: int = ANNOUNCEMENT_SEQUENCE, max_retries: int = 0,
+                 retry_base_sec: float = FETCH_RETRY_BASE_SEC, retry_max_sec: float = FETCH_RETRY_MAX_SEC,
+                 deadline_sec: float = 0.0,
+                 on_saved: Optional[Callable[[List[FetchJob]], None]] = None) -> Dict[str, Any]:
+    """조회 작업을 제한된 동시성으로 조회·파싱하고, 완료되는 대로 모아 batch_size마다 배치 upsert로 저장
+
+    워커 스레드는 조회(실패 시 백오프 재시도)만 맡고, 파싱과 DB 저장은 호출 스레드가 완료 순서대로 한다
+    (파싱은 GIL을 잡고 있으므로 워커에서 나눠 하면 조회 스레드와 경합하여 오히려 느려짐).
+    진행 중인 작업을 워커 수의 2배로 제한하여 작업 수와 관계없이 메모리가 일정하다.
+    deadline_sec(0이면 없음)가 지나면 남은 작업은 시작하지 않고 expired로 집계한다.
+    저장이 끝난 작업 목록은 on_saved로 알린다 (체크포인트 기록 등).
+    """
+    started = time.perf_counter()
+    deadline = time.monotonic() + deadline_sec if deadline_sec > 0 else 0.0
+    workers = max(workers, 1)
+    limiter = RateLimiter(rate_per_sec)
+    lock = threading.Lock()
+    stats: Dict[str, Any] = {
+        "jobs": 0,
+        "fetched": 0,
+        "retries": 0,
+        "expired": 0,
+        "failed_jobs": [],
+        "rows": 0,
+        "batches": 0,
+        "aborted": False,
+    }
+
+    def remaining() -> float:
+        return deadline - time.monotonic() if deadline else float('inf')
+
+    def run_job(job: FetchJob) -> Tuple[FetchJob, Optional[str], bool]:
+        """작업 하나를 재시도하며 조회 (반환: 작업, 페이지 HTML, 기한 초과 여부)"""
+        for attempt in range(max_retries + 1):
+            if remaining() <= 0:
+                return job, None, True
+            html = fetch_job(job, limiter, min(HTTP_TIMEOUT, remaining()))
+            if html:
+                return job, html, False
+            if attempt < max_retries:
+                delay = backoff_delay(attempt, retry_base_sec, retry_max_sec)
+                if delay >= remaining():
+                    return job, None, True
+                with lock:
+                    stats["retries"] += 1
+                time.sleep(delay)
+        return job, None, False
+
+    buffer = RateBatch()
+    buffer_jobs: List[FetchJob] = []
+
+    def flush() -> bool:
+        """버퍼를 배치 upsert로 저장하고 저장된 작업을 알림"""
+        if buffer:
+            results = insert_exchange_rates_batch(connection, buffer, batch_size)
+            if results is None:
+                return False
+            stats["rows"] += len(buffer)
+            stats["batches"] += len(results)
+        if on_saved and buffer_jobs:
+            on_saved(list(buffer_jobs))
+        buffer.clear()
+        buffer_jobs.clear()
+        return True
+
+    pending_jobs = iter(jobs)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='crawl') as pool:
+        in_flight = set()
+
+        def submit_next() -> bool:
+            if remaining() <= 0:
+                return False
+            job = next(pending_jobs, None)
+            if job is None:
+                return False
+            stats["jobs"] += 1
+            in_flight.add(pool.submit(run_job, job))
+            return True
+
+        while len(in_flight) < workers * 2 and submit_next():
+            pass
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                job, html, expired = future.result()
+                entries = parse_job(job, html, announcement_sequence) if html else None
+                if entries is not None:
+                    stats["fetched"] += 1
+                    buffer.extend(entries)
+                    buffer_jobs.append(job)
+                elif expired:
+                    stats["expired"] += 1
+                else:
+                    stats["failed_jobs"].append(job)
+                submit_next()
+
+            if len(buffer) >= batch_size and not flush():
+                stats["aborted"] = True
+                pool.shutdown(wait=False, cancel_futures=True)
+                break
+            log(f"  진행: 작업 {stats['jobs']}건 중 조회 {stats['fetched']}건, 저장 {stats['rows']}건")
+
+    if stats["aborted"] or not flush():
+        stats["aborted"] = True
+        print("DB 저장 실패로 작업을 중단합니다 (다시 실행하면 이어서 진행)")
+    elif deadline:
+        # 기한 초과로 꺼내지 못한 작업도 expired로 집계
+        leftover = sum(1 for _ in pending_jobs)
+        stats["jobs"] += leftover
+        stats["expired"] += leftover
+
+    stats["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def run_backfill(start_date: date, end_date: date, currencies: Union[str, Set[str]],
+                 announcement_type: str = "FIRST", announcement_sequence: int = ANNOUNCEMENT_SEQUENCE,
+                 workers: int = BACKFILL_WORKERS, rate_per_sec: float = BACKFILL_RATE_PER_SEC,
+                 batch_size: int = DB_BATCH_SIZE) -> Dict[str, Any]:
+    """기간 내 일자별 환율을 제한된 동시성으로 조회하여 배치 upsert로 저장"""
+    started = time.perf_counter()
+    checkpoint = Checkpoint(checkpoint_path(start_date, end_date, currencies, announcement_type))
+    days = [day for day in iter_dates(start_date, end_date) if not checkpoint.is_done(day)]
+    skipped = (end_date - start_date).days + 1 - len(days)
+    summary: Dict[str, Any] = {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "dates": len(days) + skipped,
+        "skipped": skipped,
+        "fetched": 0,
+        "failed_dates": [],
+        "rows": 0,
+        "batches": 0,
+    }
+    log(f"백필 시작: {start_date} ~ {end_date}, 대상 {len(days)}일 (완료분 {skipped}일 건너뜀)")
+    if not days:
+        return summary
+
+    connection = get_db_connection()
+    if not connection:
+        print("DB 연결 실패로 백필을 중단합니다")
+        summary["failed_dates"] = [day.isoformat() for day in days]
+        return summary
+
+    job_currencies = currencies if currencies == ALL_CURRENCIES else frozenset(currencies)
+    try:
+        if not create_table_if_not_exists(connection):
+            summary["failed_dates"] = [day.isoformat() for day in days]
+            return summary
+        result = execute_jobs(
+            connection, (FetchJob(job_currencies, day, announcement_type) for day in days),
+            workers, rate_per_sec, batch_size, announcement_sequence,
+            on_saved=lambda saved: checkpoint.mark_done([job.base_date for job in saved]),
+        )
+    finally:
+        release_connection(connection)
+
+    summary["fetched"] = result["fetched"]
+    summary["failed_dates"] = sorted(job.base_date.isoformat() for job in result["failed_jobs"])
+    summary["rows"] = result["rows"]
+    summary["batches"] = result["batches"]
+    elapsed = time.perf_counter() - started
+    summary["elapsed_sec"] = round(elapsed, 3)
+    summary["rows_per_sec"] = round(summary["rows"] / elapsed, 1) if elapsed else 0.0
+    log(f"백필 완료: {summary}")
+    return summary
+
+
+def parse_date(value: Union[str, date]) -> date:
+    """YYYY-MM-DD 문자열(또는 date)을 date로 변환"""
+    return value if isinstance(value, date) else datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def handler(event=None, context=None):
+    """Lambda 백필 진입점 - event: start_date, end_date, currencies, announcement_type, workers, rate_per_sec"""
+    event = event or {}
+    summary = run_backfill(
+        parse_date(event["start_date"]),
+        parse_date(event.get("end_date") or event["start_date"]),
+        resolve_currencies(event.get("currencies")),
+        announcement_type=event.get("announcement_type", "FIRST"),
+        announcement_sequence=int(event.get("announcement_sequence", ANNOUNCEMENT_SEQUENCE)),
+        workers=int(event.get("workers", BACKFILL_WORKERS)),
+        rate_per_sec=float(event.get("rate_per_sec", BACKFILL_RATE_PER_SEC)),
+    )
+    return {
+        "statusCode": 200 if not summary["failed_dates"] else 207,
+        "message": "백필 완료" if not summary["failed_dates"] else "백필 일부 실패",
+        **summary,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기간별 환율 백필")
+    parser.add_argument('--start', required=True, help="시작일 (YYYY-MM-DD)")
+    parser.add_argument('--end', help="종료일 (YYYY-MM-DD, 기본값: 시작일)")
+    parser.add_argument('--currencies', default='all', help="쉼표 구분 통화코드 또는 all")
+    parser.add_argument('--type', default='FIRST', choices=['FIRST', 'LAST'], help="고시 구분")
+    parser.add_argument('--sequence', type=int, default=ANNOUNCEMENT_SEQUENCE, help="저장할 고시회차")
+    parser.add_argument('--workers', type=int, default=BACKFILL_WORKERS, help="동시 조회 수")
+    parser.add_argument('--rate', type=float, default=BACKFILL_RATE_PER_SEC, help="초당 최대 요청 수")
+    parser.add_argument('--batch-size', type=int, default=DB_BATCH_SIZE, help="upsert 배치 크기")
+    args = parser.parse_args()
+
+    start_date = parse_date(args.start)
+    summary = run_backfill(
+        start_date, parse_date(args.end) if args.end else start_date,
+        resolve_currencies(args.currencies), args.type, args.sequence,
+        args.workers, args.rate, args.batch_size,
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Selenium 경로 브라우저 프로필 벤치마크
+
+프로필마다 별도 프로세스에서 fetch_page_source_selenium()을 N회 실행하고
+요청 수/전송 바이트(성능 로그), 단계별 소요 시간 중앙값, Chrome 프로세스 트리 RSS를 비교한다.
+- full: 기존 프로필 (모든 리소스, pageLoadStrategy=normal)
+- lean: CSS/이미지/폰트/미디어/분석 스크립트 차단, pageLoadStrategy=eager
+- lean-direct: lean + 메인 페이지 대신 bankIframe 문서를 바로 열기
+- low-memory: lean-direct + 저메모리 프로필 (작은 창, V8 힙 상한, 백그라운드 기능/캐시 끄기, 조회 영역만 가져오기)
+
+기본값은 로컬 대역 서버(stub_site, --asset-kb 크기의 CSS/JS 제공)이며, --live는 실제 kebhana.com에서 측정한다.
+Chrome/chromedriver 경로는 CHROME_BINARY / CHROMEDRIVER_PATH 환경변수로 지정.
+
+    python benchmarks/bench_browser.py [--runs 5] [--profiles full,lean,lean-direct,low-memory] [--asset-kb 200] [--live] [--json]
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    "full": {"BROWSER_LEAN": "0", "SELENIUM_DIRECT_IFRAME": "0"},
+    "lean": {"BROWSER_LEAN": "1", "SELENIUM_DIRECT_IFRAME": "0"},
+    "lean-direct": {"BROWSER_LEAN": "1", "SELENIUM_DIRECT_IFRAME": "1"},
+    "low-memory": {"BROWSER_LEAN": "1", "SELENIUM_DIRECT_IFRAME": "1", "BROWSER_LOW_MEMORY": "1"},
+}
+PHASES = ("driver_start", "page_load", "iframe_switch", "currency_select")
+
+
+def run_worker(runs: int) -> Dict[str, Any]:
+    """현재 프로세스 환경변수의 프로필로 runs회 조회하여 실행별 지표 수집"""
+    import browser
+    import crawler
+    from metrics import start_run
+
+    samples: List[Dict[str, float]] = []
+    for _ in range(runs):
+        run = start_run()
+        started = time.perf_counter()
+        html = crawler.fetch_page_source_selenium(crawler.ALL_CURRENCIES)
+        sample = {name: ms for name, ms in run.summary()["durations_ms"].items()}
+        sample["total"] = (time.perf_counter() - started) * 1000
+        sample.update({name: float(value) for name, value in run.counts.items()})
+        sample["ok"] = 1.0 if html and 'tblBasic' in html else 0.0
+        sample["chrome_rss_mb"] = browser.driver_rss_mb(browser._driver) if browser._driver else 0.0
+        samples.append(sample)
+    browser.quit_driver()
+    return {
+        "samples": samples,
+        "children_peak_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+def summarize(name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    samples = result["samples"]
+    # 첫 실행은 Chrome 시작을 포함하므로 웜 실행과 분리
+    warm = samples[1:] or samples
+
+    def median(key: str, rows=warm) -> float:
+        values = [s.get(key, 0.0) for s in rows]
+        return round(statistics.median(values), 1) if values else 0.0
+
+    return {
+        "profile": name,
+        "runs": len(samples),
+        "ok": int(sum(s["ok"] for s in samples)),
+        "cold_total_ms": round(samples[0]["total"], 1),
+        "warm": {key: median(key) for key in (*PHASES, "total")},
+        "requests": median("page_requests"),
+        "blocked": median("page_blocked"),
+        "kb": round(median("page_bytes") / 1024, 1),
+        "chrome_rss_mb": round(max(s["chrome_rss_mb"] for s in samples), 1),
+        "children_peak_rss_mb": result["children_peak_rss_mb"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Selenium 경로 브라우저 프로필 벤치마크")
+    parser.add_argument('--runs', type=int, default=5, help="프로필별 조회 횟수 (첫 회는 콜드)")
+    parser.add_argument('--profiles', default='full,lean,lean-direct,low-memory', help="측정할 프로필 (쉼표 구분)")
+    parser.add_argument('--asset-kb', type=float, default=200.0, help="대역 서버 CSS/JS 응답 크기(KB)")
+    parser.add_argument('--site-latency-ms', type=float, default=0.0, help="대역 서버 응답 지연(ms)")
+    parser.add_argument('--live', action='store_true', help="대역 서버 대신 실제 kebhana.com에서 측정")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.runs)))
+        return
+
+    site = None
+    env = dict(os.environ, BROWSER_MEASURE_TRAFFIC='1', VERBOSE='0', EMIT_METRICS='0')
+    if not args.live:
+        from stub_site import StubSite
+        site = StubSite(latency_ms=args.site_latency_ms, asset_kb=args.asset_kb).start()
+        env.update(site.env())
+
+    results = []
+    try:
+        for name in (p.strip() for p in args.profiles.split(',') if p.strip()):
+            # 프로필 설정은 import 시점에 읽으므로 프로필마다 새 프로세스에서 측정
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--worker', '--runs', str(args.runs)],
+                env={**env, **PROFILES[name]}, capture_output=True, text=True, check=True,
+            )
+            results.append(summarize(name, json.loads(proc.stdout.strip().splitlines()[-1])))
+    finally:
+        if site:
+            site.stop()
+
+    if args.json:
+        print(json.dumps({"results": results, "site": site.stats if site else None}, ensure_ascii=False, indent=2))
+        return
+    print(f"{'profile':<13}{'ok':>4}{'reqs':>6}{'blocked':>9}{'KB':>9}{'cold ms':>9}"
+          + ''.join(f"{name:>17}" for name in (*PHASES, "total")) + f"{'chrome MB':>11}")
+    for r in results:
+        print(f"{r['profile']:<13}{r['ok']:>4}{r['requests']:>6.0f}{r['blocked']:>9.0f}{r['kb']:>9.1f}"
+              f"{r['cold_total_ms']:>9.0f}" + ''.join(f"{r['warm'][name]:>17.1f}" for name in (*PHASES, "total"))
+              + f"{r['chrome_rss_mb']:>11.1f}")
+    if site:
+        print(f"\nstub site: {site.stats}")
+
+
+if __name__ == '__main__':
+    main()
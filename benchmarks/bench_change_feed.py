@@ -0,0 +1,107 @@
+"""환율 변경 피드 벤치마크
+
+합성 환율(통화 49개 × --announcements 회차)을 회차별 배치로 compute_changes()에 넣어 변경 이벤트를 만들고,
+ChangeFeed.append()로 임시 피드에 추가하는 처리량(fsync 켬/끔)과 임의 offset부터 --limit건을 읽는 지연을 측정한다.
+
+    python benchmarks/bench_change_feed.py [--announcements 2000] [--segment-records 10000] [--limit 100] [--json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def announcement_batches(announcements: int):
+    """회차마다 기준율이 조금씩 움직이는 통화 49개 배치"""
+    from rate_records import RateBatch
+
+    codes = [f"C{i:02d}" for i in range(49)]
+    rng = random.Random(7)
+    base = {code: 100.0 + i * 37.5 for i, code in enumerate(codes)}
+    today = date.today()
+    for sequence in range(1, announcements + 1):
+        now = datetime.now().replace(microsecond=0)
+        batch = RateBatch()
+        for code in codes:
+            # 회차의 절반 정도만 값이 바뀜
+            if rng.random() < 0.5:
+                base[code] = round(base[code] * (1 + rng.uniform(-0.002, 0.002)), 2)
+            rate = base[code]
+            batch.append((today, code, sequence, "SEQUENCE", round(rate * 1.0175, 2), 1.75, round(rate * 0.9825, 2),
+                          1.75, round(rate * 1.01, 2), round(rate * 0.99, 2), round(rate * 0.988, 2), rate, 3.5, 0.85,
+                          now, now))
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="환율 변경 피드 벤치마크")
+    parser.add_argument('--announcements', type=int, default=2000, help="회차 수 (회차당 통화 49개)")
+    parser.add_argument('--segment-records', type=int, default=10000, help="세그먼트 파일당 이벤트 수")
+    parser.add_argument('--limit', type=int, default=100, help="offset부터 읽을 이벤트 수")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    import change_feed
+    from change_feed import ChangeFeed, compute_changes
+
+    batches = list(announcement_batches(args.announcements))
+    results = []
+    for fsync in (False, True):
+        change_feed.CHANGE_FEED_FSYNC = fsync
+        with tempfile.TemporaryDirectory() as feed_dir:
+            feed = ChangeFeed(feed_dir, args.segment_records)
+            previous = {}
+            diff_sec = append_sec = 0.0
+            events = 0
+            for batch in batches:
+                started = time.perf_counter()
+                batch_events = compute_changes(previous, batch)
+                diff_sec += time.perf_counter() - started
+                previous.update((record.currency_code, record) for record in batch.records())
+                started = time.perf_counter()
+                feed.append(batch_events)
+                append_sec += time.perf_counter() - started
+                events += len(batch_events)
+
+            rng = random.Random(11)
+            read_ms = []
+            for _ in range(50):
+                offset = rng.randrange(max(events - args.limit, 1))
+                started = time.perf_counter()
+                read = list(feed.read(offset, args.limit))
+                read_ms.append((time.perf_counter() - started) * 1000)
+                assert read[0]["offset"] == offset
+            size = sum(os.path.getsize(os.path.join(feed.segment_dir, name)) for name in os.listdir(feed.segment_dir))
+            results.append({
+                "fsync": fsync,
+                "events": events,
+                "diff_events_per_sec": round(events / diff_sec, 1) if diff_sec else 0.0,
+                "append_events_per_sec": round(events / append_sec, 1) if append_sec else 0.0,
+                "append_ms_per_batch": round(append_sec * 1000 / len(batches), 3),
+                "read_p50_ms": round(statistics.median(read_ms), 3),
+                "read_max_ms": round(max(read_ms), 3),
+                "segments": len(os.listdir(feed.segment_dir)),
+                "mb": round(size / 1024 / 1024, 2),
+            })
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    print(f"{'fsync':>6}{'events':>9}{'diff ev/s':>12}{'append ev/s':>13}{'ms/batch':>10}"
+          f"{'read p50 ms':>13}{'read max ms':>13}{'segments':>10}{'MB':>7}")
+    for r in results:
+        print(f"{str(r['fsync']):>6}{r['events']:>9}{r['diff_events_per_sec']:>12.0f}{r['append_events_per_sec']:>13.0f}"
+              f"{r['append_ms_per_batch']:>10.3f}{r['read_p50_ms']:>13.3f}{r['read_max_ms']:>13.3f}"
+              f"{r['segments']:>10}{r['mb']:>7}")
+
+
+if __name__ == '__main__':
+    main()
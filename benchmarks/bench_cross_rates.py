@@ -0,0 +1,111 @@
+"""교차환율 계산 벤치마크
+
+합성 환율 배치(기준일 × 통화 × 고시회차)로 cross_rates의 벡터화 계산과
+행마다 Python dict를 거치는 기존 방식(통화쌍 이중 루프)의 소요 시간을 비교하고 결과가 같은지 확인한다.
+
+    python benchmarks/bench_cross_rates.py [--currencies 49] [--days 1,30,365] [--sequences 3] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cross_rates import CURRENCY_UNITS, HOME_CURRENCY, compute_cross_rate_stack  # noqa: E402
+from rate_records import RateBatch  # noqa: E402
+
+
+def synthetic_batch(currencies: int, days: int, sequences: int, seed: int = 7) -> RateBatch:
+    rng = random.Random(seed)
+    codes = ["JPY", "IDR", "VND"] + [f"C{i:02d}" for i in range(currencies - 3)]
+    batch = RateBatch()
+    start = date(2026, 1, 1)
+    for d in range(days):
+        day = start + timedelta(days=d)
+        for sequence in range(1, sequences + 1):
+            announced = datetime(day.year, day.month, day.day, 9) + timedelta(minutes=30 * sequence)
+            for code in codes:
+                base = rng.uniform(0.5, 2000)
+                # 일부 통화는 현찰 고시 없음(0)
+                cash = 0.0 if code.endswith("7") else base
+                batch.append((day, code, sequence, "SEQUENCE", cash * 1.0175, 1.75, cash * 0.9825, 1.75,
+                              base * 1.01, base * 0.99, base * 1.012, base, 3.5, 1.0, announced, announced))
+    return batch
+
+
+def naive_cross_rates(batch: RateBatch) -> Dict[date, Dict[str, Dict[str, Dict[str, float]]]]:
+    """기존 방식: 행 dict로 기준일별 마지막 회차를 고른 뒤 통화쌍마다 나눗셈"""
+    latest: Dict[date, Dict[str, dict]] = {}
+    for record in batch.records():
+        row = record._asdict()
+        by_code = latest.setdefault(row["base_date"], {})
+        current = by_code.get(row["currency_code"])
+        if current is None or row["announcement_sequence"] > current["announcement_sequence"]:
+            by_code[row["currency_code"]] = row
+
+    def per_unit(row, field):
+        value = row[field] / CURRENCY_UNITS.get(row["currency_code"], 1)
+        return value if value else float('nan')
+
+    result = {}
+    for day, by_code in latest.items():
+        krw = {code: {f: per_unit(row, f) for f in ("base_rate", "cash_buy", "cash_sell", "remit_send",
+                                                    "remit_receive")}
+               for code, row in by_code.items()}
+        krw[HOME_CURRENCY] = {f: 1.0 for f in ("base_rate", "cash_buy", "cash_sell", "remit_send", "remit_receive")}
+        matrices: Dict[str, Dict[str, Dict[str, float]]] = {"mid": {}, "cash_bid": {}, "cash_ask": {}}
+        for i, a in krw.items():
+            for name in matrices:
+                matrices[name][i] = {}
+            for j, b in krw.items():
+                matrices["mid"][i][j] = a["base_rate"] / b["base_rate"]
+                matrices["cash_bid"][i][j] = a["cash_sell"] / b["cash_buy"]
+                matrices["cash_ask"][i][j] = a["cash_buy"] / b["cash_sell"]
+        result[day] = matrices
+    return result
+
+
+def timed(fn: Callable, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="교차환율 계산 벤치마크")
+    parser.add_argument('--currencies', type=int, default=49, help="통화 수 (원화 제외)")
+    parser.add_argument('--days', default='1,30,365', help="기준일 수 목록 (쉼표 구분)")
+    parser.add_argument('--sequences', type=int, default=3, help="기준일별 고시회차 수")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'days':>6}{'rows':>10}{'naive ms':>12}{'numpy ms':>12}{'speedup':>10}  match")
+    for days in (int(d) for d in args.days.split(',') if d.strip()):
+        batch = synthetic_batch(args.currencies, days, args.sequences)
+        stack = compute_cross_rate_stack(batch)
+        naive = naive_cross_rates(batch)
+
+        # 결과 일치 확인 (NaN 포함)
+        match = True
+        for d, day in enumerate(stack.dates.tolist()):
+            for name in ("mid", "cash_bid", "cash_ask"):
+                expected = np.array([[naive[day][name][i][j] for j in stack.codes] for i in stack.codes])
+                match &= bool(np.allclose(getattr(stack, name)[d], expected, equal_nan=True))
+
+        naive_ms = statistics.median(timed(lambda: naive_cross_rates(batch), args.repeat))
+        numpy_ms = statistics.median(timed(lambda: compute_cross_rate_stack(batch), args.repeat))
+        print(f"{days:>6}{len(batch):>10}{naive_ms:>12.2f}{numpy_ms:>12.2f}{naive_ms / numpy_ms:>9.1f}x  {match}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""오프라인 end-to-end 벤치마크
+
+로컬 대역 서버(stub_site)와 프로세스 내 가짜 MySQL(fake_db)로 kebhana.com/RDS 없이 handler()를 N회 순차/동시 실행하고
+단계별 p50/p95/p99 지연, 최대 RSS, 초당 저장 행 수를 출력한다.
+--mysql을 주면 가짜 DB 대신 DB_* 환경변수가 가리키는 로컬 MySQL 호환 서버에 저장한다.
+
+    python benchmarks/bench_e2e.py [--runs 50] [--concurrency 8] [--currencies all]
+                                   [--site-latency-ms 0] [--db-latency-ms 0] [--mysql]
+                                   [--detect-changes] [--json]
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_db import FakeDatabase, install  # noqa: E402
+from stub_site import StubSite  # noqa: E402
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """nearest-rank 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def run_once(crawler, event: Dict[str, Any]) -> Dict[str, Any]:
+    """handler 1회 실행 후 반환값의 구간별 소요 시간(초)과 저장 행 수 수집"""
+    start = time.perf_counter()
+    result = crawler.handler(event)
+    phases = {name: ms / 1000 for name, ms in result["metrics"]["durations_ms"].items()}
+    phases["total"] = time.perf_counter() - start
+    return {"phases": phases, "rows": result.get("count", 0), "status": result.get("statusCode")}
+
+
+def run_series(crawler, event: Dict[str, Any], runs: int, concurrency: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    if concurrency <= 1:
+        results = [run_once(crawler, event) for _ in range(runs)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda _: run_once(crawler, event), range(runs)))
+    wall = time.perf_counter() - start
+
+    phase_names = sorted({name for r in results for name in r["phases"]})
+    phases = {}
+    for name in phase_names:
+        values = [r["phases"][name] * 1000 for r in results if name in r["phases"]]
+        phases[name] = {
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+        }
+    rows = sum(r["rows"] for r in results)
+    return {
+        "runs": runs,
+        "concurrency": concurrency,
+        "failures": sum(1 for r in results if r["status"] != 200),
+        "wall_sec": round(wall, 3),
+        "rows": rows,
+        "rows_per_sec": round(rows / wall, 1) if wall else 0.0,
+        "phases": phases,
+    }
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """프로세스/자식 프로세스(Chrome 등) 최대 RSS(MB)"""
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    for series in report["series"]:
+        print(f"\n[{series['name']}] runs={series['runs']} concurrency={series['concurrency']} "
+              f"failures={series['failures']} wall={series['wall_sec']}s "
+              f"rows={series['rows']} rows/s={series['rows_per_sec']}")
+        print(f"  {'phase':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, stats in series["phases"].items():
+            print(f"  {name:<12}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+    print(f"\npeak RSS: self {report['peak_rss_mb']['self']} MB, children {report['peak_rss_mb']['children']} MB")
+    if report.get("db"):
+        print(f"fake DB: {report['db']}")
+    print(f"DB pool: {report['db_pool']}")
+    print(f"stub site: {report['site']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 end-to-end 벤치마크")
+    parser.add_argument('--runs', type=int, default=50, help="시리즈별 handler 실행 횟수")
+    parser.add_argument('--concurrency', type=int, default=8, help="동시 실행 시리즈의 워커 수")
+    parser.add_argument('--currencies', default='all', help="조회 통화 (쉼표 구분 또는 all)")
+    parser.add_argument('--site-latency-ms', type=float, default=0.0, help="대역 서버 응답 지연(ms)")
+    parser.add_argument('--db-latency-ms', type=float, default=0.0, help="가짜 DB 왕복 지연(ms)")
+    parser.add_argument('--mysql', action='store_true', help="DB_* 환경변수의 로컬 MySQL 호환 서버 사용")
+    parser.add_argument('--detect-changes', action='store_true',
+                        help="변경 감지를 적용 (기본값: 매 실행 강제 파싱/저장)")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    site = StubSite(latency_ms=args.site_latency_ms).start()
+    os.environ.update(site.env())
+    os.environ.setdefault('FETCH_MODE', 'http')
+    # crawler의 상세 출력과 EMF 로그는 측정에서 제외
+    os.environ['VERBOSE'] = '0'
+    os.environ['EMIT_METRICS'] = '0'
+
+    db = None
+    if not args.mysql:
+        for key, value in (("DB_HOST", "127.0.0.1"), ("DB_USERNAME", "bench"),
+                           ("DB_PASSWORD", "bench"), ("DB_NAME", "bench")):
+            os.environ[key] = value
+        db = install(FakeDatabase(latency_ms=args.db_latency_ms))
+
+    # 환경변수를 읽도록 설정 후 import
+    import crawler
+
+    event = {"currencies": args.currencies, "force": not args.detect_changes}
+    series = []
+    run_once(crawler, event)  # 워밍업
+    for name, concurrency in (("sequential", 1), ("concurrent", args.concurrency)):
+        series.append({"name": name, **run_series(crawler, event, args.runs, concurrency)})
+    site.stop()
+
+    report = {
+        "series": series,
+        "peak_rss_mb": peak_rss_mb(),
+        "db": db.stats if db else None,
+        "db_pool": crawler.get_pool_stats(),
+        "site": site.stats,
+    }
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""exchange_rates 내보내기 벤치마크
+
+가짜 MySQL(fake_db)에 합성 환율 이력 N행을 지연 생성하는 SELECT 핸들러를 등록하고,
+export.py의 서버 측 커서 스트리밍(Parquet / gzip CSV)과 기존 방식(버퍼 커서 fetchall 후 기록)의
+초당 행 수와 최대 RSS를 모드별 별도 프로세스에서 측정한다.
+
+    python benchmarks/bench_export.py [--rows 2000000] [--chunk-size 50000]
+                                      [--modes parquet,csv,buffered-csv] [--json]
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+CURRENCY_CODES = ("USD", "JPY", "EUR", "CNY", "GBP", "CAD", "AUD", "CHF", "HKD", "SGD",
+                  "THB", "VND", "NZD", "SEK", "DKK", "NOK", "SAR", "KWD", "BHD", "AED")
+SEQUENCES_PER_DAY = 10
+
+
+def synthetic_rows(total: int) -> Iterator[tuple]:
+    """(기준일, 통화, 고시회차) 순으로 정렬된 합성 행을 pymysql처럼 DECIMAL은 Decimal로 생성"""
+    values = {
+        code: tuple(Decimal(f"{1000 + i * 37.5 + j:.4f}") for j in range(10))
+        for i, code in enumerate(CURRENCY_CODES)
+    }
+    day = date(2000, 1, 1)
+    produced = 0
+    while True:
+        for sequence in range(1, SEQUENCES_PER_DAY + 1):
+            announced = datetime(day.year, day.month, day.day, 9) + timedelta(minutes=30 * sequence)
+            for code in CURRENCY_CODES:
+                if produced >= total:
+                    return
+                yield (day, code, sequence, "SEQUENCE", *values[code], announced, announced)
+                produced += 1
+        day += timedelta(days=1)
+
+
+def peak_rss_mb() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def run_worker(mode: str, rows: int, chunk_size: int) -> Dict[str, Any]:
+    """한 모드를 현재 프로세스에서 실행하고 처리량과 최대 RSS 반환"""
+    from fake_db import FakeDatabase
+
+    import export
+
+    db = FakeDatabase()
+    db.select_handlers["exchange_rates"] = lambda _db, sql, params: synthetic_rows(rows)
+    connection = db.connect()
+    baseline = peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rates.parquet" if mode == "parquet" else "rates.csv.gz")
+        started = time.perf_counter()
+        if mode == "buffered-csv":
+            # 기존 방식: 버퍼 커서로 전체 결과를 메모리에 올린 뒤 기록
+            sql, params = export.build_export_query()
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                result = cursor.fetchall()
+            with gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=6) as f:
+                writer = csv.writer(f)
+                writer.writerow(export.RATE_COLUMNS)
+                writer.writerows(result)
+            written = len(result)
+        else:
+            written = export.export_rates(connection, path, mode, chunk_size=chunk_size)["rows"]
+        elapsed = time.perf_counter() - started
+        size = os.path.getsize(path)
+
+    return {
+        "mode": mode,
+        "rows": written,
+        "elapsed_sec": round(elapsed, 3),
+        "rows_per_sec": round(written / elapsed, 1) if elapsed else 0.0,
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+        "output_mb": round(size / 1024 / 1024, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="exchange_rates 내보내기 벤치마크")
+    parser.add_argument('--rows', type=int, default=2_000_000, help="합성 행 수")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="서버 측 커서 fetch 단위")
+    parser.add_argument('--modes', default='parquet,csv,buffered-csv', help="측정할 모드 (쉼표 구분)")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.rows, args.chunk_size)))
+        return
+
+    results = []
+    for mode in (m.strip() for m in args.modes.split(',') if m.strip()):
+        # 최대 RSS는 프로세스 단위이므로 모드마다 새 프로세스에서 측정
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', mode,
+             '--rows', str(args.rows), '--chunk-size', str(args.chunk_size)],
+            capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'mode':<14}{'rows':>10}{'sec':>9}{'rows/s':>12}{'base MB':>10}{'peak MB':>10}{'out MB':>9}")
+    for r in results:
+        print(f"{r['mode']:<14}{r['rows']:>10}{r['elapsed_sec']:>9.2f}{r['rows_per_sec']:>12.0f}"
+              f"{r['baseline_rss_mb']:>10.1f}{r['peak_rss_mb']:>10.1f}{r['output_mb']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""콜드 스타트 import 비용 벤치마크
+
+새 인터프리터에서 `python -X importtime -c "import <모듈>"`을 반복 실행하여 모듈별 누적 import 시간의 중앙값과
+상위 모듈, 무거운 의존성(Selenium, bs4, pymysql, requests)이 import 시점에 로드되는지 출력한다.
+
+    python benchmarks/bench_import.py [--modules crawler,backfill] [--repeat 10] [--top 15] [--json]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 필요한 경로에서만 import되어야 하는 무거운 의존성
+HEAVY_MODULES = ('selenium', 'bs4', 'lxml', 'pymysql', 'requests')
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$')
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """-X importtime 출력을 (모듈, self us, cumulative us, 깊이) 목록으로 변환"""
+    entries = []
+    for line in stderr.splitlines():
+        m = IMPORTTIME_LINE.match(line)
+        if m:
+            depth = (len(m.group(3)) - 1) // 2
+            entries.append((m.group(4), int(m.group(1)), int(m.group(2)), depth))
+    return entries
+
+
+def measure_once(module: str) -> Dict[str, Any]:
+    """새 프로세스에서 모듈 1회 import 후 누적 시간과 로드된 무거운 의존성 수집"""
+    code = (
+        f"import {module}; import sys; "
+        f"print(','.join(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))"
+    )
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    entries = parse_importtime(proc.stderr)
+    total_us = next((cumulative for name, _, cumulative, depth in entries if name == module and depth == 0), 0)
+    return {
+        "total_us": total_us,
+        "entries": entries,
+        "heavy_loaded": [m for m in proc.stdout.strip().split(',') if m],
+    }
+
+
+def measure(module: str, repeat: int, top: int) -> Dict[str, Any]:
+    # 첫 실행은 .pyc 생성/디스크 캐시 워밍업으로 제외
+    measure_once(module)
+    runs = [measure_once(module) for _ in range(repeat)]
+    cumulative: Dict[str, List[int]] = {}
+    for run in runs:
+        for name, _, cum, _ in run["entries"]:
+            cumulative.setdefault(name, []).append(cum)
+    top_modules = sorted(
+        ((name, statistics.median(values) / 1000) for name, values in cumulative.items() if name != module),
+        key=lambda item: item[1], reverse=True,
+    )[:top]
+    totals = [run["total_us"] / 1000 for run in runs]
+    return {
+        "module": module,
+        "repeat": repeat,
+        "median_ms": round(statistics.median(totals), 2),
+        "min_ms": round(min(totals), 2),
+        "max_ms": round(max(totals), 2),
+        "heavy_loaded": runs[-1]["heavy_loaded"],
+        "top_cumulative_ms": [(name, round(ms, 2)) for name, ms in top_modules],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="콜드 스타트 import 비용 벤치마크")
+    parser.add_argument('--modules', default='crawler,backfill', help="측정할 모듈 (쉼표 구분)")
+    parser.add_argument('--repeat', type=int, default=10, help="모듈별 반복 횟수")
+    parser.add_argument('--top', type=int, default=15, help="출력할 상위 모듈 수")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    results = [measure(m.strip(), args.repeat, args.top) for m in args.modules.split(',') if m.strip()]
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    for result in results:
+        print(f"\n[{result['module']}] median {result['median_ms']} ms "
+              f"(min {result['min_ms']}, max {result['max_ms']}, n={result['repeat']})")
+        print(f"  heavy modules loaded at import: {', '.join(result['heavy_loaded']) or 'none'}")
+        print(f"  {'module':<48}{'cumulative ms':>14}")
+        for name, ms in result["top_cumulative_ms"]:
+            print(f"  {name:<48}{ms:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
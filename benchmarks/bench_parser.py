@@ -0,0 +1,69 @@
+"""환율 페이지 파서 마이크로 벤치마크
+
+녹화된 HTML로 페이지당/행당 파싱 시간을 측정한다.
+비교 기준(full_html_parser)은 기존 방식처럼 html.parser로 문서 전체를 트리로 만든 뒤 tblBasic 행을 찾는 비용이다.
+
+    python benchmarks/bench_parser.py [--html PATH] [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from rate_parser import parse_rate_page  # noqa: E402
+
+DEFAULT_HTML = os.path.join(ROOT, 'benchmarks', 'fixtures', 'rate_page.html')
+
+
+def full_html_parser(html: str) -> int:
+    """기존 방식: 문서 전체 파싱 후 tblBasic 행 탐색"""
+    soup = BeautifulSoup(html, 'html.parser')
+    soup.find('div', id='searchContentDiv')
+    table = soup.find('table', class_='tblBasic')
+    return len(table.find('tbody').find_all('tr'))
+
+
+def scoped_parser(html: str) -> int:
+    """rate_parser: 필요한 영역만 lxml로 파싱"""
+    return len(parse_rate_page(html).rows)
+
+
+def measure(fn, html: str, repeat: int):
+    """repeat회 실행한 소요 시간(초) 목록과 행 수 반환"""
+    rows = fn(html)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html)
+        timings.append(time.perf_counter() - start)
+    return timings, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="환율 페이지 파서 벤치마크")
+    parser.add_argument('--html', default=DEFAULT_HTML, help="녹화된 환율 페이지 HTML 경로")
+    parser.add_argument('--repeat', type=int, default=200, help="반복 횟수")
+    args = parser.parse_args()
+
+    with open(args.html, encoding='utf-8') as f:
+        html = f.read()
+
+    print(f"입력: {args.html} ({len(html):,} bytes), 반복 {args.repeat}회")
+    print(f"{'parser':<18}{'rows':>6}{'p50 ms/page':>14}{'p95 ms/page':>14}{'us/row':>10}")
+    for name, fn in (("full_html_parser", full_html_parser), ("scoped_parser", scoped_parser)):
+        timings, rows = measure(fn, html, args.repeat)
+        timings.sort()
+        p50 = statistics.median(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        per_row = p50 / rows * 1e6 if rows else 0.0
+        print(f"{name:<18}{rows:>6}{p50 * 1e3:>14.3f}{p95 * 1e3:>14.3f}{per_row:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""원본 페이지 보관/재파싱 벤치마크
+
+녹화 페이지(stub_site의 조회 폼 응답)를 조회일만 바꿔 N개 임시 보관소에 archive_page()로 저장한 뒤
+reparse.run_reparse()를 프로세스 수별로 실행하여 초당 처리 페이지 수를 비교한다.
+저장은 가짜 MySQL(fake_db)에 배치 upsert하며, --dry-run이면 파싱만 측정한다.
+
+    python benchmarks/bench_reparse.py [--pages 400] [--workers 1,2,4] [--dry-run] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_db import FakeDatabase, install  # noqa: E402
+from stub_site import StubSite  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="원본 페이지 보관/재파싱 벤치마크")
+    parser.add_argument('--pages', type=int, default=400, help="보관할 페이지 수 (조회일 수)")
+    parser.add_argument('--workers', default='1,2,4', help="측정할 프로세스 수 목록 (쉼표 구분)")
+    parser.add_argument('--dry-run', action='store_true', help="DB 저장 없이 파싱만 측정")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    for key, value in (("DB_HOST", "127.0.0.1"), ("DB_USERNAME", "bench"),
+                       ("DB_PASSWORD", "bench"), ("DB_NAME", "bench")):
+        os.environ[key] = value
+    os.environ['VERBOSE'] = '0'
+    os.environ['EMIT_METRICS'] = '0'
+    db = install(FakeDatabase())
+
+    from page_archive import archive_page
+    from reparse import run_reparse
+
+    site = StubSite()
+    results = []
+    with tempfile.TemporaryDirectory() as archive_dir:
+        started = time.perf_counter()
+        start = date(2024, 1, 1)
+        raw = stored = 0
+        for i in range(args.pages):
+            day = start + timedelta(days=i)
+            html = f'<div id="searchContentDiv">{site.render_fragment({"inqStrDt": day.strftime("%Y%m%d")})}</div>'
+            archive_page(html, "http", "all", "FIRST", inquiry_date=day, archive_dir=archive_dir)
+            raw += len(html.encode('utf-8'))
+        archive_sec = time.perf_counter() - started
+        for root, _, files in os.walk(os.path.join(archive_dir, 'pages')):
+            stored += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+
+        for workers in (int(w) for w in args.workers.split(',') if w.strip()):
+            db.tables.clear()
+            results.append(run_reparse(archive_dir, workers=workers, dry_run=args.dry_run))
+
+    archive = {
+        "pages": args.pages,
+        "raw_mb": round(raw / 1024 / 1024, 2),
+        "stored_mb": round(stored / 1024 / 1024, 2),
+        "ratio": round(raw / stored, 1) if stored else 0.0,
+        "pages_per_sec": round(args.pages / archive_sec, 1) if archive_sec else 0.0,
+    }
+    if args.json:
+        print(json.dumps({"archive": archive, "reparse": results}, ensure_ascii=False, indent=2))
+        return
+    print(f"보관: {archive['pages']}페이지, 원본 {archive['raw_mb']} MB -> {archive['stored_mb']} MB "
+          f"({archive['ratio']}x), {archive['pages_per_sec']} 페이지/s")
+    print(f"{'workers':>8}{'pages':>8}{'failed':>8}{'rows':>9}{'sec':>8}{'pages/s':>10}{'rows/s':>10}")
+    for r in results:
+        print(f"{r['workers']:>8}{r['pages']:>8}{len(r['failed']):>8}{r['rows']:>9}{r['elapsed_sec']:>8.2f}"
+              f"{r['pages_per_sec']:>10.1f}{r['rows_per_sec']:>10.0f}")
+    print(f"(CPU {os.cpu_count()}개)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""롤업(rate_rollups) 증분 갱신/재집계 벤치마크
+
+합성 환율(통화 49개 × --days일 × 하루 --sequences회차)을 회차별 배치로 가짜 MySQL(fake_db, 왕복 지연 --db-latency-ms)에
+insert_exchange_rates_batch()로 저장할 때 롤업 끔/켬의 배치당 저장 시간, DB 왕복 수, 기록 행 수를 비교하고
+(값이 같은 재저장, 정정 포함, 가짜 DB는 행마다 문장을 해석하므로 기록 행 수가 많을수록 실제보다 느림),
+저장된 이력 전체를 rebuild_rollups()로 다시 집계하는 처리량과, 통화 하나의 일별 OHLC를 구할 때
+원본 테이블과 롤업 테이블에서 읽는 행 수를 보고한다. 증분 결과는 재집계 결과와 같은지 확인한다.
+
+    python benchmarks/bench_rollups.py [--days 60] [--sequences 10] [--db-latency-ms 2] [--json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_db import FakeDatabase, install  # noqa: E402
+
+CODES = [f"C{i:02d}" for i in range(49)]
+
+
+def announcement_batches(days: int, sequences: int):
+    """기준일 순 회차별 배치 (통화 49개, 회차마다 값이 조금씩 움직임)"""
+    from rate_records import RateBatch
+
+    rng = random.Random(5)
+    base = {code: 100.0 + i * 37.5 for i, code in enumerate(CODES)}
+    start = date(2026, 1, 1)
+    for day in range(days):
+        base_date = start + timedelta(days=day)
+        for sequence in range(1, sequences + 1):
+            now = datetime(base_date.year, base_date.month, base_date.day, 9, 0) + timedelta(minutes=sequence)
+            batch = RateBatch()
+            for code in CODES:
+                base[code] = round(base[code] * (1 + rng.uniform(-0.002, 0.002)), 2)
+                rate = base[code]
+                batch.append((base_date, code, sequence, "SEQUENCE", round(rate * 1.0175, 2), 1.75,
+                              round(rate * 0.9825, 2), 1.75, round(rate * 1.01, 2), round(rate * 0.99, 2),
+                              round(rate * 0.988, 2), rate, 3.5, 0.85, now, now))
+            yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="롤업 증분 갱신/재집계 벤치마크")
+    parser.add_argument('--days', type=int, default=60, help="기준일 수")
+    parser.add_argument('--sequences', type=int, default=10, help="하루 고시회차 수")
+    parser.add_argument('--db-latency-ms', type=float, default=2.0, help="가짜 DB 왕복 지연(ms)")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    for key, value in (("DB_HOST", "127.0.0.1"), ("DB_USERNAME", "bench"), ("DB_PASSWORD", "bench"),
+                       ("DB_NAME", "bench"), ("VERBOSE", "0"), ("EMIT_METRICS", "0"), ("SPOOL_PATH", "")):
+        os.environ[key] = value
+    db = install(FakeDatabase(latency_ms=args.db_latency_ms))
+
+    import rollups
+    from crawler import create_table_if_not_exists, get_db_connection, insert_exchange_rates_batch
+    from db_pool import release_connection
+    from rate_records import RateBatch
+
+    batches = list(announcement_batches(args.days, args.sequences))
+    rows = sum(len(batch) for batch in batches)
+    connection = get_db_connection()
+    results = []
+    try:
+        for enabled in (False, True):
+            rollups.RATE_ROLLUPS = enabled
+            db.tables.clear()
+            create_table_if_not_exists(connection)
+            timings = {}
+            for phase, phase_batches in (
+                ("new", batches),
+                # 마지막 날을 같은 값으로 다시 저장 (변경 감지를 건너뛴 재실행)
+                ("rewrite", batches[-args.sequences:]),
+            ):
+                round_trips = db.stats["round_trips"]
+                written = db.stats["rows_written"]
+                started = time.perf_counter()
+                for batch in phase_batches:
+                    assert insert_exchange_rates_batch(connection, batch) is not None
+                elapsed = time.perf_counter() - started
+                timings[f"{phase}_ms_per_batch"] = round(elapsed * 1000 / len(phase_batches), 3)
+                timings[f"{phase}_round_trips"] = round((db.stats["round_trips"] - round_trips) / len(phase_batches), 1)
+                timings[f"{phase}_rows_written"] = round((db.stats["rows_written"] - written) / len(phase_batches), 1)
+            # 마지막 회차의 한 통화 정정 (해당 일/주/월 재집계)
+            corrected = list(batches[-1].rows())[0]
+            corrected = corrected[:11] + (corrected[11] * 1.01,) + corrected[12:]
+            started = time.perf_counter()
+            assert insert_exchange_rates_batch(connection, RateBatch([corrected])) is not None
+            timings["correction_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            results.append({"rollups": enabled, "batches": len(batches), "rows": rows, **timings})
+
+        incremental = {key: row for key, row in db.tables["rate_rollups"].items()}
+        db.tables["rate_rollups"].clear()
+        db.latency = 0.0
+        read_connection = get_db_connection()
+        try:
+            rebuild = rollups.rebuild_rollups(read_connection, connection)
+        finally:
+            release_connection(read_connection)
+        rebuilt = db.tables["rate_rollups"]
+        mismatched = sum(
+            1 for key, row in rebuilt.items()
+            if key not in incremental or any(
+                abs(float(row[name]) - float(incremental[key][name])) > 1e-6
+                for name in ("open_value", "high_value", "low_value", "close_value", "value_sum", "value_count"))
+        ) + len(set(incremental) - set(rebuilt))
+        day_rows = len(rollups.load_rollups(connection, CODES[0], "base_rate", "day"))
+    finally:
+        release_connection(connection)
+
+    summary = {
+        "results": results,
+        "rebuild": rebuild,
+        "rollup_rows": len(rebuilt),
+        "incremental_mismatch": mismatched,
+        # 통화 하나의 일별 OHLC: 원본은 해당 통화의 모든 회차 행, 롤업은 날짜당 1행
+        "daily_ohlc_rows_read": {"exchange_rates": args.days * args.sequences, "rate_rollups": day_rows},
+    }
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+    print(f"{'rollups':>8}{'batches':>9}{'rows':>8}{'new ms':>9}{'new rt':>8}{'new written':>13}{'rewrite ms':>12}"
+          f"{'rewrite rt':>12}{'correct ms':>12}")
+    for r in results:
+        print(f"{str(r['rollups']):>8}{r['batches']:>9}{r['rows']:>8}{r['new_ms_per_batch']:>9.3f}"
+              f"{r['new_round_trips']:>8}{r['new_rows_written']:>13}{r['rewrite_ms_per_batch']:>12.3f}"
+              f"{r['rewrite_round_trips']:>12}{r['correction_ms']:>12.3f}")
+    print(f"rebuild: {rebuild['rows_read']}행 → 롤업 {rebuild['rollup_rows']}행, {rebuild['rows_per_sec']:.0f} 행/s, "
+          f"증분 결과 불일치 {mismatched}")
+    print(f"일별 OHLC 읽는 행 수 (통화 1개, {args.days}일): exchange_rates {args.days * args.sequences}, "
+          f"rate_rollups {day_rows}")
+
+
+if __name__ == '__main__':
+    main()
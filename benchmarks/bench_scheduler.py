@@ -0,0 +1,72 @@
+"""조회 작업 스케줄러 벤치마크
+
+로컬 대역 서버(stub_site, 응답 지연·503 오류 비율 지정)와 가짜 MySQL(fake_db)로
+scheduler.run_jobs()를 동시성별로 실행하여 초당 처리 작업 수와 저장 행 수, 재시도/기한 초과 건수를 비교한다.
+동시성 1은 기존처럼 작업을 하나씩 순서대로 조회하는 경우에 해당한다.
+
+    python benchmarks/bench_scheduler.py [--jobs 120] [--concurrency 1,4,16] [--site-latency-ms 100]
+                                         [--error-rate 0.05] [--rate 0] [--deadline 0] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_db import FakeDatabase, install  # noqa: E402
+from stub_site import StubSite  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="조회 작업 스케줄러 벤치마크")
+    parser.add_argument('--jobs', type=int, default=120, help="작업 수 (조회일 수, 전체 통화 페이지)")
+    parser.add_argument('--concurrency', default='1,4,16', help="측정할 동시성 목록 (쉼표 구분)")
+    parser.add_argument('--site-latency-ms', type=float, default=100.0, help="대역 서버 응답 지연(ms)")
+    parser.add_argument('--error-rate', type=float, default=0.05, help="503 응답 비율")
+    parser.add_argument('--rate', type=float, default=0.0, help="호스트별 초당 최대 요청 수 (0이면 제한 없음)")
+    parser.add_argument('--deadline', type=float, default=0.0, help="실행별 제한 시간(초)")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    site = StubSite(latency_ms=args.site_latency_ms, error_rate=args.error_rate).start()
+    os.environ.update(site.env())
+    for key, value in (("DB_HOST", "127.0.0.1"), ("DB_USERNAME", "bench"),
+                       ("DB_PASSWORD", "bench"), ("DB_NAME", "bench")):
+        os.environ[key] = value
+    os.environ['VERBOSE'] = '0'
+    os.environ['EMIT_METRICS'] = '0'
+    # 재시도 대기는 짧게 (측정 대상은 동시성에 따른 처리량)
+    os.environ.setdefault('SCHEDULER_RETRY_BASE_SEC', '0.05')
+    db = install(FakeDatabase())
+
+    # 환경변수를 읽도록 설정 후 import
+    import scheduler
+
+    start = date(2025, 1, 1)
+    results = []
+    for concurrency in (int(c) for c in args.concurrency.split(',') if c.strip()):
+        db.tables.clear()
+        jobs = scheduler.build_jobs("all", start, start + timedelta(days=args.jobs - 1))
+        summary = scheduler.run_jobs(jobs, concurrency=concurrency, rate_per_host=args.rate,
+                                     deadline_sec=args.deadline)
+        results.append(summary)
+    site.stop()
+
+    if args.json:
+        print(json.dumps({"results": results, "site": site.stats}, ensure_ascii=False, indent=2))
+        return
+    print(f"{'conc':>5}{'jobs':>7}{'fetched':>9}{'retries':>9}{'expired':>9}{'failed':>8}"
+          f"{'rows':>8}{'sec':>8}{'jobs/s':>9}{'rows/s':>10}")
+    for r in results:
+        print(f"{r['concurrency']:>5}{r['jobs']:>7}{r['fetched']:>9}{r['retries']:>9}{r['expired']:>9}"
+              f"{len(r['failed_jobs']):>8}{r['rows']:>8}{r['elapsed_sec']:>8.2f}{r['jobs_per_sec']:>9.1f}"
+              f"{r['rows_per_sec']:>10.0f}")
+    print(f"\nstub site: {site.stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""로컬 보관소(SQLite WAL) 보관/반영 벤치마크
+
+합성 환율(--rows행)을 --write-rows행씩 spool_rates()로 보관한 뒤(크롤링 1회 저장분 단위),
+flush_spool()이 배치 크기별로 가짜 MySQL(fake_db, 왕복 지연 --db-latency-ms)에 배치 upsert로 옮기는 처리량을 비교한다.
+--mysql을 주면 가짜 DB 대신 DB_* 환경변수가 가리키는 MySQL 호환 서버에 저장한다.
+
+    python benchmarks/bench_spool.py [--rows 20000] [--write-rows 49] [--flush-rows 500,2000,5000]
+                                     [--db-latency-ms 5] [--mysql] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_db import FakeDatabase, install  # noqa: E402
+
+
+def synthetic_rows(count: int):
+    """통화 49개 × 기준일 순으로 count행 (RATE_COLUMNS 순서)"""
+    codes = [f"C{i:02d}" for i in range(49)]
+    start = date(2020, 1, 1)
+    now = datetime.now().replace(microsecond=0)
+    for i in range(count):
+        day = start + timedelta(days=i // len(codes))
+        rate = 1000.0 + i % 997
+        yield (day, codes[i % len(codes)], 1, "FIRST", rate * 1.0175, 1.75, rate * 0.9825, 1.75,
+               rate * 1.01, rate * 0.99, rate * 0.988, rate, 3.5, 0.85, now, now)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 보관소 보관/반영 벤치마크")
+    parser.add_argument('--rows', type=int, default=20000, help="보관할 전체 행 수")
+    parser.add_argument('--write-rows', type=int, default=49, help="spool_rates() 1회에 보관할 행 수")
+    parser.add_argument('--flush-rows', default='500,2000,5000', help="측정할 반영 배치 크기 목록 (쉼표 구분)")
+    parser.add_argument('--db-latency-ms', type=float, default=5.0, help="가짜 DB 왕복 지연(ms)")
+    parser.add_argument('--mysql', action='store_true', help="가짜 DB 대신 DB_* 환경변수의 MySQL 서버 사용")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    if not args.mysql:
+        for key, value in (("DB_HOST", "127.0.0.1"), ("DB_USERNAME", "bench"),
+                           ("DB_PASSWORD", "bench"), ("DB_NAME", "bench")):
+            os.environ[key] = value
+        db = install(FakeDatabase(latency_ms=args.db_latency_ms))
+    os.environ['VERBOSE'] = '0'
+    os.environ['EMIT_METRICS'] = '0'
+
+    with tempfile.TemporaryDirectory() as spool_dir:
+        os.environ['SPOOL_PATH'] = os.path.join(spool_dir, 'spool.db')
+        import spool
+        from crawler import create_table_if_not_exists, get_db_connection, insert_exchange_rates_batch
+        from db_pool import release_connection
+        from rate_records import RateBatch
+
+        rows = list(synthetic_rows(args.rows))
+        connection = get_db_connection()
+        if not connection or not create_table_if_not_exists(connection):
+            print("DB 연결 실패")
+            return
+
+        results = []
+        try:
+            for flush_rows in (int(n) for n in args.flush_rows.split(',') if n.strip()):
+                if not args.mysql:
+                    db.tables.clear()
+                started = time.perf_counter()
+                for i in range(0, len(rows), max(args.write_rows, 1)):
+                    spool.spool_rates(RateBatch(rows[i:i + args.write_rows]))
+                write_sec = time.perf_counter() - started
+                depth = spool.spool_depth()
+                flushed = spool.flush_spool(connection, insert_exchange_rates_batch, flush_rows)
+                results.append({
+                    "flush_rows": flush_rows,
+                    "depth": depth,
+                    "spool_rows_per_sec": round(len(rows) / write_sec, 1) if write_sec else 0.0,
+                    "spool_ms_per_write": round(write_sec * 1000 / -(-len(rows) // max(args.write_rows, 1)), 3),
+                    "flushed": flushed["rows"],
+                    "batches": flushed["batches"],
+                    "flush_sec": flushed["elapsed_sec"],
+                    "flush_rows_per_sec": flushed["rows_per_sec"],
+                    "remaining": spool.spool_depth(),
+                })
+        finally:
+            release_connection(connection)
+            spool.close_spool()
+
+    if args.json:
+        print(json.dumps({"results": results, "db": None if args.mysql else db.stats}, ensure_ascii=False, indent=2))
+        return
+    print(f"{'flush rows':>11}{'depth':>8}{'spool rows/s':>14}{'ms/write':>10}{'flushed':>9}{'batches':>9}"
+          f"{'flush s':>9}{'flush rows/s':>14}{'left':>6}")
+    for r in results:
+        print(f"{r['flush_rows']:>11}{r['depth']:>8}{r['spool_rows_per_sec']:>14.0f}{r['spool_ms_per_write']:>10.3f}"
+              f"{r['flushed']:>9}{r['batches']:>9}{r['flush_sec']:>9.3f}{r['flush_rows_per_sec']:>14.0f}"
+              f"{r['remaining']:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+"""pymysql 연결을 대신하는 프로세스 내 가짜 MySQL
+
+INSERT ... ON DUPLICATE KEY UPDATE는 테이블별 유니크 키로 upsert하고 MySQL과 같은 영향 행 수(신규 1, 갱신 2)를 돌려준다.
+롤업 병합(MERGE_ROLLUP_SQL)처럼 기존 값과 합치는 갱신은 테이블별 병합 함수로 흉내 낸다.
+DELETE는 AND로 이은 단순 조건(=, >, >=, <, <=, IN)만 해석하여 해당 행을 지운다.
+그 밖의 문장(CREATE TABLE 등)은 실행만 기록하고, SELECT는 등록된 핸들러가 없으면 빈 결과를 돌려준다.
+SSCursor(unbuffered)로 연 커서는 핸들러가 돌려준 iterable을 fetch할 때마다 조금씩 소비한다 (대용량 합성 결과용).
+RDS 왕복 지연은 latency_ms로 흉내 낸다 (문장 실행, begin/commit 각 1회 왕복, 연결은 connect_round_trips회 왕복).
+"""
+import re
+import threading
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+INSERT_PATTERN = re.compile(
+    r'INSERT\s+INTO\s+(\w+)\s*\(([^)]*)\)\s*VALUES\s*\((.*?)\)\s*(?:ON\s+DUPLICATE|;|\Z)', re.IGNORECASE | re.DOTALL
+)
+PLACEHOLDER_PATTERN = re.compile(r'%\((\w+)\)s|%s')
+SELECT_TABLE_PATTERN = re.compile(r'\bFROM\s+(\w+)', re.IGNORECASE)
+SELECT_COLUMNS_PATTERN = re.compile(r'SELECT\s+(.*?)\s+FROM\b', re.IGNORECASE | re.DOTALL)
+DELETE_PATTERN = re.compile(r'DELETE\s+FROM\s+(\w+)(?:\s+WHERE\s+(.*))?', re.IGNORECASE | re.DOTALL)
+CONDITION_PATTERN = re.compile(r'(\w+)\s*(>=|<=|=|>|<|IN)\s*(\([^)]*\)|%s)', re.IGNORECASE)
+
+# 테이블별 유니크 키 컬럼
+UNIQUE_KEYS: Dict[str, Tuple[str, ...]] = {
+    "exchange_rates": ("base_date", "currency_code", "announcement_sequence"),
+    "crawl_fingerprints": ("fetch_key",),
+    "rate_rollups": ("period_type", "currency_code", "rate_field", "period_start"),
+}
+
+
+def _merge_rollup(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """rollups.MERGE_ROLLUP_SQL의 ON DUPLICATE KEY UPDATE"""
+    merged = dict(old)
+    if new["open_key"] < old["open_key"]:
+        merged["open_value"], merged["open_key"] = new["open_value"], new["open_key"]
+    if new["close_key"] > old["close_key"]:
+        merged["close_value"], merged["close_key"] = new["close_value"], new["close_key"]
+    merged["high_value"] = max(old["high_value"], new["high_value"])
+    merged["low_value"] = min(old["low_value"], new["low_value"])
+    merged["value_sum"] = old["value_sum"] + new["value_sum"]
+    merged["value_count"] = old["value_count"] + new["value_count"]
+    return merged
+
+
+# DELETE 조건 비교 (값은 문자열로 비교: 날짜는 ISO 형식이라 순서가 같음)
+_COMPARE: Dict[str, Callable[[str, str], bool]] = {
+    "=": lambda a, b: a == b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+# 테이블별 (병합 갱신 문장 표식, 병합 함수): 문장에 표식이 있으면 덮어쓰지 않고 병합
+MERGE_UPDATES: Dict[str, Tuple[str, Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]]] = {
+    "rate_rollups": ("value_count + VALUES(value_count)", _merge_rollup),
+}
+
+
+def _select_exchange_rates(db: 'FakeDatabase', sql: str, params: Any) -> List[tuple]:
+    """crawler/rate_lookup가 보내는 exchange_rates 조회문을 문장 형태별로 흉내"""
+    rows = list(db.tables.get("exchange_rates", {}).values())
+    if 'MAX(announcement_sequence)' in sql:
+        # SELECT currency_code, MAX(announcement_sequence) ... WHERE base_date = %s [AND currency_code IN (...)]
+        base_date, codes = params[0], set(params[1:])
+        latest: Dict[str, int] = {}
+        for row in rows:
+            if str(row["base_date"]) != str(base_date) or (codes and row["currency_code"] not in codes):
+                continue
+            code = row["currency_code"]
+            latest[code] = max(latest.get(code, 0), row["announcement_sequence"])
+        return list(latest.items())
+
+    columns = [c.strip() for c in SELECT_COLUMNS_PATTERN.search(sql).group(1).split(',')]
+    if 'ROW_NUMBER' in sql:
+        # 통화별 최신(base_date, announcement_sequence) 행, base_date >= %s
+        latest_rows: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            if str(row["base_date"]) < str(params[0]):
+                continue
+            current = latest_rows.get(row["currency_code"])
+            order = (str(row["base_date"]), row["announcement_sequence"])
+            if current is None or order > (str(current["base_date"]), current["announcement_sequence"]):
+                latest_rows[row["currency_code"]] = row
+        matched = list(latest_rows.values())
+    elif 'announcement_sequence) IN' in sql:
+        # rollups.load_stored_rows: WHERE (base_date, currency_code, announcement_sequence) IN ((%s, %s, %s), ...)
+        keys = {(str(params[i]), params[i + 1], params[i + 2]) for i in range(0, len(params), 3)}
+        matched = [row for row in rows
+                   if (str(row["base_date"]), row["currency_code"], row["announcement_sequence"]) in keys]
+    elif 'ORDER BY base_date, currency_code, announcement_sequence' in sql:
+        # export.build_export_query: [base_date >= %s] [AND base_date <= %s] [AND currency_code IN (...)]
+        params = list(params or ())
+        start = str(params.pop(0)) if 'base_date >=' in sql else None
+        end = str(params.pop(0)) if 'base_date <=' in sql else None
+        codes = set(params)
+        matched = sorted(
+            (row for row in rows
+             if (start is None or str(row["base_date"]) >= start) and (end is None or str(row["base_date"]) <= end)
+             and (not codes or row["currency_code"] in codes)),
+            key=lambda row: (str(row["base_date"]), row["currency_code"], row["announcement_sequence"]),
+        )
+    elif 'BETWEEN' in sql:
+        # WHERE base_date BETWEEN %s AND %s
+        matched = [row for row in rows if str(params[0]) <= str(row["base_date"]) <= str(params[1])]
+    else:
+        # WHERE base_date = %s AND currency_code = %s [AND announcement_sequence = %s | ORDER BY ... LIMIT 1]
+        matched = [row for row in rows
+                   if str(row["base_date"]) == str(params[0]) and row["currency_code"] == params[1]
+                   and (len(params) < 3 or row["announcement_sequence"] == params[2])]
+        matched.sort(key=lambda row: row["announcement_sequence"], reverse=True)
+        matched = matched[:1]
+    return [tuple(row.get(c) for c in columns) for row in matched]
+
+
+def _select_rollups(db: 'FakeDatabase', sql: str, params: Any) -> List[tuple]:
+    """rollups.load_rollups: period_type, currency_code, rate_field = %s [AND period_start >= %s] [<= %s]"""
+    params = list(params)
+    period, code, name = params[:3]
+    rest = params[3:]
+    start = str(rest.pop(0)) if 'period_start >=' in sql else None
+    end = str(rest.pop(0)) if 'period_start <=' in sql else None
+    columns = [c.strip() for c in SELECT_COLUMNS_PATTERN.search(sql).group(1).split(',')]
+    matched = sorted(
+        (row for row in db.tables.get("rate_rollups", {}).values()
+         if row["period_type"] == period and row["currency_code"] == code and row["rate_field"] == name
+         and (start is None or str(row["period_start"]) >= start) and (end is None or str(row["period_start"]) <= end)),
+        key=lambda row: str(row["period_start"]),
+    )
+    return [tuple(row.get(c) for c in columns) for row in matched]
+
+
+def _select_fingerprint(db: 'FakeDatabase', sql: str, params: Any) -> List[tuple]:
+    row = db.tables.get("crawl_fingerprints", {}).get((params[0],))
+    return [(row["content_hash"],)] if row else []
+
+
+class FakeDatabase:
+    """테이블 데이터와 왕복/문장 통계를 보관하는 가짜 DB"""
+
+    def __init__(self, latency_ms: float = 0.0, connect_round_trips: int = 3):
+        self.latency = latency_ms / 1000
+        self.connect_round_trips = connect_round_trips
+        self.tables: Dict[str, Dict[tuple, Dict[str, Any]]] = {}
+        self.select_handlers: Dict[str, Callable[['FakeDatabase', str, Any], Iterable[tuple]]] = {
+            "crawl_fingerprints": _select_fingerprint,
+            "exchange_rates": _select_exchange_rates,
+            "rate_rollups": _select_rollups,
+        }
+        self.stats = {"connects": 0, "round_trips": 0, "statements": 0, "rows_written": 0, "commits": 0}
+        self.lock = threading.Lock()
+
+    def round_trip(self, count: int = 1):
+        with self.lock:
+            self.stats["round_trips"] += count
+        if self.latency:
+            time.sleep(self.latency * count)
+
+    def upsert(self, table: str, row: Dict[str, Any], sql: str = "") -> int:
+        """유니크 키 기준 upsert 후 영향 행 수(신규 1, 갱신 2) 반환"""
+        key_columns = UNIQUE_KEYS.get(table)
+        key = tuple(row.get(c) for c in key_columns) if key_columns else (len(self.tables.get(table, {})),)
+        with self.lock:
+            rows = self.tables.setdefault(table, {})
+            existed = key in rows
+            marker, merge = MERGE_UPDATES.get(table, (None, None))
+            if existed and marker and marker in sql:
+                rows[key] = merge(rows[key], row)
+            else:
+                rows[key] = {**rows.get(key, {}), **row}
+            self.stats["rows_written"] += 1
+        return 2 if existed else 1
+
+    def delete(self, table: str, sql: str, params: Any) -> int:
+        """DELETE FROM table WHERE 조건 AND ... 로 행 삭제 후 삭제 행 수 반환"""
+        where = DELETE_PATTERN.search(sql).group(2) or ""
+        values = iter(params or ())
+        conditions = []
+        for column, op, operand in CONDITION_PATTERN.findall(where):
+            if op.upper() == 'IN':
+                conditions.append((column, 'IN', {str(next(values)) for _ in range(operand.count('%s'))}))
+            else:
+                conditions.append((column, op, str(next(values))))
+
+        def matches(row: Dict[str, Any]) -> bool:
+            for column, op, value in conditions:
+                actual = str(row.get(column))
+                if not (actual in value if op.upper() == 'IN' else _COMPARE[op](actual, value)):
+                    return False
+            return True
+
+        with self.lock:
+            rows = self.tables.get(table, {})
+            deleted = [key for key, row in rows.items() if matches(row)]
+            for key in deleted:
+                del rows[key]
+            self.stats["rows_written"] += len(deleted)
+        return len(deleted)
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        with self.lock:
+            return list(self.tables.get(table, {}).values())
+
+    def connect(self, *args, **kwargs) -> 'FakeConnection':
+        """pymysql.connect 대체"""
+        with self.lock:
+            self.stats["connects"] += 1
+        self.round_trip(self.connect_round_trips)
+        return FakeConnection(self)
+
+
+def _row_from_insert(sql: str, params: Any) -> Tuple[Optional[str], Dict[str, Any]]:
+    match = INSERT_PATTERN.search(sql)
+    if not match:
+        return None, {}
+    table = match.group(1)
+    columns = [c.strip() for c in match.group(2).split(',')]
+    placeholders = PLACEHOLDER_PATTERN.findall(match.group(3))
+    if isinstance(params, dict):
+        values = [params.get(name) for name in placeholders]
+    else:
+        values = list(params or [])
+    return table, dict(zip(columns, values))
+
+
+class FakeCursor:
+    def __init__(self, connection: 'FakeConnection', unbuffered: bool = False):
+        self.connection = connection
+        self.unbuffered = unbuffered
+        self.rowcount = 0
+        self._results: Iterator[tuple] = iter(())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _apply(self, sql: str, params: Any) -> int:
+        db = self.connection.db
+        stripped = sql.lstrip().upper()
+        if stripped.startswith('INSERT'):
+            table, row = _row_from_insert(sql, params)
+            return db.upsert(table, row, sql) if table else 0
+        if stripped.startswith('DELETE'):
+            return db.delete(DELETE_PATTERN.search(sql).group(1), sql, params)
+        if stripped.startswith('SELECT'):
+            match = SELECT_TABLE_PATTERN.search(sql)
+            handler = db.select_handlers.get(match.group(1)) if match else None
+            results = handler(db, sql, params) if handler else ()
+            if self.unbuffered:
+                self._results = iter(results)
+                return 0
+            results = list(results)
+            self._results = iter(results)
+            return len(results)
+        return 0
+
+    def execute(self, sql: str, params: Any = None) -> int:
+        self.connection.db.round_trip()
+        with self.connection.db.lock:
+            self.connection.db.stats["statements"] += 1
+        self.rowcount = self._apply(sql, params)
+        return self.rowcount
+
+    def executemany(self, sql: str, seq_of_params: Sequence[Any]) -> int:
+        # pymysql은 INSERT ... VALUES를 다중 행 한 문장으로 보내므로 왕복 1회로 계산
+        self.connection.db.round_trip()
+        with self.connection.db.lock:
+            self.connection.db.stats["statements"] += 1
+        self.rowcount = sum(self._apply(sql, params) for params in seq_of_params)
+        return self.rowcount
+
+    def fetchone(self):
+        return next(self._results, None)
+
+    def fetchall(self):
+        return list(self._results)
+
+    def fetchmany(self, size: int = 1):
+        return list(islice(self._results, size))
+
+    def close(self):
+        self._results = iter(())
+
+
+class FakeConnection:
+    def __init__(self, db: FakeDatabase):
+        self.db = db
+        self.open = True
+
+    def cursor(self, cursor_class=None) -> FakeCursor:
+        return FakeCursor(self, unbuffered=cursor_class is not None and cursor_class.__name__.startswith('SS'))
+
+    def begin(self):
+        self.db.round_trip()
+
+    def commit(self):
+        self.db.round_trip()
+        with self.db.lock:
+            self.db.stats["commits"] += 1
+
+    def rollback(self):
+        self.db.round_trip()
+
+    def ping(self, reconnect: bool = True):
+        self.db.round_trip()
+        self.open = True
+
+    def close(self):
+        self.open = False
+
+
+def install(db: FakeDatabase):
+    """pymysql.connect를 가짜 DB 연결로 교체"""
+    import pymysql
+    pymysql.connect = db.connect
+    return db
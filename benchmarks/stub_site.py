@@ -0,0 +1,177 @@
+"""하나은행 환율 페이지 로컬 대역 서버
+
+녹화된 메인 페이지(index.html), bankIframe 문서(rate_page.html), 조회 폼 응답(searchContentDiv 조각)을 제공한다.
+조회 폼 요청의 inqStrDt(YYYYMMDD)가 있으면 헤더의 날짜를 해당 날짜로 바꿔 응답한다.
+당일 고시 회차는 announcements회까지 있는 것으로 보고, pbldDvCd(최초/회차 지정/최종)에 맞춰 헤더의 회차를 바꾼다.
+error_rate를 주면 조회 폼 요청 중 그 비율만큼 503으로 응답한다 (재시도 측정용).
+asset_kb를 주면 페이지가 참조하는 /resource/ 하위 CSS/JS를 그 크기의 주석 본문으로 응답한다 (브라우저 전송량 측정용).
+
+    python benchmarks/stub_site.py [--port 8765] [--latency-ms 0] [--announcements 1] [--error-rate 0] [--asset-kb 0]
+"""
+import argparse
+import mimetypes
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+INDEX_PATH = "/cont/mall/mall15/mall1501/index.jsp"
+IFRAME_PATH = "/cms/rate/index.do"
+FORM_PATH = "/cms/rate/wpfxd651_01i_01.do"
+ASSET_PREFIX = "/resource/"
+
+# 녹화 페이지의 기준일/고시일 (요청 날짜로 치환)
+RECORDED_DATE_TEXT = "2026년 10월 16일"
+# 녹화 페이지의 고시회차
+RECORDED_SEQUENCE_TEXT = "(1회차)"
+
+
+def _read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def extract_form_fragment(rate_page: str) -> str:
+    """bankIframe 문서에서 조회 폼 응답에 해당하는 txtRateBox~tblBasic 조각 추출"""
+    start = rate_page.index('<p class="txtRateBox">')
+    end = rate_page.index('</table>', start) + len('</table>')
+    return rate_page[start:end]
+
+
+class StubSite:
+    """녹화 응답을 제공하는 로컬 HTTP 서버 (별도 스레드에서 실행)"""
+
+    def __init__(self, port: int = 0, latency_ms: float = 0.0, announcements: int = 1, error_rate: float = 0.0,
+                 asset_kb: float = 0.0):
+        self.index_html = _read_fixture('index.html')
+        self.rate_page = _read_fixture('rate_page.html')
+        self.fragment = extract_form_fragment(self.rate_page)
+        self.latency = latency_ms / 1000
+        self.announcements = announcements
+        self.error_rate = error_rate
+        # CSS/JS 모두 주석으로 해석되는 본문
+        self.asset_body = f"/*{'x' * max(int(asset_kb * 1024) - 4, 0)}*/" if asset_kb else ""
+        self.stats = {"requests": 0, "bytes": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def env(self) -> Dict[str, str]:
+        """crawler가 대역 서버를 바라보도록 하는 환경변수"""
+        return {
+            "BASE_URL": self.base_url + INDEX_PATH,
+            "RATE_FORM_URL": self.base_url + FORM_PATH,
+            "RATE_IFRAME_URL": self.base_url + IFRAME_PATH + "?contentUrl=/cms/rate/wpfxd651_01i.do",
+        }
+
+    def announcement_sequence(self, form: Dict[str, str]) -> int:
+        division = form.get('pbldDvCd', '1')
+        if division == '3':
+            return self.announcements
+        if division == '2' and form.get('pbldSqn', '').isdigit():
+            return min(max(int(form['pbldSqn']), 1), self.announcements)
+        return 1
+
+    def render_fragment(self, form: Dict[str, str]) -> str:
+        fragment = self.fragment.replace(RECORDED_SEQUENCE_TEXT, f"({self.announcement_sequence(form)}회차)")
+        inquiry_date = form.get('inqStrDt', '')
+        if len(inquiry_date) == 8 and inquiry_date.isdigit():
+            date_text = f"{inquiry_date[:4]}년 {inquiry_date[4:6]}월 {inquiry_date[6:]}일"
+            return fragment.replace(RECORDED_DATE_TEXT, date_text)
+        return fragment
+
+    def route(self, method: str, path: str, form: Dict[str, str]) -> Tuple[int, str]:
+        if method == 'GET' and path == INDEX_PATH:
+            return 200, self.index_html
+        if method == 'GET' and path == IFRAME_PATH:
+            return 200, self.rate_page
+        if method == 'GET' and path.startswith(ASSET_PREFIX) and self.asset_body:
+            return 200, self.asset_body
+        if method == 'POST' and path == FORM_PATH:
+            if self.error_rate and random.random() < self.error_rate:
+                with self._lock:
+                    self.stats["errors"] += 1
+                return 503, "service unavailable"
+            return 200, self.render_fragment(form)
+        return 404, "not found"
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, method: str):
+                url = urlsplit(self.path)
+                form = {k: v[0] for k, v in parse_qs(url.query).items()}
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    body = self.rfile.read(length).decode('utf-8', 'replace')
+                    form.update({k: v[0] for k, v in parse_qs(body, keep_blank_values=True).items()})
+
+                if site.latency:
+                    time.sleep(site.latency)
+                status, text = site.route(method, url.path, form)
+                payload = text.encode('utf-8')
+
+                self.send_response(status)
+                content_type = mimetypes.guess_type(url.path)[0] if url.path.startswith(ASSET_PREFIX) else None
+                self.send_header('Content-Type', f"{content_type or 'text/html'}; charset=UTF-8")
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                with site._lock:
+                    site.stats["requests"] += 1
+                    site.stats["bytes"] += len(payload)
+
+            def do_GET(self):
+                self._respond('GET')
+
+            def do_POST(self):
+                self._respond('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'StubSite':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="하나은행 환율 페이지 로컬 대역 서버")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="응답마다 추가할 지연(ms)")
+    parser.add_argument('--announcements', type=int, default=1, help="당일 고시 회차 수")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503으로 응답할 조회 폼 요청 비율")
+    parser.add_argument('--asset-kb', type=float, default=0.0, help="/resource/ CSS/JS 응답 크기(KB)")
+    args = parser.parse_args()
+
+    site = StubSite(args.port, args.latency_ms, args.announcements, args.error_rate, args.asset_kb)
+    for key, value in site.env().items():
+        print(f"export {key}={value}")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
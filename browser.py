@@ -0,0 +1,257 @@
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# 웜 컨테이너에서 재사용할 세션 한도 (초과 시 Chrome 재시작)
+BROWSER_MAX_USES = int(os.environ.get('BROWSER_MAX_USES', '50'))
+BROWSER_MAX_AGE_SEC = int(os.environ.get('BROWSER_MAX_AGE_SEC', '3600'))
+BROWSER_MAX_RSS_MB = float(os.environ.get('BROWSER_MAX_RSS_MB', '700'))
+# 상태 점검 스크립트 응답 제한 시간(초)
+BROWSER_HEALTH_TIMEOUT = int(os.environ.get('BROWSER_HEALTH_TIMEOUT', '5'))
+
+# 경량 프로필: 이미지/폰트/CSS/미디어/외부 분석 스크립트 요청을 CDP로 차단하고 DOMContentLoaded에서 로드 완료 처리
+BROWSER_LEAN = os.environ.get('BROWSER_LEAN', '1').lower() not in ('0', 'false', 'no')
+BROWSER_PAGE_LOAD_STRATEGY = os.environ.get('BROWSER_PAGE_LOAD_STRATEGY', 'eager' if BROWSER_LEAN else 'normal')
+# 차단할 URL 패턴 (Network.setBlockedURLs 형식, '*' 와일드카드) - 쉼표 구분으로 교체 가능
+DEFAULT_BLOCKED_URLS = (
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+    "*.mp4", "*.webm", "*.mp3", "*.swf",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*",
+    "*wcs.naver.net*", "*nethru*",
+)
+BROWSER_BLOCKED_URLS = tuple(
+    pattern.strip() for pattern in os.environ.get('BROWSER_BLOCKED_URLS', ','.join(DEFAULT_BLOCKED_URLS)).split(',')
+    if pattern.strip()
+)
+# 저메모리 프로필: 작은 창, V8 힙 상한, 백그라운드 기능/캐시 끄기, 조회 영역 HTML만 가져오고 유휴 시 빈 페이지로 이동
+BROWSER_LOW_MEMORY = os.environ.get('BROWSER_LOW_MEMORY', '0').lower() not in ('0', 'false', 'no')
+BROWSER_WINDOW_SIZE = os.environ.get('BROWSER_WINDOW_SIZE', '800,600' if BROWSER_LOW_MEMORY else '1392,1150')
+# 렌더러 V8 old space 상한(MB) - 조회 폼 스크립트만 실행하므로 작게 잡아도 됨
+BROWSER_JS_HEAP_MB = int(os.environ.get('BROWSER_JS_HEAP_MB', '64'))
+LOW_MEMORY_ARGUMENTS = (
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-breakpad",
+    "--disable-client-side-phishing-detection",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,BackForwardCache,AutofillServerCommunication,"
+    "InterestFeedContentSuggestions,CalculateNativeWinOcclusion,HeavyAdIntervention",
+    "--mute-audio",
+    "--no-first-run",
+    "--disk-cache-size=1",
+    "--media-cache-size=1",
+    "--aggressive-cache-discard",
+    "--renderer-process-limit=1",
+)
+# 조회 결과 영역(헤더와 환율 테이블)만 가져오는 스크립트 - page_source 전체 문자열을 만들지 않음
+RATE_FRAGMENT_SCRIPT = (
+    "var el = document.getElementById('searchContentDiv'); return el ? el.outerHTML : null;"
+)
+# 성능 로그로 호출별 요청 수/전송 바이트 집계 (측정용, 로그 버퍼 비용이 있어 기본값 끔)
+BROWSER_MEASURE_TRAFFIC = os.environ.get('BROWSER_MEASURE_TRAFFIC', '0').lower() not in ('0', 'false', 'no')
+
+# 모듈 수준 세션: Lambda 웜 호출 간 유지
+_driver = None
+_started_at = 0.0
+_uses = 0
+_stats = {"hits": 0, "misses": 0, "restarts": 0}
+
+
+def _child_pids(root_pid: int) -> List[int]:
+    """/proc를 읽어 root_pid와 모든 하위 프로세스 pid 반환"""
+    children: Dict[int, List[int]] = {}
+    try:
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # comm에 공백/괄호가 들어갈 수 있으므로 마지막 ')' 이후로 분리
+                    fields = f.read().rsplit(')', 1)[1].split()
+                children.setdefault(int(fields[1]), []).append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    except OSError:
+        return [root_pid]
+
+    pids = [root_pid]
+    i = 0
+    while i < len(pids):
+        pids.extend(children.get(pids[i], []))
+        i += 1
+    return pids
+
+
+def process_tree_rss_mb(root_pid: int) -> float:
+    """root_pid 프로세스 트리의 RSS 합계(MB)"""
+    total_kb = 0
+    for pid in _child_pids(root_pid):
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+
+def driver_rss_mb(driver) -> float:
+    """chromedriver와 Chrome 하위 프로세스의 RSS 합계(MB), 확인 불가 시 0"""
+    try:
+        return process_tree_rss_mb(driver.service.process.pid)
+    except Exception:
+        return 0.0
+
+
+def configure_options(options):
+    """Chrome 옵션에 창 크기, 페이지 로드 전략, 경량/저메모리 프로필, 트래픽 측정용 성능 로그 적용"""
+    options.page_load_strategy = BROWSER_PAGE_LOAD_STRATEGY
+    options.add_argument(f"--window-size={BROWSER_WINDOW_SIZE}")
+    if BROWSER_LEAN:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    if BROWSER_LOW_MEMORY:
+        for argument in LOW_MEMORY_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_argument(f"--js-flags=--max-old-space-size={BROWSER_JS_HEAP_MB} --max-semi-space-size=1")
+    if BROWSER_MEASURE_TRAFFIC:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def block_requests(driver):
+    """경량 프로필이면 CDP Network.setBlockedURLs로 패턴에 맞는 요청 차단 (세션 생성 후 1회)"""
+    if not BROWSER_LEAN or not BROWSER_BLOCKED_URLS:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(BROWSER_BLOCKED_URLS)})
+    except Exception as e:
+        print(f"요청 차단 설정 실패, 전체 리소스를 받습니다: {e}")
+
+
+def capture_page(driver) -> str:
+    """조회 결과 HTML - 저메모리 프로필이면 조회 영역만, 영역이 없거나 아니면 page_source 전체"""
+    if BROWSER_LOW_MEMORY:
+        try:
+            fragment = driver.execute_script(RATE_FRAGMENT_SCRIPT)
+            if fragment:
+                return fragment
+        except Exception as e:
+            print(f"조회 영역 추출 실패, page_source를 사용합니다: {e}")
+    return driver.page_source
+
+
+def active_driver_rss_mb() -> float:
+    """관리 중인 Chrome 세션 프로세스 트리의 RSS(MB), 세션이 없으면 0 (메모리 프로파일 표본용)"""
+    driver = _driver
+    return driver_rss_mb(driver) if driver is not None else 0.0
+
+
+def drain_traffic(driver) -> Dict[str, int]:
+    """마지막 호출 이후 성능 로그의 네트워크 이벤트로 요청 수, 전송 바이트, 차단 요청 수 집계 (측정 꺼짐이면 빈 dict)"""
+    if not BROWSER_MEASURE_TRAFFIC:
+        return {}
+    try:
+        entries = driver.get_log('performance')
+    except Exception:
+        return {}
+    stats = {"requests": 0, "bytes": 0, "blocked": 0}
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            stats["requests"] += 1
+        elif method == "Network.loadingFinished":
+            stats["bytes"] += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            stats["blocked"] += 1
+    return stats
+
+
+def is_driver_healthy(driver) -> bool:
+    """세션 생존 여부와 페이지 응답성 점검 후 default_content로 상태 초기화"""
+    try:
+        driver.set_script_timeout(BROWSER_HEALTH_TIMEOUT)
+        driver.switch_to.default_content()
+        return driver.execute_script("return document.readyState") is not None
+    except Exception as e:
+        print(f"브라우저 세션 점검 실패: {e}")
+        return False
+
+
+def _needs_restart(driver) -> Optional[str]:
+    """재사용 불가 사유 반환 (재사용 가능하면 None)"""
+    if _uses >= BROWSER_MAX_USES:
+        return f"사용 횟수 초과({_uses}회)"
+    if time.monotonic() - _started_at > BROWSER_MAX_AGE_SEC:
+        return "세션 수명 초과"
+    rss = driver_rss_mb(driver)
+    if rss > BROWSER_MAX_RSS_MB:
+        return f"메모리 초과({rss:.0f}MB)"
+    if not is_driver_healthy(driver):
+        return "세션 응답 없음"
+    return None
+
+
+def acquire_driver(factory: Callable[[], Any]):
+    """웜 세션이 정상이면 재사용하고, 없거나 비정상이면 factory로 새로 생성"""
+    global _driver, _started_at, _uses
+
+    if _driver is not None:
+        reason = _needs_restart(_driver)
+        if reason is None:
+            _stats["hits"] += 1
+            _uses += 1
+            print(f"브라우저 세션 재사용 ({_uses}회차)")
+            return _driver
+        print(f"브라우저 세션 재시작: {reason}")
+        _stats["restarts"] += 1
+        quit_driver()
+
+    _stats["misses"] += 1
+    _driver = factory()
+    _started_at = time.monotonic()
+    _uses = 1
+    return _driver
+
+
+def release_driver(driver=None):
+    """세션을 종료하지 않고 다음 호출을 위해 default_content로 되돌림 (저메모리 프로필이면 빈 페이지로 이동하여 DOM/JS 힙 반환)"""
+    driver = driver or _driver
+    if driver is None:
+        return
+    try:
+        driver.switch_to.default_content()
+        if BROWSER_LOW_MEMORY:
+            driver.get("about:blank")
+    except Exception:
+        pass
+
+
+def quit_driver():
+    """관리 중인 세션 종료"""
+    global _driver
+    if _driver is None:
+        return
+    try:
+        _driver.quit()
+    except Exception:
+        pass
+    _driver = None
+
+
+def get_session_stats() -> Dict[str, Any]:
+    """세션 재사용 적중/미적중/재시작 횟수"""
+    return {**_stats, "active": _driver is not None, "uses": _uses if _driver is not None else 0}
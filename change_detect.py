@@ -0,0 +1,100 @@
+import hashlib
+import os
+import re
+from typing import Dict, Optional, Set, Union
+
+# 변경 감지 사용 여부 (끄면 매 실행 파싱/저장)
+CHANGE_DETECTION = os.environ.get('CHANGE_DETECTION', '1').lower() not in ('0', 'false', 'no')
+
+# 지문 대상 영역: txtRateBox 좌측(기준일, 고시일시)과 tblBasic 본문
+# 우측(span.fr)의 조회시각은 조회마다 바뀌므로 제외
+RATE_BOX_FL_PATTERN = re.compile(
+    r'<p[^>]*class="[^"]*txtRateBox[^"]*"[^>]*>.*?<span[^>]*class="[^"]*\bfl\b[^"]*"[^>]*>(.*?)</span>',
+    re.IGNORECASE | re.DOTALL,
+)
+RATE_TABLE_BODY_PATTERN = re.compile(
+    r'<table[^>]*class="[^"]*tblBasic[^"]*"[^>]*>.*?<tbody[^>]*>(.*?)</tbody>',
+    re.IGNORECASE | re.DOTALL,
+)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+FINGERPRINT_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS crawl_fingerprints (
+    fetch_key CHAR(40) NOT NULL PRIMARY KEY,
+    content_hash CHAR(64) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# 웜 컨테이너에서 유지되는 마지막 지문 (fetch_key -> content_hash)
+_local_fingerprints: Dict[str, str] = {}
+# crawl_fingerprints 테이블 확인 여부 (컨테이너당 한 번만 CREATE TABLE 실행)
+_table_ready = False
+
+
+def fetch_key(currencies: Union[str, Set[str]], announcement_type: str) -> str:
+    """같은 조회 조건(대상 통화, 고시 구분)을 식별하는 키"""
+    currency_key = currencies if isinstance(currencies, str) else ','.join(sorted(currencies))
+    return hashlib.sha1(f"{announcement_type}:{currency_key}".encode('utf-8')).hexdigest()
+
+
+def fingerprint_page(html: str) -> Optional[str]:
+    """txtRateBox 헤더와 tblBasic 본문의 공백 정규화 SHA-256 (영역을 찾지 못하면 None)"""
+    header = RATE_BOX_FL_PATTERN.search(html)
+    body = RATE_TABLE_BODY_PATTERN.search(html)
+    if not header or not body:
+        return None
+    digest = hashlib.sha256()
+    digest.update(WHITESPACE_PATTERN.sub(' ', header.group(1)).strip().encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(WHITESPACE_PATTERN.sub(' ', body.group(1)).strip().encode('utf-8'))
+    return digest.hexdigest()
+
+
+def is_unchanged_locally(key: str, content_hash: str) -> bool:
+    """웜 컨테이너에 남아 있는 마지막 지문과 비교"""
+    return _local_fingerprints.get(key) == content_hash
+
+
+def remember(key: str, content_hash: str):
+    _local_fingerprints[key] = content_hash
+
+
+def _ensure_table(cursor):
+    global _table_ready
+    if not _table_ready:
+        cursor.execute(FINGERPRINT_TABLE_SQL)
+        _table_ready = True
+
+
+def load_fingerprint(connection, key: str) -> Optional[str]:
+    """DB에 저장된 마지막 지문 조회 (콜드 컨테이너용)"""
+    try:
+        with connection.cursor() as cursor:
+            _ensure_table(cursor)
+            cursor.execute("SELECT content_hash FROM crawl_fingerprints WHERE fetch_key = %s", (key,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+    except Exception as e:
+        print(f"지문 조회 실패: {e}")
+        return None
+
+
+def save_fingerprint(connection, key: str, content_hash: str) -> bool:
+    """저장이 끝난 페이지의 지문을 DB와 로컬에 기록"""
+    remember(key, content_hash)
+    try:
+        with connection.cursor() as cursor:
+            # force 실행은 조회 없이 바로 기록하므로 여기서도 테이블 확인
+            _ensure_table(cursor)
+            cursor.execute(
+                """
+                INSERT INTO crawl_fingerprints (fetch_key, content_hash) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE content_hash = VALUES(content_hash), updated_at = CURRENT_TIMESTAMP
+                """,
+                (key, content_hash),
+            )
+            return True
+    except Exception as e:
+        print(f"지문 저장 실패: {e}")
+        return False
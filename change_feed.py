@@ -0,0 +1,306 @@
+import argparse
+import fcntl
+import json
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from metrics import count, span
+from rate_lookup import load_latest_rates
+from rate_records import RATE_VALUE_COLUMNS, RateBatch, RateRecord
+
+# 환율 변경 피드(NDJSON) 위치 (빈 값이면 발행 안 함) - 여러 컨테이너가 함께 쓰려면 EFS 등 공유 경로
+CHANGE_FEED_DIR = os.environ.get('CHANGE_FEED_DIR', '')
+# 세그먼트 파일 하나에 담는 최대 이벤트 수 (파일 이름 = 첫 offset)
+CHANGE_FEED_SEGMENT_RECORDS = int(os.environ.get('CHANGE_FEED_SEGMENT_RECORDS', '10000'))
+# 변경 여부를 비교할 환율 값 필드 (쉼표 구분, 기본값: 환율 값 10개 전체)
+CHANGE_FEED_FIELDS = tuple(
+    name.strip() for name in os.environ.get('CHANGE_FEED_FIELDS', ','.join(RATE_VALUE_COLUMNS)).split(',')
+    if name.strip() in RATE_VALUE_COLUMNS
+)
+# 직전 저장 행을 찾을 때 거슬러 올라갈 최대 일수
+CHANGE_FEED_LOOKBACK_DAYS = int(os.environ.get('CHANGE_FEED_LOOKBACK_DAYS', '14'))
+# 추가할 때마다 fsync (끄면 OS 버퍼에 맡김)
+CHANGE_FEED_FSYNC = os.environ.get('CHANGE_FEED_FSYNC', '1').lower() not in ('0', 'false', 'no')
+
+# DECIMAL(15,4)/(15,6) 저장 값 기준으로 이보다 작은 차이는 변경으로 보지 않음
+VALUE_TOLERANCE = 1e-9
+
+# 이벤트 줄은 항상 offset으로 시작 (ChangeFeed.append)
+_OFFSET_PREFIX = b'{"offset":'
+_VALUE_INDEXES = {name: RateRecord._fields.index(name) for name in RATE_VALUE_COLUMNS}
+
+
+def feed_enabled() -> bool:
+    return bool(CHANGE_FEED_DIR)
+
+
+def _rate_key(record: RateRecord) -> Tuple[date, int]:
+    return record.base_date, record.announcement_sequence
+
+
+def load_previous_rows(connection, rates: RateBatch) -> Dict[str, RateRecord]:
+    """저장 전 통화별 가장 최근(기준일, 고시회차) 저장 행 - 배치의 가장 이른 기준일부터 LOOKBACK 일 전까지"""
+    if not rates:
+        return {}
+    since = min(rates.column("base_date")) - timedelta(days=CHANGE_FEED_LOOKBACK_DAYS)
+    codes = set(rates.column("currency_code"))
+    with span("change_feed"):
+        latest = load_latest_rates(connection, since)
+    return {code: record for code, record in latest.items() if code in codes}
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def diff_record(previous: Optional[RateRecord], record: RateRecord) -> Dict[str, Dict[str, Any]]:
+    """변경된 환율 값 필드별 이전/새 값, 절대 변화량, 변화율(%, 이전 값이 0이면 None)"""
+    changes: Dict[str, Dict[str, Any]] = {}
+    if previous is None:
+        return changes
+    for name in CHANGE_FEED_FIELDS:
+        index = _VALUE_INDEXES[name]
+        old, new = previous[index], record[index]
+        if old is None or new is None:
+            if old != new:
+                changes[name] = {"old": old, "new": new, "abs": None, "pct": None}
+            continue
+        delta = new - old
+        if abs(delta) <= VALUE_TOLERANCE:
+            continue
+        changes[name] = {
+            "old": old,
+            "new": new,
+            "abs": round(delta, 6),
+            "pct": round(delta / old * 100, 6) if old else None,
+        }
+    return changes
+
+
+def compute_changes(previous: Dict[str, RateRecord], rates: RateBatch) -> List[Dict[str, Any]]:
+    """배치의 각 행을 같은 통화의 직전 행(저장분 또는 배치 안 앞 회차)과 비교한 변경 이벤트 목록
+
+    op: insert(통화 첫 행) / announcement(새 기준일·회차) / correction(같은 기준일·회차 값 정정).
+    값이 같은 재저장과 직전 행보다 이른 기준일·회차(과거 이력 적재)는 이벤트를 만들지 않는다.
+    """
+    events: List[Dict[str, Any]] = []
+    latest = dict(previous)
+    for record in sorted(rates.records(), key=lambda r: (r.currency_code, r.base_date, r.announcement_sequence)):
+        prior = latest.get(record.currency_code)
+        if prior is not None and _rate_key(record) < _rate_key(prior):
+            continue
+        changes = diff_record(prior, record)
+        if prior is None:
+            op = "insert"
+        elif _rate_key(record) == _rate_key(prior):
+            if not changes:
+                continue
+            op = "correction"
+        else:
+            op = "announcement"
+        latest[record.currency_code] = record
+        events.append({
+            "op": op,
+            "currency_code": record.currency_code,
+            "base_date": record.base_date.isoformat(),
+            "announcement_sequence": record.announcement_sequence,
+            "announcement_type": record.announcement_type,
+            "announcement_datetime": _json_value(record.announcement_datetime),
+            "previous": None if prior is None else {
+                "base_date": prior.base_date.isoformat(),
+                "announcement_sequence": prior.announcement_sequence,
+            },
+            "changes": changes,
+            "values": {name: record[_VALUE_INDEXES[name]] for name in RATE_VALUE_COLUMNS},
+        })
+    return events
+
+
+class ChangeFeed:
+    """offset 순서로 이어지는 append-only NDJSON 세그먼트 파일 (segments/<첫 offset 20자리>.ndjson)
+
+    추가는 feed_dir/.lock 파일 잠금(flock)으로 프로세스 간에도 직렬화하여 offset이 빠짐없이 단조 증가한다.
+    읽기는 잠금 없이 완성된 줄만 반환한다 (쓰다 중단된 마지막 줄은 건너뜀).
+    """
+
+    def __init__(self, feed_dir: str = CHANGE_FEED_DIR, segment_records: int = CHANGE_FEED_SEGMENT_RECORDS):
+        self.feed_dir = feed_dir
+        self.segment_dir = os.path.join(feed_dir, 'segments')
+        self.segment_records = max(segment_records, 1)
+        self._lock = threading.Lock()
+
+    def _segments(self) -> List[int]:
+        """세그먼트 첫 offset 목록 (오름차순)"""
+        try:
+            names = os.listdir(self.segment_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(int(name[:-7]) for name in names if name.endswith('.ndjson') and name[:-7].isdigit())
+
+    def _segment_path(self, start: int) -> str:
+        return os.path.join(self.segment_dir, f"{start:020d}.ndjson")
+
+    @staticmethod
+    def _last_line_offset(path: str) -> Tuple[Optional[int], bool]:
+        """세그먼트 마지막 완성 줄의 offset과 파일이 줄바꿈으로 끝나는지 여부"""
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return None, True
+            f.seek(max(size - 65536, 0))
+            tail = f.read()
+        complete = tail.endswith(b'\n')
+        for line in reversed(tail.split(b'\n')):
+            try:
+                return json.loads(line)["offset"], complete
+            except (ValueError, KeyError, TypeError):
+                continue
+        return None, complete
+
+    def next_offset(self) -> int:
+        """다음에 쓸 offset (빈 피드면 0)"""
+        segments = self._segments()
+        for start in reversed(segments):
+            last, _ = self._last_line_offset(self._segment_path(start))
+            if last is not None:
+                return last + 1
+        return segments[-1] if segments else 0
+
+    def append(self, events: List[Dict[str, Any]]) -> Optional[Tuple[int, int]]:
+        """이벤트에 offset과 발행 시각을 붙여 추가하고 (첫 offset, 마지막 offset) 반환 (빈 목록이면 None)"""
+        if not events:
+            return None
+        os.makedirs(self.segment_dir, exist_ok=True)
+        with self._lock, open(os.path.join(self.feed_dir, '.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                offset = first = self.next_offset()
+                published_at = datetime.now().isoformat(timespec='milliseconds')
+                segments = self._segments()
+                start = segments[-1] if segments else 0
+                i = 0
+                while i < len(events):
+                    if offset - start >= self.segment_records:
+                        start = offset
+                    path = self._segment_path(start)
+                    room = self.segment_records - (offset - start)
+                    lines = []
+                    for event in events[i:i + room]:
+                        lines.append(json.dumps({"offset": offset, "published_at": published_at, **event},
+                                                ensure_ascii=False, separators=(',', ':')))
+                        offset += 1
+                    i += len(lines)
+                    with open(path, 'ab') as f:
+                        # 쓰다 중단된 줄이 있으면 줄바꿈으로 끊고 이어 씀
+                        if f.tell() and not self._last_line_offset(path)[1]:
+                            f.write(b'\n')
+                        f.write(('\n'.join(lines) + '\n').encode('utf-8'))
+                        f.flush()
+                        if CHANGE_FEED_FSYNC:
+                            os.fsync(f.fileno())
+                return first, offset - 1
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read(self, offset: int = 0, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """offset 이상의 이벤트를 순서대로 반환 (offset이 든 세그먼트부터 읽음)"""
+        segments = self._segments()
+        first = 0
+        for i, start in enumerate(segments):
+            if start <= offset:
+                first = i
+        returned = 0
+        for start in segments[first:]:
+            with open(self._segment_path(start), 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        # 아직 쓰는 중인 줄
+                        break
+                    # 앞부분의 offset만 읽어 건너뛸 줄은 JSON 파싱하지 않음
+                    if line.startswith(_OFFSET_PREFIX):
+                        end = line.find(b',', len(_OFFSET_PREFIX))
+                        if end > 0 and int(line[len(_OFFSET_PREFIX):end]) < offset:
+                            continue
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    if event.get("offset", -1) < offset:
+                        continue
+                    yield event
+                    returned += 1
+                    if limit is not None and returned >= limit:
+                        return
+
+    def tail(self, offset: int = 0, poll_sec: float = 1.0) -> Iterator[Dict[str, Any]]:
+        """offset부터 읽고, 끝에 이르면 poll_sec마다 새 이벤트를 기다려 이어서 반환"""
+        while True:
+            for event in self.read(offset):
+                offset = event["offset"] + 1
+                yield event
+            time.sleep(poll_sec)
+
+
+# 모듈 수준 피드: 웜 컨테이너 간 유지
+_feed: Optional[ChangeFeed] = None
+
+
+def get_feed() -> ChangeFeed:
+    global _feed
+    if _feed is None:
+        _feed = ChangeFeed()
+    return _feed
+
+
+def publish_changes(previous: Dict[str, RateRecord], rates: RateBatch) -> int:
+    """저장이 끝난 배치의 변경 이벤트를 피드에 추가하고 이벤트 수 반환 (실패는 저장 결과에 영향 없이 출력만)"""
+    with span("change_feed"):
+        events = compute_changes(previous, rates)
+        try:
+            appended = get_feed().append(events)
+        except OSError as e:
+            print(f"변경 피드 기록 실패: {e}")
+            return 0
+    if appended:
+        count("feed_events", len(events))
+    return len(events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="환율 변경 피드(NDJSON)를 offset부터 출력")
+    parser.add_argument('--feed-dir', default=CHANGE_FEED_DIR, help="변경 피드 위치")
+    parser.add_argument('--from-offset', type=int, default=0, help="이 offset부터 출력")
+    parser.add_argument('--limit', type=int, help="최대 출력 이벤트 수")
+    parser.add_argument('--follow', action='store_true', help="끝에 이르면 새 이벤트를 기다려 계속 출력")
+    parser.add_argument('--poll-sec', type=float, default=1.0, help="--follow 대기 간격(초)")
+    parser.add_argument('--next-offset', action='store_true', help="다음에 쓸 offset만 출력")
+    args = parser.parse_args()
+
+    if not args.feed_dir:
+        parser.error("--feed-dir 또는 CHANGE_FEED_DIR 필요")
+    feed = ChangeFeed(args.feed_dir)
+    if args.next_offset:
+        print(feed.next_offset())
+        return
+    events = feed.tail(args.from_offset, args.poll_sec) if args.follow else feed.read(args.from_offset, args.limit)
+    try:
+        for i, event in enumerate(events, 1):
+            sys.stdout.write(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n')
+            sys.stdout.flush()
+            if args.limit is not None and i >= args.limit:
+                break
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+
+
+if __name__ == '__main__':
+    main()
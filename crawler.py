@@ -1,30 +1,62 @@
 import os
-import re
 import time
-import pymysql
-from datetime import date, datetime
-from typing import List, Dict, Any, Optional
-
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.select import Select
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from datetime import datetime
+from typing import List, Dict, Any, NamedTuple, Optional, Set, Tuple, Union
+
+# Selenium, BeautifulSoup(rate_parser 내부), pymysql은 콜드 스타트 단축을 위해 필요한 경로에서만 import
+from browser import (
+    acquire_driver, active_driver_rss_mb, block_requests, capture_page, configure_options, drain_traffic,
+    get_session_stats, release_driver,
+)
+from change_feed import feed_enabled, load_previous_rows, publish_changes
+from change_detect import (
+    CHANGE_DETECTION, fetch_key, fingerprint_page, is_unchanged_locally, load_fingerprint, remember,
+    save_fingerprint,
+)
+from db_pool import acquire_connection, get_pool_stats, release_connection
+from http_fetcher import HTTP_TIMEOUT, RATE_FORM_URL, RATE_IFRAME_URL, fetch_rate_page
+from memory_profile import MEMORY_PROFILE, allocation_checkpoint, finish_profile, start_profile, trace_allocations
+from metrics import VERBOSE, count, log, span, start_run
+from page_archive import archive_page
+from rate_lookup import invalidate_rates
+from rate_parser import ALL_CURRENCIES, build_rate_batch, parse_rate_page
+from rate_records import RATE_COLUMNS, RateBatch, RateRecord, format_record
+from resilience import (
+    FETCH_RETRIES, SELENIUM_MIN_BUDGET_SEC, CircuitBreaker, backoff_delay, budget_from,
+    mark_partial, phase_timeout, start_deadline, time_allows,
+)
+from rollups import CREATE_ROLLUP_TABLE_SQL, load_stored_rows, rollups_enabled, update_rollups
+from spool import SPOOL_MODE, flush_spool, get_spool_stats, spool_depth, spool_enabled, spool_rates, spooled_sequence
 
 # 사용할 통화 코드
 CURRENCY = "USD"
+# 다중 통화 조회 시 대상 통화 (쉼표 구분 또는 "all", 미설정 시 CURRENCY만 조회)
+CURRENCIES = os.environ.get('CURRENCIES', '')
 ANNOUNCEMENT_SEQUENCE = 1
 ANNOUNCEMENT_TYPE = "FIRST"
-BASE_URL = "https://www.kebhana.com/cont/mall/mall15/mall1501/index.jsp"
+# 고시 수집 방식: first(최초 고시만) / intraday(당일 고시 전 회차, 저장된 회차 이후만 조회)
+ANNOUNCEMENT_MODE = os.environ.get('ANNOUNCEMENT_MODE', 'first')
+BASE_URL = os.environ.get('BASE_URL', "https://www.kebhana.com/cont/mall/mall15/mall1501/index.jsp")
+# 메인 페이지 대신 bankIframe 문서(RATE_IFRAME_URL)를 바로 열어 포털 페이지 로드를 생략
+SELENIUM_DIRECT_IFRAME = os.environ.get('SELENIUM_DIRECT_IFRAME', '0').lower() not in ('0', 'false', 'no')
+# Lambda 이미지의 Chrome/chromedriver 경로 (로컬 측정 시 교체)
+CHROME_BINARY = os.environ.get('CHROME_BINARY', "/opt/chrome/chrome")
+CHROMEDRIVER_PATH = os.environ.get('CHROMEDRIVER_PATH', "/opt/chromedriver")
+# 조회 방식: auto(HTTP 우선, 실패 시 Selenium) / http / selenium
+FETCH_MODE = os.environ.get('FETCH_MODE', 'auto')
 
 # RDS 연결 정보 (Lambda 환경변수에서 가져옴)
 DB_HOST = os.environ.get('DB_HOST')
 DB_USERNAME = os.environ.get('DB_USERNAME')
 DB_PASSWORD = os.environ.get('DB_PASSWORD')
 DB_NAME = os.environ.get('DB_NAME')
+# 다중 행 upsert 1회에 담을 최대 행 수
+DB_BATCH_SIZE = int(os.environ.get('DB_BATCH_SIZE', '500'))
+# 새 DB 연결 제한 시간(초) - 실행 예산이 부족하면 더 짧게
+DB_CONNECT_TIMEOUT = float(os.environ.get('DB_CONNECT_TIMEOUT', '10'))
+
+# 은행 사이트 연속 실패 시 조회를 쉬는 차단기 (웜 컨테이너 간 유지)
+SITE_BREAKER = CircuitBreaker("bank_site")
 
 
 def check_environment_variables():
@@ -46,11 +78,10 @@ def check_environment_variables():
     return True
 
 
-def get_db_connection():
-    """RDS MySQL 연결을 생성하여 반환"""
-    if not check_environment_variables():
-        return None
-        
+def _connect_db():
+    """RDS MySQL 연결을 새로 생성하여 반환"""
+    import pymysql
+
     try:
         connection = pymysql.connect(
             host=DB_HOST,
@@ -58,7 +89,8 @@ def get_db_connection():
             password=DB_PASSWORD,
             database=DB_NAME,
             charset='utf8mb4',
-            autocommit=True
+            autocommit=True,
+            connect_timeout=max(phase_timeout("db_connect", DB_CONNECT_TIMEOUT), 1),
         )
         return connection
     except Exception as e:
@@ -66,345 +98,680 @@ def get_db_connection():
         return None
 
 
-def insert_exchange_rate(connection, rate_data):
-    """환율 데이터를 DB에 삽입"""
+def get_db_connection():
+    """웜 컨테이너의 연결 풀에서 점검을 마친 RDS MySQL 연결을 빌려 반환 (사용 후 release_connection)"""
+    if not check_environment_variables():
+        return None
+    return acquire_connection(_connect_db)
+
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS exchange_rates (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    base_date DATE NOT NULL,
+    currency_code VARCHAR(10) NOT NULL,
+    announcement_sequence INT NOT NULL DEFAULT 1,
+    announcement_type VARCHAR(20) NOT NULL,
+    cash_buy DECIMAL(15, 4),
+    cash_buy_spread DECIMAL(10, 4),
+    cash_sell DECIMAL(15, 4),
+    cash_sell_spread DECIMAL(10, 4),
+    remit_send DECIMAL(15, 4),
+    remit_receive DECIMAL(15, 4),
+    check_sell DECIMAL(15, 4),
+    base_rate DECIMAL(15, 4),
+    exchange_fee_rate DECIMAL(10, 6),
+    conversion_rate DECIMAL(15, 6),
+    announcement_datetime DATETIME NULL,
+    query_datetime DATETIME NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uk_exchange_rates (base_date, currency_code, announcement_sequence)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# RateRecord 필드 순서의 위치 파라미터 upsert (유니크 키와 고시유형 외 컬럼 갱신)
+UPSERT_SQL = (
+    "INSERT INTO exchange_rates (" + ", ".join(RATE_COLUMNS) + ")\n"
+    "VALUES (" + ", ".join(["%s"] * len(RATE_COLUMNS)) + ")\n"
+    "ON DUPLICATE KEY UPDATE\n    "
+    + ",\n    ".join(f"{name} = VALUES({name})" for name in RATE_COLUMNS[4:])
+    + ",\n    updated_at = CURRENT_TIMESTAMP"
+)
+
+
+def create_table_if_not_exists(connection):
+    """exchange_rates 테이블(롤업이 켜져 있으면 rate_rollups도)이 없으면 생성"""
     try:
         with connection.cursor() as cursor:
-            sql = """
-            INSERT INTO exchange_rates (
-                base_date, currency_code, announcement_sequence, announcement_type,
-                cash_buy, cash_buy_spread, cash_sell, cash_sell_spread,
-                remit_send, remit_receive, check_sell, base_rate,
-                exchange_fee_rate, conversion_rate,
-                announcement_datetime, query_datetime
-            ) VALUES (
-                %(base_date)s, %(currency_code)s, %(announcement_sequence)s, %(announcement_type)s,
-                %(cash_buy)s, %(cash_buy_spread)s, %(cash_sell)s, %(cash_sell_spread)s,
-                %(remit_send)s, %(remit_receive)s, %(check_sell)s, %(rate)s,
-                %(exchange_fee_rate)s, %(conversion_rate)s,
-                %(announcement_datetime)s, %(query_datetime)s
-            )
-            ON DUPLICATE KEY UPDATE
-                cash_buy = VALUES(cash_buy),
-                cash_buy_spread = VALUES(cash_buy_spread),
-                cash_sell = VALUES(cash_sell),
-                cash_sell_spread = VALUES(cash_sell_spread),
-                remit_send = VALUES(remit_send),
-                remit_receive = VALUES(remit_receive),
-                check_sell = VALUES(check_sell),
-                base_rate = VALUES(base_rate),
-                exchange_fee_rate = VALUES(exchange_fee_rate),
-                conversion_rate = VALUES(conversion_rate),
-                announcement_datetime = VALUES(announcement_datetime),
-                query_datetime = VALUES(query_datetime),
-                updated_at = CURRENT_TIMESTAMP
-            """
-            
-            cursor.execute(sql, rate_data)
+            cursor.execute(CREATE_TABLE_SQL)
+            if rollups_enabled():
+                cursor.execute(CREATE_ROLLUP_TABLE_SQL)
             return True
+    except Exception as e:
+        print(f"테이블 생성 실패: {e}")
+        return False
+
+
+def insert_exchange_rate(connection, record: RateRecord):
+    """환율 데이터를 DB에 삽입 (롤업이 켜져 있으면 배치 저장과 같이 롤업과 한 트랜잭션으로)"""
+    if rollups_enabled():
+        return insert_exchange_rates_batch(connection, RateBatch([record])) is not None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(UPSERT_SQL, tuple(record))
+        invalidate_rates(RateBatch([record]))
+        return True
     except Exception as e:
         print(f"DB 삽입 실패: {e}")
         return False
 
 
+def insert_exchange_rates_batch(connection, rates: RateBatch,
+                                chunk_size: int = DB_BATCH_SIZE) -> Optional[List[Dict[str, int]]]:
+    """환율 데이터를 chunk_size 단위 다중 행 upsert로 한 트랜잭션에 저장하고 배치별 건수 반환 (실패 시 None)
+
+    롤업이 켜져 있으면 upsert 전 같은 키의 저장 값을 읽어 두었다가 같은 트랜잭션에서 rate_rollups를 갱신한다.
+    """
+    batch_results: List[Dict[str, int]] = []
+    if not rates:
+        return batch_results
+
+    try:
+        connection.begin()
+        with connection.cursor() as cursor:
+            stored = load_stored_rows(cursor, rates, chunk_size) if rollups_enabled() else None
+            for chunk in rates.chunks(chunk_size):
+                # executemany는 INSERT ... VALUES 구문을 하나의 다중 행 INSERT로 묶어 전송
+                cursor.executemany(UPSERT_SQL, chunk)
+                # ON DUPLICATE KEY UPDATE 영향 행 수는 신규 1, 갱신 2, 값이 같은 행 0이라 행별로 나눌 수 없음.
+                # (영향 행 수 - 행 수)는 변경 없는 행만큼 갱신을 적게, 신규를 많게 센 추정치
+                updated = min(max(cursor.rowcount - len(chunk), 0), len(chunk))
+                batch_results.append({
+                    "rows": len(chunk),
+                    "affected": cursor.rowcount,
+                    "inserted_approx": len(chunk) - updated,
+                    "updated_approx": updated,
+                })
+            if stored is not None:
+                update_rollups(cursor, rates, stored, chunk_size)
+        connection.commit()
+        # 같은 프로세스의 환율 조회 캐시가 저장 전 값을 돌려주지 않도록
+        invalidate_rates(rates)
+        return batch_results
+    except Exception as e:
+        print(f"DB 배치 저장 실패: {e}")
+        try:
+            connection.rollback()
+        except Exception:
+            pass
+        return None
+
+
+def write_rates(connection, rates: RateBatch,
+                chunk_size: int = DB_BATCH_SIZE) -> Optional[List[Dict[str, int]]]:
+    """배치 upsert로 저장하고, 변경 피드가 켜져 있으면 저장 전 통화별 직전 행과 비교한 변경분을 커밋 후 발행"""
+    previous = None
+    if feed_enabled() and rates:
+        try:
+            previous = load_previous_rows(connection, rates)
+        except Exception as e:
+            print(f"직전 환율 조회 실패로 변경 피드를 건너뜁니다: {e}")
+    batch_results = insert_exchange_rates_batch(connection, rates, chunk_size)
+    if batch_results is not None and previous is not None:
+        publish_changes(previous, rates)
+    return batch_results
+
+
+def get_latest_sequence(connection, base_date, currencies: Union[str, Set[str]]) -> int:
+    """기준일에 저장된 마지막 고시회차 (여러 통화면 가장 뒤처진 통화 기준, 없으면 0)"""
+    sql = ("SELECT currency_code, MAX(announcement_sequence) FROM exchange_rates "
+           "WHERE base_date = %s")
+    params: List[Any] = [base_date]
+    if currencies != ALL_CURRENCIES:
+        sql += " AND currency_code IN (" + ", ".join(["%s"] * len(currencies)) + ")"
+        params.extend(sorted(currencies))
+    sql += " GROUP BY currency_code"
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            latest = {row[0]: int(row[1] or 0) for row in cursor.fetchall()}
+    except Exception as e:
+        print(f"저장된 고시회차 조회 실패: {e}")
+        return 0
+    if not latest:
+        return 0
+    if currencies == ALL_CURRENCIES:
+        return max(latest.values())
+    return min(latest.get(code, 0) for code in currencies)
+
+
+def resolve_currencies(value=None) -> Union[str, Set[str]]:
+    """조회 대상 통화 결정 - "all" 또는 통화코드 집합 반환"""
+    if value is None or value == '':
+        value = CURRENCIES or CURRENCY
+    if isinstance(value, str):
+        if value.strip().lower() == ALL_CURRENCIES:
+            return ALL_CURRENCIES
+        value = value.split(',')
+    codes = {code.strip().upper() for code in value if code and code.strip()}
+    return codes or {CURRENCY}
+
+
 def handler(event=None, context=None):
-    success = crawler_target()
+    currencies = resolve_currencies((event or {}).get("currencies"))
+    mode = (event or {}).get("mode") or ANNOUNCEMENT_MODE
+    metrics = start_run(FetchMode=FETCH_MODE)
+    # 메모리 프로파일: 구간별 Python/Chrome 최대 RSS와 파싱 구간 상위 할당 위치
+    if MEMORY_PROFILE or (event or {}).get("memory_profile"):
+        start_profile(metrics, active_driver_rss_mb)
+    # Lambda 남은 실행 시간(로컬은 이벤트 deadline_ms)을 예산으로 단계별 제한 시간 결정
+    deadline = start_deadline(budget_from(event, context))
+    if mode == "flush":
+        result = CrawlResult(RateBatch(), unchanged=True)
+    elif mode == "intraday":
+        result = crawl_intraday(currencies)
+    else:
+        result = crawler_target(currencies, force=bool((event or {}).get("force")))
+    # 로컬 보관분을 남은 실행 시간에 DB로 반영 (fallback 모드에서 이번 실행이 DB 실패로 보관했으면 다음 실행에 반영)
+    if SPOOL_MODE == "always" or not result.spooled:
+        drain_spool()
+    pending = spool_depth() if result.spooled else 0
+    rates = result.rates
+    success = len(rates) > 0 or result.unchanged
+    metrics.count("rows", len(rates))
+    metrics.count("unchanged", int(result.unchanged))
+    metrics.count("partial", int(deadline.partial))
+    memory = finish_profile(metrics)
+    metrics.emit()
     
     status_code = 200 if success else 500
-    message = "크롤링 성공" if success else "크롤링 실패"
+    if mode == "flush":
+        message = "보관분 반영"
+    elif result.unchanged:
+        message = "변경 없음"
+    elif success and pending:
+        # DB에 아직 반영하지 못하고 로컬에 보관 (이후 실행에서 반영)
+        status_code = 202
+        message = "임시 저장"
+    elif success and deadline.partial:
+        # 시간 부족으로 일부 회차만 저장 (다음 실행에서 이어서 수집)
+        status_code = 207
+        message = "일부 저장"
+    else:
+        message = "크롤링 성공" if success else "크롤링 실패"
     
     return {
         "statusCode": status_code,
         "message": message,
-        "currency": CURRENCY,
+        "currency": currencies if currencies == ALL_CURRENCIES else ",".join(sorted(currencies)),
+        "count": len(rates),
+        "unchanged": result.unchanged,
+        "announcement_sequences": list(result.sequences),
+        "browser_session": get_session_stats(),
+        "db_pool": get_pool_stats(),
+        "deadline": deadline.summary(),
+        "site_circuit": SITE_BREAKER.snapshot(),
+        "spool": get_spool_stats(),
+        "metrics": metrics.summary(),
+        **({"memory": memory} if memory else {}),
         "timestamp": datetime.now().isoformat()
     }
 
 
-def crawler_target():
+def create_driver():
+    """Lambda 환경용 Chrome WebDriver 생성"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
     # Selenium 실행 옵션 설정 (Lambda 환경용)
     chrome_options = Options()
-    chrome_options.binary_location = "/opt/chrome/chrome"
+    chrome_options.binary_location = CHROME_BINARY
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--disable-software-rasterizer")
     chrome_options.add_argument("--single-process")
-    chrome_options.add_argument("window-size=1392x1150")
     chrome_options.add_argument(
         "user-agent=Mozilla/5.0 (Windows NT 6.1; WOW64; Trident/7.0; rv:11.0) like Gecko"
     )
+    # 창 크기, 페이지 로드 전략(eager), 이미지 비활성화 등 경량/저메모리 프로필
+    configure_options(chrome_options)
 
     # Lambda 전용 크롬 드라이버 경로 설정
-    service = Service(executable_path="/opt/chromedriver")
+    service = Service(executable_path=CHROMEDRIVER_PATH)
     driver = webdriver.Chrome(service=service, options=chrome_options)
+    # 이미지/폰트/CSS/미디어/분석 스크립트 요청 차단 (세션 재사용 동안 유지)
+    block_requests(driver)
+    return driver
+
+
+def select_currency_value(currencies: Union[str, Set[str]]) -> str:
+    """curCd 선택값 - 단일 통화면 해당 코드, 여러 통화/전체면 빈 값(전체 통화 목록)"""
+    if currencies != ALL_CURRENCIES and len(currencies) == 1:
+        return next(iter(currencies))
+    return ""
+
+
+def fetch_page_source_selenium(currencies: Union[str, Set[str]], announcement_type: str = ANNOUNCEMENT_TYPE,
+                               sequence: Optional[int] = None) -> Optional[str]:
+    """Selenium으로 메인 페이지 → bankIframe → 통화/고시 선택 후 page_source 반환"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.select import Select
+
+    from waits import (
+        WAIT_TIMEOUTS, find_rate_table, select_announcement, wait_for_bank_iframe, wait_for_rate_form,
+        wait_for_rate_table,
+    )
+
+    currency_value = select_currency_value(currencies)
+    # 웜 컨테이너에서는 이전 호출의 Chrome 세션을 점검 후 재사용
+    with span("driver_start"):
+        driver = acquire_driver(create_driver)
+    # 이전 호출에서 남은 네트워크 이벤트 비우기 (트래픽 측정 시)
+    drain_traffic(driver)
 
-    success = False
-    
-    # 크롤링 로직 구현
     try:
-        print(f"환율 정보 크롤링 시작: {BASE_URL}")
+        start_url = RATE_IFRAME_URL if SELENIUM_DIRECT_IFRAME else BASE_URL
+        log(f"환율 정보 크롤링 시작: {start_url}")
 
-        print("=" * 50)
-        print("메인 페이지 접속")
-        print("=" * 50)
+        log("=" * 50)
+        log("bankIframe 문서 직접 접속" if SELENIUM_DIRECT_IFRAME else "메인 페이지 접속")
+        log("=" * 50)
 
-        driver.get(BASE_URL)
-        time.sleep(3)
+        with span("page_load"):
+            driver.set_page_load_timeout(phase_timeout("selenium", WAIT_TIMEOUTS["page_load"]))
+            driver.get(start_url)
 
-        print(f"페이지 제목: {driver.title}")
-        print(f"현재 URL: {driver.current_url}")
+        log(f"페이지 제목: {driver.title}")
+        log(f"현재 URL: {driver.current_url}")
 
-        # iframe으로 전환
-        print("\n" + "=" * 50)
-        print("iframe으로 전환")
-        print("=" * 50)
+        if SELENIUM_DIRECT_IFRAME:
+            # 조회 폼 문서를 직접 열었으므로 iframe 전환 없이 폼만 대기
+            with span("iframe_switch"):
+                wait_for_rate_form(driver)
+        else:
+            # iframe으로 전환
+            log("\n" + "=" * 50)
+            log("iframe으로 전환")
+            log("=" * 50)
 
-        wait = WebDriverWait(driver, 10)
-        iframe = wait.until(EC.presence_of_element_located((By.ID, "bankIframe")))
-        driver.switch_to.frame('bankIframe')
-        time.sleep(2)
+            # bankIframe이 준비되면 전환 후 조회 폼(curCd)이 나타날 때까지 대기
+            with span("iframe_switch"):
+                wait_for_bank_iframe(driver)
 
-        print("iframe 전환 완료")
-        print(f"iframe 내 페이지 제목: {driver.title}")
-        print(f"iframe 내 현재 URL: {driver.current_url}")
+            log("iframe 전환 완료")
+            log(f"iframe 내 페이지 제목: {driver.title}")
+            log(f"iframe 내 현재 URL: {driver.current_url}")
 
-        # CURRENCY 선택 후 조회
-        print("\n" + "=" * 50)
-        print(f"{CURRENCY} 선택 및 조회")
-        print("=" * 50)
+        # 통화 선택 후 조회
+        log("\n" + "=" * 50)
+        log(f"{currency_value or '전체 통화'} 선택 및 조회")
+        log("=" * 50)
 
-        try:
-            # CURRENCY 선택
+        with span("currency_select"):
+            # 조회 전 테이블 (조회 결과로 교체되는 시점 감지용)
+            previous_table = find_rate_table(driver)
+
+            # 통화 선택 (빈 값은 전체 통화)
             select = Select(driver.find_element(By.NAME, "curCd"))
-            select.select_by_value(CURRENCY)
-            time.sleep(1)
+            select.select_by_value(currency_value)
 
-            # 최초 고시(라디오) 선택
-            try:
-                first_rate_radio = driver.find_element(By.XPATH, '//*[@id="inqFrm"]/table/tbody/tr[3]/td/div/label[1]')
-                first_rate_radio.click()
-                time.sleep(2)
-            except Exception:
-                pass
+            # 고시 구분(라디오)과 회차 선택 - 실패해도 현재 선택으로 진행
+            select_announcement(driver, announcement_type, sequence)
 
-            # 페이지 소스 로드
-            html = driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
+            # tblBasic/txtRateBox가 선택한 통화·고시로 갱신되는 즉시 진행
+            if not wait_for_rate_table(driver, currency_value, previous_table):
+                print("환율 테이블 대기 시간 초과, 현재 페이지로 진행합니다")
 
-        except Exception as e:
-            print(f"{CURRENCY} 조회 중 오류 발생: {e}")
+        # 페이지 소스 로드 (저메모리 프로필은 조회 영역만)
+        page_source = capture_page(driver)
 
-        # 환율 데이터 파싱
-        print("\n" + "=" * 50)
-        print("실제 환율 데이터 파싱 (HTML 구조 기반)")
-        print("=" * 50)
-
-        rates: List[Dict[str, Any]] = []
-
-        # Helper parsers for KR date/time strings
-        def parse_date_kr(text: str) -> Optional[date]:
-            m = re.search(r'(\d{4})년\s*(\d{2})월\s*(\d{2})일', text)
-            if not m:
-                return None
-            return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
-
-        def parse_time_kr(text: str) -> Optional[tuple]:
-            m = re.search(r'(\d{2})시\s*(\d{2})분\s*(\d{2})초', text)
-            if not m:
-                return None
-            return int(m.group(1)), int(m.group(2)), int(m.group(3))
-
-        def parse_datetime_full(text: str) -> Optional[datetime]:
-            d = parse_date_kr(text)
-            t = parse_time_kr(text)
-            if d and t:
-                return datetime(d.year, d.month, d.day, t[0], t[1], t[2])
-            return None
+        traffic = drain_traffic(driver)
+        if traffic:
+            log(f"네트워크: 요청 {traffic['requests']}건 (차단 {traffic['blocked']}건), {traffic['bytes']:,} bytes")
+            count("page_requests", traffic["requests"])
+            count("page_blocked", traffic["blocked"])
+            count("page_bytes", traffic["bytes"])
+        return page_source
 
-        # 실제 기준일, 고시일시, 조회시각 파싱
-        base_date: date = date.today()
-        announcement_dt: Optional[datetime] = None
-        query_dt: Optional[datetime] = None
-        
-        try:
-            search_content_div = soup.find('div', id='searchContentDiv')
-            if search_content_div:
-                txt_rate_box = search_content_div.find('p', class_='txtRateBox')
-                if txt_rate_box:
-                    # 좌측(span.fl): 기준일, 고시일시
-                    fl_span = txt_rate_box.find('span', class_='fl')
-                    if fl_span:
-                        # 기준일
-                        em_base = fl_span.find('em', string=lambda s: s and '기준일' in s)
-                        if em_base:
-                            strongs = []
-                            for sib in em_base.next_siblings:
-                                if getattr(sib, 'name', None) == 'strong':
-                                    strongs.append(sib)
-                                if len(strongs) >= 1:
-                                    break
-                            if strongs:
-                                bd = parse_date_kr(strongs[0].get_text())
-                                if bd:
-                                    base_date = bd
-                        # 고시일시
-                        em_ann = fl_span.find('em', string=lambda s: s and '고시일시' in s)
-                        if em_ann:
-                            strongs = []
-                            for sib in em_ann.next_siblings:
-                                if getattr(sib, 'name', None) == 'strong':
-                                    strongs.append(sib)
-                                if len(strongs) >= 3:
-                                    break
-                            if strongs:
-                                ann_date = parse_date_kr(strongs[0].get_text())
-                                ann_time_tuple = parse_time_kr(strongs[1].get_text()) if len(strongs) > 1 else None
-                                if ann_date and ann_time_tuple:
-                                    announcement_dt = datetime(ann_date.year, ann_date.month, ann_date.day,
-                                                               ann_time_tuple[0], ann_time_tuple[1], ann_time_tuple[2])
-                    # 우측(span.fr): 조회시각
-                    fr_span = txt_rate_box.find('span', class_='fr')
-                    if fr_span:
-                        em_query = fr_span.find('em', string=lambda s: s and '조회시각' in s)
-                        if em_query:
-                            strong = None
-                            for sib in em_query.next_siblings:
-                                if getattr(sib, 'name', None) == 'strong':
-                                    strong = sib
-                                    break
-                            if strong:
-                                qdt = parse_datetime_full(strong.get_text())
-                                if qdt:
-                                    query_dt = qdt
-        except Exception as e:
-            print(f"날짜 파싱 중 오류 발생: {e}, 오늘 날짜를 사용합니다.")
-
-        rate_table = soup.find('table', class_='tblBasic')
-
-        if rate_table:
-            tbody = rate_table.find('tbody')
-            if tbody:
-                rows = tbody.find_all('tr')
-                for row in rows:
-                    cells = row.find_all('td')
-                    if len(cells) >= 11:
-                        currency_cell = cells[0]
-                        currency_link = currency_cell.find('a')
-                        currency_text = currency_link.get_text().strip() if currency_link else currency_cell.get_text().strip()
-                        if CURRENCY in currency_text:
-                            print(f"{CURRENCY} 행 발견: {currency_text}")
-                            
-                            def parse_float_safe(cell) -> float:
-                                if cell is None:
-                                    return 0.0
-                                try:
-                                    txt = cell.get_text().strip()
-                                except AttributeError:
-                                    return 0.0
-                                if not txt or txt in ['', '-', 'N/A', 'null', 'None', '0.00', '0']:
-                                    return 0.0
-                                try:
-                                    cleaned_txt = txt.replace(',', '').strip()
-                                    return float(cleaned_txt)
-                                except (ValueError, AttributeError):
-                                    return 0.0
-
-                            cash_buy = parse_float_safe(cells[1])
-                            cash_buy_spread = parse_float_safe(cells[2])
-                            cash_sell = parse_float_safe(cells[3])
-                            cash_sell_spread = parse_float_safe(cells[4])
-                            remit_send = parse_float_safe(cells[5])
-                            remit_receive = parse_float_safe(cells[6])
-                            check_sell = parse_float_safe(cells[7])
-                            base_rate = parse_float_safe(cells[8])
-                            exchange_fee_rate = parse_float_safe(cells[9])
-                            conversion_rate = parse_float_safe(cells[10])
-
-                            rate_entry = {
-                                "base_date": base_date,
-                                "currency_code": CURRENCY,
-                                "announcement_sequence": ANNOUNCEMENT_SEQUENCE,
-                                "announcement_type": ANNOUNCEMENT_TYPE,
-                                "cash_buy": cash_buy,
-                                "cash_buy_spread": cash_buy_spread,
-                                "cash_sell": cash_sell,
-                                "cash_sell_spread": cash_sell_spread,
-                                "remit_send": remit_send,
-                                "remit_receive": remit_receive,
-                                "check_sell": check_sell,
-                                "rate": base_rate,
-                                "exchange_fee_rate": exchange_fee_rate,
-                                "conversion_rate": conversion_rate,
-                                "announcement_datetime": announcement_dt,
-                                "query_datetime": query_dt
-                            }
-
-                            rates.append(rate_entry)
-                            print(f"  -> {CURRENCY} 파싱 완료")
-                            break
-
-        print("\n" + "=" * 50)
-        print("최종 크롤링 결과")
-        print("=" * 50)
-        for rate in rates:
-            print(f"\n{rate['currency_code']} 환율 정보:")
-            print(f"  기준일: {rate['base_date']}")
-            print(f"  통화코드: {rate['currency_code']}")
-            print(f"  고시차수: {rate['announcement_sequence']}")
-            print(f"  고시유형: {rate['announcement_type']}")
-            print(f"  현찰 살 때 환율: {rate['cash_buy']} (Spread: {rate['cash_buy_spread']})")
-            print(f"  현찰 팔 때 환율: {rate['cash_sell']} (Spread: {rate['cash_sell_spread']})")
-            print(f"  송금 보낼 때 환율: {rate['remit_send']}")
-            print(f"  송금 받을 때 환율: {rate['remit_receive']}")
-            print(f"  외화 수표 팔 때 환율: {rate['check_sell']}")
-            print(f"  매매기준율: {rate['rate']}")
-            print(f"  환가료율: {rate['exchange_fee_rate']}")
-            print(f"  미화 환산율: {rate['conversion_rate']}")
-            print(f"  고시일시: {rate['announcement_datetime']}")
-            print(f"  조회시각: {rate['query_datetime']}")
-
-        # 데이터베이스에 저장
-        print("\n" + "=" * 50)
-        print("데이터베이스 저장 시작")
-        print("=" * 50)
-        
-        connection = get_db_connection()
-        if connection:
+    except Exception as e:
+        print(f"{currency_value or '전체 통화'} 조회 중 오류 발생: {e}")
+        return None
+    finally:
+        # 종료하지 않고 iframe에서 나와 다음 호출을 위해 유지
+        release_driver(driver)
+
+
+def _fetch_page_http(currencies: Union[str, Set[str]], announcement_type: str,
+                     sequence: Optional[int]) -> Tuple[Optional[str], bool]:
+    """HTTP 조회를 실행 예산 안에서 지수 백오프로 재시도하고 (HTML, 시간 부족으로 중단했는지) 반환"""
+    # Selenium 대체 조회를 할 수 있을 때만 그 몫을 남기고, 아니면 남은 시간을 모두 HTTP 조회에 사용
+    phase = "http_fetch" if FETCH_MODE == "auto" and time_allows(SELENIUM_MIN_BUDGET_SEC) else "http_only"
+    for attempt in range(FETCH_RETRIES + 1):
+        timeout = phase_timeout(phase, HTTP_TIMEOUT)
+        if timeout < 1:
+            print("남은 실행 시간이 부족하여 HTTP 조회를 중단합니다")
+            return None, True
+        with span("http_fetch"):
+            html = fetch_rate_page(select_currency_value(currencies), announcement_type, sequence=sequence,
+                                   timeout=timeout)
+        if html or attempt == FETCH_RETRIES:
+            return html, False
+        delay = backoff_delay(attempt)
+        if not time_allows(delay + HTTP_TIMEOUT):
+            print("남은 실행 시간이 부족하여 HTTP 조회 재시도를 중단합니다")
+            return None, True
+        count("http_retries")
+        time.sleep(delay)
+    return None, False
+
+
+def fetch_page_http(currencies: Union[str, Set[str]], announcement_type: str = ANNOUNCEMENT_TYPE,
+                    sequence: Optional[int] = None) -> Optional[str]:
+    """HTTP 조회를 실행 예산 안에서 지수 백오프로 재시도 (시간 부족으로 중단하면 실행을 일부 수행으로 기록)"""
+    html, cut_short = _fetch_page_http(currencies, announcement_type, sequence)
+    if cut_short:
+        mark_partial()
+    return html
+
+
+def fetch_page_source(currencies: Union[str, Set[str]], announcement_type: str = ANNOUNCEMENT_TYPE,
+                      sequence: Optional[int] = None) -> Optional[str]:
+    """FETCH_MODE에 따라 HTTP 조회를 먼저 시도하고, 실패 시 Selenium으로 대체
+
+    은행 사이트가 연속으로 실패하면 차단기가 열려 cooldown 동안 바로 None을 반환하고,
+    남은 실행 시간이 SELENIUM_MIN_BUDGET_SEC보다 적으면 Selenium 대체 조회를 생략한다.
+    실행 시간 부족으로 중단한 조회는 차단기 실패로 세지 않는다.
+    """
+    if not SITE_BREAKER.allow():
+        print("은행 사이트 연속 실패로 조회를 잠시 중단합니다 (차단기 열림)")
+        count("circuit_rejected")
+        return None
+
+    html = None
+    source = "http"
+    # 이번 조회가 실행 시간 부족으로 중단되었는지 (실행 전체의 partial 표시는 앞선 조회의 중단도 포함하므로 따로 판단)
+    cut_short = False
+    if FETCH_MODE in ("auto", "http"):
+        log("=" * 50)
+        log(f"HTTP 조회: {RATE_FORM_URL}")
+        log("=" * 50)
+
+        html, cut_short = _fetch_page_http(currencies, announcement_type, sequence)
+        if html:
+            log("HTTP 조회 완료")
+        elif FETCH_MODE == "auto":
+            print("HTTP 조회 실패, Selenium으로 재시도합니다")
+            count("retries")
+
+    if not html and FETCH_MODE != "http":
+        source = "selenium"
+        if not time_allows(SELENIUM_MIN_BUDGET_SEC):
+            print("남은 실행 시간이 부족하여 Selenium 조회를 생략합니다")
+            count("deadline_skips")
+            cut_short = True
+        else:
+            # Selenium까지 시도했으면 그 결과가 이번 조회의 판정 (HTTP 중단은 Selenium이 이어받음)
+            cut_short = False
             try:
-                # 테이블이 없으면 생성
-                if create_table_if_not_exists(connection):
-                    insert_success_count = 0
-                    for rate in rates:
-                        if insert_exchange_rate(connection, rate):
-                            insert_success_count += 1
-                    
-                    print(f"DB 저장 완료: {insert_success_count}/{len(rates)}건")
-                else:
-                    print("테이블 생성 실패로 인해 데이터 저장을 건너뜁니다")
-                        
+                html = fetch_page_source_selenium(currencies, announcement_type, sequence)
             except Exception as e:
-                print(f"DB 저장 오류: {e}")
-            finally:
-                connection.close()
-                print("데이터베이스 연결 종료")
+                print(f"WebDriver 실행 실패: {e}")
+
+    if not html:
+        # 실행 시간 부족으로 중단한 조회는 사이트 장애로 보지 않음 (half_open 시험 호출이었으면 반납)
+        if cut_short:
+            mark_partial()
+            SITE_BREAKER.release()
         else:
-            print("DB 연결 실패")
+            SITE_BREAKER.record_failure()
+        return None
+    SITE_BREAKER.record_success()
+    archive_page(html, source, currencies, announcement_type, sequence)
+    return html
 
-        # iframe에서 나오기
-        try:
-            driver.switch_to.default_content()
-        except Exception:
-            pass
 
-        # 결과 확인
-        success = len(rates) > 0
-        
+def store_rates(connection, rates: RateBatch) -> bool:
+    """테이블 확인 후 배치 upsert로 저장 (성공 여부 반환)"""
+    log("\n" + "=" * 50)
+    log("데이터베이스 저장 시작")
+    log("=" * 50)
+
+    try:
+        # 테이블이 없으면 생성
+        if not create_table_if_not_exists(connection):
+            print("테이블 생성 실패로 인해 데이터 저장을 건너뜁니다")
+            return False
+        with span("db_write"):
+            batch_results = write_rates(connection, rates)
+        if batch_results is None:
+            log(f"DB 저장 완료: 0/{len(rates)}건")
+            return False
+        insert_success_count = sum(b["rows"] for b in batch_results)
+        for i, b in enumerate(batch_results, 1):
+            log(f"  배치 {i}: 영향 행 {b['affected']} (신규 약 {b['inserted_approx']}건, 갱신 약 {b['updated_approx']}건)")
+        log(f"DB 저장 완료: {insert_success_count}/{len(rates)}건")
+        return True
+    except Exception as e:
+        print(f"DB 저장 오류: {e}")
+        return False
+
+
+def drain_spool(connection=None) -> Optional[Dict[str, Any]]:
+    """로컬 보관분을 남은 실행 시간 안에서 보관 순서대로 DB에 반영 (connection이 없으면 풀에서 빌림)"""
+    if not spool_enabled() or not spool_depth():
+        return None
+    borrowed = connection is None
+    if borrowed:
+        with span("db_connect"):
+            connection = get_db_connection()
+        if not connection:
+            print("DB 연결 실패로 로컬 보관분을 다음 실행에서 반영합니다")
+            return None
+    try:
+        if not create_table_if_not_exists(connection):
+            return None
+        result = flush_spool(connection, write_rates, should_continue=lambda: time_allows(1))
+    finally:
+        if borrowed:
+            release_connection(connection)
+    log(f"로컬 보관분 반영: {result['rows']}건 ({result['rows_per_sec']} 행/s), 남은 {spool_depth()}건")
+    return result
+
+
+def persist_rates(connection, rates: RateBatch) -> str:
+    """DB에 저장하거나 로컬 보관소에 보관하고 결과 반환 (stored / spooled / failed)
+
+    보관분이 남아 있으면 새 환율도 보관한 뒤 보관 순서대로 반영하여 오래된 보관 값이 새 값을 덮어쓰지 않게 하고,
+    SPOOL_MODE=always면 DB에 쓰지 않고 보관만 한다 (반영은 handler가 남은 실행 시간에).
+    """
+    if not spool_enabled():
+        return "stored" if connection and store_rates(connection, rates) else "failed"
+    if connection and SPOOL_MODE != "always" and not spool_depth() and store_rates(connection, rates):
+        return "stored"
+    if not spool_rates(rates):
+        return "failed"
+    log(f"로컬 보관: {len(rates)}건")
+    if connection and SPOOL_MODE != "always":
+        drained = drain_spool(connection)
+        if drained and drained["ok"] and not spool_depth():
+            return "stored"
+    return "spooled"
+
+
+class CrawlResult(NamedTuple):
+    """crawler_target 실행 결과"""
+    rates: RateBatch
+    # 마지막으로 저장한 환율표와 같아 파싱/저장을 생략했는지 여부
+    unchanged: bool = False
+    # 이번 실행에서 수집한 고시회차
+    sequences: Tuple[int, ...] = ()
+    # DB에 반영하지 못하고 로컬 보관소에 보관했는지 여부
+    spooled: bool = False
+
+
+def crawler_target(currencies: Union[str, Set[str], None] = None, force: bool = False) -> CrawlResult:
+    """대상 통화들의 환율을 한 번의 페이지 조회로 수집하여 DB에 저장하고 수집 결과 반환"""
+    if currencies is None:
+        currencies = resolve_currencies()
+
+    rates = RateBatch()
+    connection = None
+    spooled = False
+    
+    # 크롤링 로직 구현
+    try:
+        html = fetch_page_source(currencies)
+        if not html:
+            print("환율 페이지를 가져오지 못했습니다")
+            return CrawlResult(rates)
+
+        # 변경 감지: 웜 컨테이너의 마지막 지문과 비교
+        key = fetch_key(currencies, ANNOUNCEMENT_TYPE)
+        content_hash = None
+        if CHANGE_DETECTION:
+            with span("change_detect"):
+                content_hash = fingerprint_page(html)
+            if not force and content_hash and is_unchanged_locally(key, content_hash):
+                log("이전 조회와 같은 환율표입니다 (파싱/저장 생략)")
+                return CrawlResult(rates, unchanged=True)
+
+        # always 모드는 DB 연결을 기다리지 않고 보관 (DB 반영은 handler가 남은 시간에)
+        if SPOOL_MODE != "always" or not spool_enabled():
+            with span("db_connect"):
+                connection = get_db_connection()
+
+        # 콜드 컨테이너는 DB에 저장된 지문과 비교
+        if not force and content_hash and connection:
+            with span("change_detect"):
+                stored_hash = load_fingerprint(connection, key)
+            if stored_hash == content_hash:
+                remember(key, content_hash)
+                log("마지막 저장분과 같은 환율표입니다 (파싱/저장 생략)")
+                return CrawlResult(rates, unchanged=True)
+
+        # 환율 데이터 파싱
+        log("\n" + "=" * 50)
+        log("실제 환율 데이터 파싱 (HTML 구조 기반)")
+        log("=" * 50)
+
+        with span("parse"), trace_allocations("parse"):
+            page = parse_rate_page(html, currencies, allocation_checkpoint)
+            build_rate_batch(page, ANNOUNCEMENT_SEQUENCE, ANNOUNCEMENT_TYPE, rates)
+        # 행을 추출했으면 원본 HTML은 DB 저장 동안 들고 있지 않음
+        html = None
+        for row in page.rows if VERBOSE else ():
+            log(f"{row.currency_code} 행 발견: {row.currency_text}")
+
+        log("\n" + "=" * 50)
+        log("최종 크롤링 결과")
+        log("=" * 50)
+        for rate in rates if VERBOSE else ():
+            log(f"\n{rate.currency_code} 환율 정보:")
+            for line in format_record(rate):
+                log(f"  {line}")
+
+        # 데이터베이스에 저장 (실패 시 로컬 보관)
+        if not connection and (SPOOL_MODE != "always" or not spool_enabled()):
+            print("DB 연결 실패")
+        status = persist_rates(connection, rates)
+        if status == "failed":
+            # 저장도 보관도 못 했으면 당일 고시 수집과 같이 수집 건수 없이 실패로 반환
+            return CrawlResult(RateBatch())
+        spooled = status == "spooled"
+        if spooled and content_hash and rates:
+            # 보관한 환율표도 웜 컨테이너에서는 다시 파싱하지 않음
+            remember(key, content_hash)
+        elif status == "stored" and content_hash and rates:
+            # 저장이 끝난 환율표만 다음 비교 기준으로 기록
+            save_fingerprint(connection, key, content_hash)
+
     except Exception as e:
         print(f"크롤링 중 오류 발생: {str(e)}")
+    finally:
+        if connection:
+            release_connection(connection)
+            log("데이터베이스 연결 반환")
         
     # 크롤링 로직 구현 완료 
     
-    driver.quit()
-    return success
\ No newline at end of file
+    return CrawlResult(rates, sequences=tuple(sorted(set(rates.column("announcement_sequence")))), spooled=spooled)
+
+
+def crawl_intraday(currencies: Union[str, Set[str], None] = None) -> CrawlResult:
+    """당일 최종 고시로 마지막 회차를 확인하고, 저장된 회차 이후의 고시만 회차별로 조회하여 저장"""
+    if currencies is None:
+        currencies = resolve_currencies()
+
+    rates = RateBatch()
+    connection = None
+    spooled = False
+    try:
+        html = fetch_page_source(currencies, "LAST")
+        if not html:
+            print("최종 고시 페이지를 가져오지 못했습니다")
+            return CrawlResult(rates)
+        with span("parse"), trace_allocations("parse"):
+            latest_page = parse_rate_page(html, currencies, allocation_checkpoint)
+        html = None
+        header = latest_page.header
+        if not header.announcement_sequence:
+            print("고시회차를 찾을 수 없어 당일 고시 수집을 건너뜁니다")
+            return CrawlResult(rates)
+
+        with span("db_connect"):
+            connection = get_db_connection()
+        if not connection:
+            print("DB 연결 실패")
+            if not spool_enabled():
+                return CrawlResult(rates)
+        elif not create_table_if_not_exists(connection):
+            return CrawlResult(rates)
+
+        base_date = header.base_date or datetime.now().date()
+        # DB에 아직 반영하지 않은 보관 회차도 저장된 것으로 보고 그 이후만 조회
+        stored_sequence = max(get_latest_sequence(connection, base_date, currencies) if connection else 0,
+                              spooled_sequence(base_date, currencies) if spool_enabled() else 0)
+        log(f"{base_date} 고시회차: 저장 {stored_sequence}회차, 최신 {header.announcement_sequence}회차")
+        if stored_sequence >= header.announcement_sequence:
+            return CrawlResult(rates, unchanged=True)
+
+        # 최종 고시는 이미 받았으므로 그 사이 회차만 추가 조회 (요청한 회차와 페이지를 함께 보관)
+        pages = []
+        for sequence in range(stored_sequence + 1, header.announcement_sequence):
+            if not time_allows(HTTP_TIMEOUT):
+                mark_partial()
+                html = None
+            else:
+                html = fetch_page_source(currencies, "SEQUENCE", sequence)
+            if not html:
+                # 받은 회차까지만 저장 (최종 고시도 빼서 다음 실행이 빠진 회차부터 이어서 조회)
+                if not time_allows(HTTP_TIMEOUT):
+                    print(f"남은 실행 시간이 부족하여 {sequence}회차부터는 다음 실행에서 수집합니다")
+                else:
+                    print(f"{sequence}회차 고시를 가져오지 못해 {sequence}회차부터는 다음 실행에서 수집합니다")
+                break
+            with span("parse"), trace_allocations("parse"):
+                pages.append((sequence, parse_rate_page(html, currencies, allocation_checkpoint)))
+            html = None
+        else:
+            pages.append((header.announcement_sequence, latest_page))
+
+        for requested_sequence, page in pages:
+            sequence = page.header.announcement_sequence or requested_sequence
+            build_rate_batch(page, sequence, "FIRST" if sequence == 1 else "SEQUENCE", rates)
+        count("announcements", len(pages))
+
+        status = persist_rates(connection, rates)
+        if status == "failed":
+            return CrawlResult(RateBatch())
+        spooled = status == "spooled"
+    except Exception as e:
+        print(f"당일 고시 수집 중 오류 발생: {e}")
+    finally:
+        release_connection(connection)
+
+    return CrawlResult(rates, sequences=tuple(sorted(set(rates.column("announcement_sequence")))), spooled=spooled)
\ No newline at end of file
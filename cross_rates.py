@@ -0,0 +1,143 @@
+from datetime import date
+from typing import TYPE_CHECKING, Dict, NamedTuple, Optional, Tuple
+
+from rate_records import RATE_COLUMNS, RateBatch
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# 100단위로 고시되는 통화 ("일본 JPY (100)" 등) - 매매기준율/현찰/송금 환율은 100단위 원화 금액
+CURRENCY_UNITS: Dict[str, int] = {"JPY": 100, "IDR": 100, "VND": 100}
+# 교차환율 행렬에 기준 통화로 함께 넣는 원화 (모든 환율 1)
+HOME_CURRENCY = "KRW"
+
+# 교차환율 계산에 쓰는 환율 컬럼
+CROSS_RATE_FIELDS = ("base_rate", "cash_buy", "cash_sell", "remit_send", "remit_receive")
+
+LOAD_SQL = f"SELECT {', '.join(RATE_COLUMNS)} FROM exchange_rates WHERE base_date BETWEEN %s AND %s"
+
+
+class CrossRateStack(NamedTuple):
+    """기준일별 교차환율 행렬 (shape: 기준일 수 × 통화 수 × 통화 수)
+
+    [d, i, j]는 d일 통화 i 1단위의 통화 j 가격. 고시가 없거나 환율이 0인 통화는 NaN.
+    bid는 i를 팔아 받는 j(i 매도 환율 / j 매입 환율), ask는 i 1단위를 사는 데 드는 j(i 매입 환율 / j 매도 환율).
+    """
+    dates: 'np.ndarray'
+    codes: Tuple[str, ...]
+    mid: 'np.ndarray'
+    cash_bid: 'np.ndarray'
+    cash_ask: 'np.ndarray'
+    remit_bid: 'np.ndarray'
+    remit_ask: 'np.ndarray'
+
+    def at(self, index: int = 0) -> 'CrossRates':
+        """기준일 하나의 N×N 행렬"""
+        return CrossRates(self.dates[index].item(), self.codes, self.mid[index], self.cash_bid[index],
+                          self.cash_ask[index], self.remit_bid[index], self.remit_ask[index])
+
+
+class CrossRates(NamedTuple):
+    """고시 하나의 N×N 교차환율 행렬 ([i, j]는 통화 i 1단위의 통화 j 가격)"""
+    base_date: date
+    codes: Tuple[str, ...]
+    mid: 'np.ndarray'
+    cash_bid: 'np.ndarray'
+    cash_ask: 'np.ndarray'
+    remit_bid: 'np.ndarray'
+    remit_ask: 'np.ndarray'
+
+    def rate(self, base: str, quote: str, kind: str = "mid") -> float:
+        """통화쌍 환율 (예: rate("EUR", "JPY"))"""
+        return float(getattr(self, kind)[self.codes.index(base), self.codes.index(quote)])
+
+
+def _numpy():
+    """numpy는 계산할 때 import (Lambda 이미지와 requirements.txt에는 없으므로 이 모듈 import는 numpy 없이도 가능)"""
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("교차환율 계산에는 numpy가 필요합니다 (pip install numpy)")
+    return numpy
+
+
+def _latest_per_day(batch: RateBatch, sequence: Optional[int]):
+    """기준일·통화별 행 하나(지정 회차 또는 마지막 회차)를 골라 (기준일 목록, 통화코드 목록, 선택 행, 행별 기준일/통화 위치) 반환"""
+    np = _numpy()
+    # date 객체 목록을 datetime64로 직접 변환하면 행마다 느린 경로를 타므로 서수(ordinal)로 변환
+    base_dates = batch.column("base_date")
+    days = np.fromiter(map(date.toordinal, base_dates), dtype=np.int64, count=len(base_dates))
+    codes, code_index = np.unique(np.array(batch.column("currency_code"), dtype=object).astype(str),
+                                  return_inverse=True)
+    sequences = np.frombuffer(batch.column("announcement_sequence"), dtype=np.intc)
+
+    rows = np.arange(len(batch))
+    if sequence is not None:
+        rows = rows[sequences == sequence]
+    # (기준일, 통화, 회차) 순 정렬 후 그룹마다 마지막(가장 늦은 회차) 행
+    rows = rows[np.lexsort((sequences[rows], code_index[rows], days[rows]))]
+    if len(rows):
+        d, c = days[rows], code_index[rows]
+        last = np.r_[(d[1:] != d[:-1]) | (c[1:] != c[:-1]), True]
+        rows = rows[last]
+    unique_days, day_index = np.unique(days[rows], return_inverse=True)
+    # 0001-01-01(서수 1)과 1970-01-01(datetime64 기준)의 차이만큼 옮겨 datetime64[D]로 변환
+    unique_days = (unique_days - date(1970, 1, 1).toordinal()).astype('datetime64[D]')
+    return unique_days, codes, rows, day_index, code_index[rows]
+
+
+def _cross(numerator: 'np.ndarray', denominator: 'np.ndarray') -> 'np.ndarray':
+    """[d, i] / [d, j] -> [d, i, j] (0/NaN 분모는 NaN)"""
+    np = _numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return numerator[:, :, None] / denominator[:, None, :]
+
+
+def compute_cross_rate_stack(batch: RateBatch, sequence: Optional[int] = None,
+                             include_home: bool = True) -> CrossRateStack:
+    """여러 기준일의 환율 배치를 기준일 × 통화 원화 가격 행렬로 펼친 뒤 교차환율 3차원 배열을 한 번에 계산"""
+    np = _numpy()
+    days, codes, rows, day_index, code_index = _latest_per_day(batch, sequence)
+    code_list = [str(code) for code in codes]
+    units = np.array([CURRENCY_UNITS.get(code, 1) for code in code_list], dtype=np.float64)
+
+    # 통화 1단위의 원화 가격 (기준일 × 통화), 0(고시 없음)은 NaN
+    krw: Dict[str, np.ndarray] = {}
+    for field in CROSS_RATE_FIELDS:
+        values = np.frombuffer(batch.column(field), dtype=np.float64)
+        grid = np.full((len(days), len(code_list)), np.nan)
+        grid[day_index, code_index] = values[rows]
+        grid /= units
+        grid[grid == 0] = np.nan
+        if include_home:
+            grid = np.hstack([grid, np.ones((len(days), 1))])
+        krw[field] = grid
+    if include_home:
+        code_list.append(HOME_CURRENCY)
+
+    return CrossRateStack(
+        dates=days,
+        codes=tuple(code_list),
+        mid=_cross(krw["base_rate"], krw["base_rate"]),
+        cash_bid=_cross(krw["cash_sell"], krw["cash_buy"]),
+        cash_ask=_cross(krw["cash_buy"], krw["cash_sell"]),
+        remit_bid=_cross(krw["remit_receive"], krw["remit_send"]),
+        remit_ask=_cross(krw["remit_send"], krw["remit_receive"]),
+    )
+
+
+def compute_cross_rates(batch: RateBatch, sequence: Optional[int] = None, include_home: bool = True) -> CrossRates:
+    """고시 하나(기준일 하나)의 N×N 교차환율 행렬"""
+    stack = compute_cross_rate_stack(batch, sequence, include_home)
+    if len(stack.dates) != 1:
+        raise ValueError(f"기준일이 하나인 배치가 필요합니다 ({len(stack.dates)}일)")
+    return stack.at(0)
+
+
+def load_rates(connection, start_date: date, end_date: Optional[date] = None) -> RateBatch:
+    """기간 내 exchange_rates 행을 열 지향 배치로 조회"""
+    batch = RateBatch()
+    with connection.cursor() as cursor:
+        cursor.execute(LOAD_SQL, (start_date, end_date or start_date))
+        batch.append_rows(cursor.fetchall())
+    return batch
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from metrics import count
+
+# 웜 컨테이너에서 유지할 최대 연결 수 (동시에 빌려줄 수 있는 연결 수 상한)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '4'))
+# 모든 연결이 사용 중일 때 반환을 기다리는 최대 시간(초)
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '10'))
+
+# 모듈 수준 풀: Lambda 웜 호출 간 유지
+_idle: List[Any] = []
+_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(DB_POOL_SIZE)
+_in_use = 0
+_stats = {"hits": 0, "misses": 0, "reconnects": 0, "discards": 0, "timeouts": 0}
+_acquire_ms = {"total": 0.0, "max": 0.0, "count": 0}
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def validate_connection(connection) -> bool:
+    """ping으로 연결 생존 확인, 끊겼으면 같은 연결로 재접속 시도"""
+    try:
+        connection.ping(reconnect=False)
+        return True
+    except Exception:
+        pass
+    try:
+        connection.ping(reconnect=True)
+        _stats["reconnects"] += 1
+        return True
+    except Exception as e:
+        print(f"DB 연결 재접속 실패: {e}")
+        return False
+
+
+def _record_acquire(started: float):
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _lock:
+        _acquire_ms["total"] += elapsed_ms
+        _acquire_ms["max"] = max(_acquire_ms["max"], elapsed_ms)
+        _acquire_ms["count"] += 1
+
+
+def acquire_connection(factory: Callable[[], Any]):
+    """유휴 연결을 점검 후 재사용하고, 없거나 끊겼으면 factory로 새로 생성 (실패/시간 초과 시 None)"""
+    global _in_use
+
+    started = time.perf_counter()
+    if not _slots.acquire(timeout=DB_POOL_TIMEOUT):
+        _stats["timeouts"] += 1
+        print(f"DB 연결 풀 대기 시간 초과 ({DB_POOL_SIZE}개 모두 사용 중)")
+        _record_acquire(started)
+        return None
+
+    connection = None
+    try:
+        while connection is None:
+            with _lock:
+                if not _idle:
+                    break
+                candidate = _idle.pop()
+            if validate_connection(candidate):
+                connection = candidate
+                _stats["hits"] += 1
+                count("db_pool_hits")
+            else:
+                _stats["discards"] += 1
+                _close_quietly(candidate)
+
+        if connection is None:
+            connection = factory()
+            if connection is not None:
+                _stats["misses"] += 1
+                count("db_pool_misses")
+    finally:
+        if connection is None:
+            _slots.release()
+        else:
+            with _lock:
+                _in_use += 1
+        _record_acquire(started)
+    return connection
+
+
+def release_connection(connection, discard: bool = False):
+    """연결을 닫지 않고 다음 호출을 위해 풀로 반환 (discard면 종료)"""
+    global _in_use
+
+    if connection is None:
+        return
+    if discard or not getattr(connection, 'open', True):
+        _stats["discards"] += 1
+        _close_quietly(connection)
+    else:
+        with _lock:
+            _idle.append(connection)
+    with _lock:
+        _in_use -= 1
+    _slots.release()
+
+
+def close_pool():
+    """유휴 연결 모두 종료"""
+    with _lock:
+        connections, _idle[:] = list(_idle), []
+    for connection in connections:
+        _close_quietly(connection)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """연결 재사용 적중/미적중/재접속 횟수와 획득 지연(ms)"""
+    with _lock:
+        acquired = _acquire_ms["count"]
+        return {
+            **_stats,
+            "idle": len(_idle),
+            "in_use": _in_use,
+            "acquire_ms_avg": round(_acquire_ms["total"] / acquired, 3) if acquired else 0.0,
+            "acquire_ms_max": round(_acquire_ms["max"], 3),
+        }
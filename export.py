@@ -0,0 +1,171 @@
+import argparse
+import csv
+import gzip
+import json
+import time
+from array import array
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
+
+from rate_parser import ALL_CURRENCIES
+from rate_records import RATE_COLUMNS, RATE_VALUE_COLUMNS, RateBatch
+
+# 서버 측 커서에서 한 번에 가져올 행 수 (메모리는 이 크기의 배치 하나로 일정)
+EXPORT_CHUNK_SIZE = 50000
+EXPORT_FORMATS = ("parquet", "csv")
+
+
+def build_export_query(currencies: Union[str, Set[str]] = ALL_CURRENCIES, start_date: Optional[date] = None,
+                       end_date: Optional[date] = None):
+    """통화/기간 조건의 exchange_rates 조회문과 파라미터 (유니크 키 순서로 정렬)"""
+    where: List[str] = []
+    params: List[Any] = []
+    if start_date:
+        where.append("base_date >= %s")
+        params.append(start_date)
+    if end_date:
+        where.append("base_date <= %s")
+        params.append(end_date)
+    if currencies != ALL_CURRENCIES:
+        where.append("currency_code IN (" + ", ".join(["%s"] * len(currencies)) + ")")
+        params.extend(sorted(currencies))
+    sql = f"SELECT {', '.join(RATE_COLUMNS)} FROM exchange_rates"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY base_date, currency_code, announcement_sequence"
+    return sql, params
+
+
+def stream_batches(connection, sql: str, params: List[Any], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[RateBatch]:
+    """서버 측(unbuffered) 커서로 chunk_size 행씩 읽어 같은 RateBatch를 채워 반환 (다음 반복 전에 소비할 것)"""
+    import pymysql.cursors
+
+    batch = RateBatch()
+    with connection.cursor(pymysql.cursors.SSCursor) as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            batch.clear()
+            batch.append_rows(rows)
+            yield batch
+
+
+class CsvGzipWriter:
+    """gzip 압축 CSV로 배치를 이어 쓰는 기록기"""
+
+    def __init__(self, path: str):
+        self._file = gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=6)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(RATE_COLUMNS)
+
+    def write(self, batch: RateBatch):
+        self._writer.writerows(batch.rows())
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """배치마다 row group 하나로 Parquet 파일에 이어 쓰는 기록기 (pyarrow 필요)"""
+
+    def __init__(self, path: str, compression: str = 'zstd'):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet 내보내기에는 pyarrow가 필요합니다 (pip install pyarrow, 또는 --format csv)")
+        self._pa = pa
+        types = {name: pa.float64() for name in RATE_VALUE_COLUMNS}
+        types.update({
+            "base_date": pa.date32(),
+            "currency_code": pa.string(),
+            "announcement_sequence": pa.int32(),
+            "announcement_type": pa.string(),
+            "announcement_datetime": pa.timestamp('s'),
+            "query_datetime": pa.timestamp('s'),
+        })
+        self.schema = pa.schema([(name, types[name]) for name in RATE_COLUMNS])
+        self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def write(self, batch: RateBatch):
+        pa = self._pa
+        # 환율 값/고시회차 array는 버퍼를 복사 없이 넘기고, 나머지(list)는 변환
+        arrays = []
+        for field in self.schema:
+            column = batch.column(field.name)
+            if isinstance(column, array):
+                arrays.append(pa.Array.from_buffers(field.type, len(column), [None, pa.py_buffer(column)]))
+            else:
+                arrays.append(pa.array(column, type=field.type))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def open_writer(path: str, export_format: str):
+    if export_format == "parquet":
+        return ParquetWriter(path)
+    if export_format == "csv":
+        return CsvGzipWriter(path)
+    raise ValueError(f"지원하지 않는 형식: {export_format}")
+
+
+def export_rates(connection, path: str, export_format: str = "parquet",
+                 currencies: Union[str, Set[str]] = ALL_CURRENCIES, start_date: Optional[date] = None,
+                 end_date: Optional[date] = None, chunk_size: int = EXPORT_CHUNK_SIZE) -> Dict[str, Any]:
+    """조건에 맞는 환율 이력을 서버 측 커서로 스트리밍하여 파일에 이어 쓰고 건수/처리량 반환"""
+    started = time.perf_counter()
+    sql, params = build_export_query(currencies, start_date, end_date)
+    writer = open_writer(path, export_format)
+    rows = chunks = 0
+    try:
+        for batch in stream_batches(connection, sql, params, chunk_size):
+            writer.write(batch)
+            rows += len(batch)
+            chunks += 1
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - started
+    return {
+        "path": path,
+        "format": export_format,
+        "rows": rows,
+        "chunks": chunks,
+        "elapsed_sec": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def main():
+    from crawler import get_db_connection, resolve_currencies
+    from db_pool import release_connection
+
+    parser = argparse.ArgumentParser(description="exchange_rates 이력 내보내기 (Parquet / gzip CSV)")
+    parser.add_argument('--output', required=True, help="출력 파일 경로")
+    parser.add_argument('--format', default='parquet', choices=EXPORT_FORMATS, help="출력 형식")
+    parser.add_argument('--currencies', default='all', help="쉼표 구분 통화코드 또는 all")
+    parser.add_argument('--start', help="시작 기준일 (YYYY-MM-DD)")
+    parser.add_argument('--end', help="종료 기준일 (YYYY-MM-DD)")
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help="서버 측 커서 fetch 단위")
+    args = parser.parse_args()
+
+    connection = get_db_connection()
+    if connection is None:
+        raise SystemExit("DB 연결 실패")
+    try:
+        summary = export_rates(
+            connection, args.output, args.format, resolve_currencies(args.currencies),
+            datetime.strptime(args.start, "%Y-%m-%d").date() if args.start else None,
+            datetime.strptime(args.end, "%Y-%m-%d").date() if args.end else None,
+            args.chunk_size,
+        )
+    finally:
+        release_connection(connection)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
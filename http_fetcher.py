@@ -0,0 +1,90 @@
+import os
+import threading
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Optional
+
+# requests는 HTTP 조회 때 import (Selenium 전용 실행과 waits의 상수 참조에서는 불필요)
+if TYPE_CHECKING:
+    import requests
+
+# bankIframe 내부 조회 폼(inqFrm)이 전송되는 주소 (로컬 대역 서버로 교체 가능)
+RATE_FORM_URL = os.environ.get('RATE_FORM_URL', "https://www.kebhana.com/cms/rate/wpfxd651_01i_01.do")
+# bankIframe 문서 주소 (폼 요청의 Referer)
+RATE_IFRAME_URL = os.environ.get(
+    'RATE_IFRAME_URL', "https://www.kebhana.com/cms/rate/index.do?contentUrl=/cms/rate/wpfxd651_01i.do"
+)
+HTTP_TIMEOUT = float(os.environ.get('HTTP_TIMEOUT', '10'))
+USER_AGENT = "Mozilla/5.0 (Windows NT 6.1; WOW64; Trident/7.0; rv:11.0) like Gecko"
+
+# 고시회차 라디오(pbldDvCd) 값: 최초 / 회차 지정 / 최종
+ANNOUNCEMENT_TYPE_CODES = {
+    "FIRST": "1",
+    "SEQUENCE": "2",
+    "LAST": "3",
+}
+
+_local = threading.local()
+
+
+def build_form_data(currency: str, announcement_type: str = "FIRST",
+                    inquiry_date: Optional[date] = None,
+                    sequence: Optional[int] = None) -> Dict[str, str]:
+    """inqFrm 폼이 전송하는 파라미터 구성"""
+    inquiry_date = inquiry_date or date.today()
+    return {
+        "ajax": "true",
+        "curCd": currency,
+        "tmpInqStrDt": inquiry_date.strftime("%Y-%m-%d"),
+        "pbldDvCd": ANNOUNCEMENT_TYPE_CODES.get(announcement_type, ANNOUNCEMENT_TYPE_CODES["FIRST"]),
+        "pbldSqn": str(sequence) if sequence else "",
+        "hid_key_data": "",
+        "inqStrDt": inquiry_date.strftime("%Y%m%d"),
+        "inqKindCd": "1",
+        "hid_enc_data": "",
+        "requestTarget": "searchContentDiv",
+    }
+
+
+def thread_session() -> 'requests.Session':
+    """스레드별 HTTP 세션 (워커 스레드마다 연결 재사용)"""
+    if not hasattr(_local, 'session'):
+        import requests
+        _local.session = requests.Session()
+    return _local.session
+
+
+def fetch_rate_page(currency: str, announcement_type: str = "FIRST",
+                    inquiry_date: Optional[date] = None,
+                    sequence: Optional[int] = None,
+                    session: Optional['requests.Session'] = None,
+                    timeout: float = HTTP_TIMEOUT) -> Optional[str]:
+    """브라우저 없이 조회 폼 엔드포인트에 직접 요청하여 환율 HTML 반환 (실패 시 None)"""
+    import requests
+
+    data = build_form_data(currency, announcement_type, inquiry_date, sequence)
+    headers = {
+        "User-Agent": USER_AGENT,
+        "Referer": RATE_IFRAME_URL,
+        "X-Requested-With": "XMLHttpRequest",
+    }
+
+    try:
+        response = (session or requests).post(RATE_FORM_URL, data=data, headers=headers, timeout=timeout)
+        response.raise_for_status()
+    except Exception as e:
+        print(f"HTTP 조회 실패: {e}")
+        return None
+
+    # charset이 명시되지 않은 응답은 본문으로 인코딩 추정
+    if 'charset' not in response.headers.get('Content-Type', '').lower():
+        response.encoding = response.apparent_encoding
+    html = response.text
+
+    if 'tblBasic' not in html:
+        print("HTTP 응답에 환율 테이블(tblBasic)이 없습니다")
+        return None
+
+    # 응답은 searchContentDiv 내부 조각이므로 Selenium page_source와 같은 구조로 감싸서 반환
+    if 'id="searchContentDiv"' not in html:
+        html = f'<div id="searchContentDiv">{html}</div>'
+    return html
@@ -0,0 +1,203 @@
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import RunMetrics, current_run
+
+# 메모리 프로파일 모드 (구간별 최대 RSS 표본 수집, 파싱 구간 tracemalloc 상위 할당 위치) - 이벤트의 memory_profile이 우선
+MEMORY_PROFILE = os.environ.get('MEMORY_PROFILE', '0').lower() not in ('0', 'false', 'no')
+# RSS 표본 수집 간격(ms)
+MEMORY_SAMPLE_MS = float(os.environ.get('MEMORY_SAMPLE_MS', '20'))
+# 보고할 tracemalloc 상위 할당 위치 수와 할당 위치별로 보관할 호출 스택 깊이
+MEMORY_TRACE_TOP = int(os.environ.get('MEMORY_TRACE_TOP', '10'))
+MEMORY_TRACE_FRAMES = int(os.environ.get('MEMORY_TRACE_FRAMES', '1'))
+
+_PAGE_MB = os.sysconf('SC_PAGE_SIZE') / 1024 / 1024 if hasattr(os, 'sysconf') else 4096 / 1024 / 1024
+
+
+def process_rss_mb() -> float:
+    """현재 프로세스 RSS(MB) - /proc/self/statm 한 번 읽기 (확인 불가 시 0)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_MB
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+
+def process_peak_rss_mb() -> float:
+    """현재 프로세스 수명 동안의 최대 RSS(MB, VmHWM)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return 0.0
+
+
+class MemoryProfiler:
+    """실행 중 Python 프로세스와 Chrome 하위 프로세스 RSS를 주기적으로 표본 수집하여 진행 중인 구간(span)별 최댓값 기록
+
+    metrics.span()이 구간 시작/종료 때 enter/exit를 호출하고, 그 사이는 표본 스레드가 MEMORY_SAMPLE_MS마다 수집한다.
+    """
+
+    def __init__(self, chrome_rss: Optional[Callable[[], float]] = None, interval_ms: float = MEMORY_SAMPLE_MS):
+        self.chrome_rss = chrome_rss
+        self.interval = max(interval_ms, 1) / 1000
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.allocations: Dict[str, Dict[str, Any]] = {}
+        self.peaks = {"python_mb": 0.0, "chrome_mb": 0.0, "total_mb": 0.0}
+        self.samples = 0
+        # 파싱 중 트리가 가장 클 때의 tracemalloc 스냅숏 (allocation_checkpoint)
+        self.checkpoint: Optional[tracemalloc.Snapshot] = None
+        self._stack: List[str] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-profile", daemon=True)
+        self._thread.start()
+
+    def _sample(self) -> float:
+        python = process_rss_mb()
+        chrome = self.chrome_rss() if self.chrome_rss else 0.0
+        with self._lock:
+            self.samples += 1
+            self.peaks["python_mb"] = max(self.peaks["python_mb"], python)
+            self.peaks["chrome_mb"] = max(self.peaks["chrome_mb"], chrome)
+            self.peaks["total_mb"] = max(self.peaks["total_mb"], python + chrome)
+            for name in self._stack:
+                phase = self.phases[name]
+                phase["python_peak_mb"] = max(phase["python_peak_mb"], python)
+                phase["chrome_peak_mb"] = max(phase["chrome_peak_mb"], chrome)
+        return python
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def enter(self, name: str):
+        python = process_rss_mb()
+        with self._lock:
+            self._stack.append(name)
+            phase = self.phases.setdefault(name, {"python_peak_mb": 0.0, "chrome_peak_mb": 0.0, "python_delta_mb": 0.0})
+            phase["_start"] = python
+        self._sample()
+
+    def exit(self, name: str):
+        python = self._sample()
+        with self._lock:
+            if name in self._stack:
+                # 뒤에서부터 같은 이름 하나 제거 (중첩 구간 대비)
+                del self._stack[len(self._stack) - 1 - self._stack[::-1].index(name)]
+            phase = self.phases.get(name)
+            if phase is not None:
+                phase["python_delta_mb"] += python - phase.pop("_start", python)
+
+    def record_allocations(self, name: str, report: Dict[str, Any]):
+        """구간의 tracemalloc 결과 기록 (여러 번 실행된 구간은 최대 사용량이 가장 큰 회차만)"""
+        current = self.allocations.get(name)
+        if current is None or report["peak_kb"] > current["peak_kb"]:
+            self.allocations[name] = report
+
+    def stop(self) -> Dict[str, Any]:
+        """표본 수집을 멈추고 구간별 최대 RSS, 전체 최댓값, tracemalloc 상위 할당 위치 반환"""
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return {
+            "sample_ms": round(self.interval * 1000, 1),
+            "samples": self.samples,
+            **{f"{name[:-3]}_peak_mb": round(value, 1) for name, value in self.peaks.items()},
+            "process_hwm_mb": round(process_peak_rss_mb(), 1),
+            "phases": {
+                name: {key: round(value, 1) for key, value in phase.items() if not key.startswith('_')}
+                for name, phase in self.phases.items()
+            },
+            "allocations": self.allocations,
+        }
+
+
+def start_profile(metrics: RunMetrics, chrome_rss: Optional[Callable[[], float]] = None) -> MemoryProfiler:
+    """실행 기록기에 메모리 프로파일러를 붙임 (이후 span마다 구간별 RSS 기록)"""
+    metrics.memory = MemoryProfiler(chrome_rss)
+    return metrics.memory
+
+
+def finish_profile(metrics: RunMetrics) -> Optional[Dict[str, Any]]:
+    """프로파일러를 멈추고 최대 RSS를 지표(gauge)로 기록한 뒤 결과 반환 (프로파일 모드가 아니면 None)"""
+    profiler = metrics.memory
+    if profiler is None:
+        return None
+    metrics.memory = None
+    report = profiler.stop()
+    metrics.gauge("python_peak_mb", report["python_peak_mb"])
+    metrics.gauge("chrome_peak_mb", report["chrome_peak_mb"])
+    return report
+
+
+def _current_profiler() -> Optional[MemoryProfiler]:
+    metrics = current_run()
+    return metrics.memory if metrics is not None else None
+
+
+def allocation_checkpoint():
+    """trace_allocations 구간 안에서 메모리 사용이 가장 큰 시점(파싱 트리 완성 직후 등)의 스냅숏 기록"""
+    profiler = _current_profiler()
+    if profiler is not None and tracemalloc.is_tracing():
+        profiler.checkpoint = tracemalloc.take_snapshot()
+
+
+def _short_path(filename: str) -> str:
+    """site-packages 아래는 패키지 기준 경로, 그 밖은 파일 이름만"""
+    marker = 'site-packages' + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.basename(filename)
+
+
+def _top_allocations(snapshot: tracemalloc.Snapshot, baseline: tracemalloc.Snapshot) -> List[Dict[str, Any]]:
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+    stats = snapshot.filter_traces(ignore).compare_to(baseline.filter_traces(ignore), 'lineno')
+    top = sorted((s for s in stats if s.size_diff > 0), key=lambda s: s.size_diff, reverse=True)
+    return [
+        {
+            "where": f"{_short_path(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+            "size_kb": round(s.size_diff / 1024, 1),
+            "count": s.count_diff,
+        }
+        for s in top[:MEMORY_TRACE_TOP]
+    ]
+
+
+@contextmanager
+def trace_allocations(name: str):
+    """메모리 프로파일 모드면 구간의 tracemalloc 최대 사용량, 남은 사용량과 상위 할당 위치를 기록 (아니면 아무 일도 안 함)
+
+    구간 안에서 allocation_checkpoint()를 호출했으면 그 시점, 아니면 구간 종료 시점의 스냅숏을 시작 시점과 비교한다.
+    """
+    profiler = _current_profiler()
+    if profiler is None:
+        yield
+        return
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(MEMORY_TRACE_FRAMES)
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.take_snapshot()
+    base_size = tracemalloc.get_traced_memory()[0]
+    profiler.checkpoint = None
+    try:
+        yield
+    finally:
+        size, peak = tracemalloc.get_traced_memory()
+        snapshot = profiler.checkpoint or tracemalloc.take_snapshot()
+        profiler.checkpoint = None
+        if started:
+            tracemalloc.stop()
+        profiler.record_allocations(name, {
+            "peak_kb": round((peak - base_size) / 1024, 1),
+            "retained_kb": round((size - base_size) / 1024, 1),
+            "top": _top_allocations(snapshot, baseline),
+        })
@@ -0,0 +1,122 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+# 상세 출력(배너, 환율 값) 여부 - 오류 메시지는 항상 출력
+VERBOSE = os.environ.get('VERBOSE', '1').lower() not in ('0', 'false', 'no')
+# 실행마다 CloudWatch EMF 형식 JSON 한 줄 출력 여부
+EMIT_METRICS = os.environ.get('EMIT_METRICS', '1').lower() not in ('0', 'false', 'no')
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'ExchangeRateCrawler')
+
+
+def log(*args, **kwargs):
+    """VERBOSE일 때만 출력"""
+    if VERBOSE:
+        print(*args, **kwargs)
+
+
+class RunMetrics:
+    """한 번의 실행에서 구간별 소요 시간과 건수를 모으는 기록기"""
+
+    __slots__ = ("started_at", "durations", "counts", "gauges", "dimensions", "memory")
+
+    def __init__(self, **dimensions: str):
+        self.started_at = time.time()
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        # 실행 중 최댓값을 기록하는 값 (메모리 프로파일의 최대 RSS 등, MB)
+        self.gauges: Dict[str, float] = {}
+        self.dimensions: Dict[str, str] = dict(dimensions)
+        # 메모리 프로파일 모드의 구간별 RSS 기록기 (memory_profile.MemoryProfiler, 꺼져 있으면 None)
+        self.memory = None
+
+    def add_duration(self, name: str, seconds: float):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def count(self, name: str, value: int = 1):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def gauge(self, name: str, value: float):
+        self.gauges[name] = max(self.gauges.get(name, value), value)
+
+    def summary(self) -> Dict[str, Any]:
+        """handler 반환값에 담는 구간별 소요 시간(ms)과 건수"""
+        summary = {
+            "durations_ms": {name: round(sec * 1000, 3) for name, sec in self.durations.items()},
+            "counts": dict(self.counts),
+        }
+        if self.gauges:
+            summary["gauges_mb"] = {name: round(value, 1) for name, value in self.gauges.items()}
+        return summary
+
+    def emf_record(self) -> Dict[str, Any]:
+        """CloudWatch Embedded Metric Format 레코드"""
+        metrics: List[Dict[str, str]] = []
+        record: Dict[str, Any] = dict(self.dimensions)
+        for name, sec in self.durations.items():
+            metrics.append({"Name": name, "Unit": "Milliseconds"})
+            record[name] = round(sec * 1000, 3)
+        for name, value in self.counts.items():
+            metrics.append({"Name": name, "Unit": "Count"})
+            record[name] = value
+        for name, value in self.gauges.items():
+            metrics.append({"Name": name, "Unit": "Megabytes"})
+            record[name] = round(value, 1)
+        record["_aws"] = {
+            "Timestamp": int(self.started_at * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": METRICS_NAMESPACE,
+                "Dimensions": [sorted(self.dimensions)],
+                "Metrics": metrics,
+            }],
+        }
+        return record
+
+    def emit(self):
+        """EMF 레코드를 표준 출력에 JSON 한 줄로 기록 (Lambda 로그에서 지표로 수집)"""
+        if EMIT_METRICS:
+            print(json.dumps(self.emf_record(), ensure_ascii=False, separators=(',', ':')))
+
+
+# 현재 실행의 기록기 (동시 실행 시 스레드/태스크별로 분리)
+_current: ContextVar[Optional[RunMetrics]] = ContextVar('run_metrics', default=None)
+
+
+def start_run(**dimensions: str) -> RunMetrics:
+    """새 실행 기록기를 현재 컨텍스트에 설정"""
+    metrics = RunMetrics(**dimensions)
+    _current.set(metrics)
+    return metrics
+
+
+def current_run() -> Optional[RunMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str):
+    """현재 실행에 구간 소요 시간 누적 (기록기가 없으면 측정만 생략)"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    memory = metrics.memory
+    if memory is not None:
+        memory.enter(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_duration(name, time.perf_counter() - start)
+        if memory is not None:
+            memory.exit(name)
+
+
+def count(name: str, value: int = 1):
+    """현재 실행에 건수 누적"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.count(name, value)
@@ -0,0 +1,103 @@
+import gzip
+import hashlib
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, Optional, Set, Union
+
+from metrics import count, span
+
+# 조회한 원본 HTML 보관 위치 (빈 값이면 보관 안 함) - Lambda에서는 EFS 마운트 경로 등 영속 경로 지정
+PAGE_ARCHIVE_DIR = os.environ.get('PAGE_ARCHIVE_DIR', '')
+PAGE_ARCHIVE_COMPRESSLEVEL = int(os.environ.get('PAGE_ARCHIVE_COMPRESSLEVEL', '6'))
+
+
+def blob_path(archive_dir: str, digest: str) -> str:
+    return os.path.join(archive_dir, 'pages', digest[:2], f"{digest}.html.gz")
+
+
+def index_path(archive_dir: str, fetched_on: date) -> str:
+    return os.path.join(archive_dir, 'index', f"{fetched_on.isoformat()}.jsonl")
+
+
+def archive_page(html: str, source: str, currencies: Union[str, Set[str]], announcement_type: str,
+                 sequence: Optional[int] = None, inquiry_date: Optional[date] = None,
+                 archive_dir: Optional[str] = None) -> Optional[str]:
+    """원본 HTML을 내용 주소(SHA-256) gzip 파일로 보관하고 조회 정보를 일자별 색인에 한 줄 추가
+
+    같은 내용은 한 번만 저장하고 색인에만 추가한다. 보관 실패는 조회 결과에 영향을 주지 않도록 출력만 하고 None 반환.
+    """
+    archive_dir = archive_dir if archive_dir is not None else PAGE_ARCHIVE_DIR
+    if not archive_dir or not html:
+        return None
+    with span("archive"):
+        try:
+            data = html.encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+            path = blob_path(archive_dir, digest)
+            stored = 0
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    # mtime=0으로 같은 내용이면 같은 압축 결과
+                    f.write(gzip.compress(data, compresslevel=PAGE_ARCHIVE_COMPRESSLEVEL, mtime=0))
+                os.replace(tmp_path, path)
+                stored = os.path.getsize(path)
+                count("archive_pages")
+            else:
+                count("archive_duplicates")
+
+            fetched_at = datetime.now()
+            entry = {
+                "digest": digest,
+                "fetched_at": fetched_at.isoformat(timespec='seconds'),
+                "inquiry_date": (inquiry_date or fetched_at.date()).isoformat(),
+                "source": source,
+                "currencies": currencies if isinstance(currencies, str) else sorted(currencies),
+                "announcement_type": announcement_type,
+                "sequence": sequence,
+                "bytes": len(data),
+                "stored_bytes": stored,
+            }
+            path = index_path(archive_dir, fetched_at.date())
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 한 줄 단위 append (동시 실행 간에도 줄이 섞이지 않음)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            return digest
+        except OSError as e:
+            print(f"원본 페이지 보관 실패: {e}")
+            return None
+
+
+def iter_index(archive_dir: Optional[str] = None, start_date: Optional[date] = None,
+               end_date: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+    """조회일(inquiry_date)이 기간 내인 색인 항목을 일자 파일 순서대로 반환"""
+    archive_dir = archive_dir if archive_dir is not None else PAGE_ARCHIVE_DIR
+    index_dir = os.path.join(archive_dir, 'index')
+    if not archive_dir or not os.path.isdir(index_dir):
+        return
+    for name in sorted(os.listdir(index_dir)):
+        if not name.endswith('.jsonl'):
+            continue
+        with open(os.path.join(index_dir, name), encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 쓰다 중단된 마지막 줄 등
+                    continue
+                inquiry_date = entry.get("inquiry_date", "")
+                if start_date and inquiry_date < start_date.isoformat():
+                    continue
+                if end_date and inquiry_date > end_date.isoformat():
+                    continue
+                yield entry
+
+
+def read_page(digest: str, archive_dir: Optional[str] = None) -> str:
+    """보관된 원본 HTML"""
+    archive_dir = archive_dir if archive_dir is not None else PAGE_ARCHIVE_DIR
+    with open(blob_path(archive_dir, digest), 'rb') as f:
+        return gzip.decompress(f.read()).decode('utf-8')
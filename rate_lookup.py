@@ -0,0 +1,237 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from rate_records import RATE_COLUMNS, RateBatch, RateRecord, record_from_row
+
+# 캐시 항목 유효 시간(초)과 최대 항목 수 (초과 시 가장 오래 사용하지 않은 항목부터 제거)
+RATE_CACHE_TTL_SEC = float(os.environ.get('RATE_CACHE_TTL_SEC', '60'))
+RATE_CACHE_MAX_ENTRIES = int(os.environ.get('RATE_CACHE_MAX_ENTRIES', '4096'))
+# 최신 환율 일괄 조회 시 거슬러 올라갈 최대 일수 (유니크 키 선두 컬럼 base_date 범위 조회)
+RATE_LOOKUP_LOOKBACK_DAYS = int(os.environ.get('RATE_LOOKUP_LOOKBACK_DAYS', '14'))
+
+_SELECT_COLUMNS = ", ".join(RATE_COLUMNS)
+
+# 통화별 최신(기준일, 고시회차) 행을 한 번에 조회 (윈도 함수 ROW_NUMBER는 MySQL 8.0 이상)
+LATEST_RATES_SQL = f"""
+SELECT {_SELECT_COLUMNS} FROM (
+    SELECT {_SELECT_COLUMNS},
+           ROW_NUMBER() OVER (PARTITION BY currency_code
+                              ORDER BY base_date DESC, announcement_sequence DESC) AS rn
+    FROM exchange_rates
+    WHERE base_date >= %s
+) latest
+WHERE rn = 1
+"""
+RATE_SQL = (
+    f"SELECT {_SELECT_COLUMNS} FROM exchange_rates "
+    "WHERE base_date = %s AND currency_code = %s AND announcement_sequence = %s"
+)
+# 해당 기준일의 마지막 고시회차 행
+LAST_SEQUENCE_RATE_SQL = (
+    f"SELECT {_SELECT_COLUMNS} FROM exchange_rates "
+    "WHERE base_date = %s AND currency_code = %s "
+    "ORDER BY announcement_sequence DESC LIMIT 1"
+)
+
+# 고시회차를 지정하지 않은 조회의 캐시 키 자리 표시 (유니크 키의 announcement_sequence 위치)
+LAST_SEQUENCE = "last"
+
+_MISSING = object()
+
+
+def load_latest_rates(connection, since: date) -> Dict[str, RateRecord]:
+    """since 이후 기준일 중 통화별 최신(기준일, 고시회차) 저장 행을 한 번의 쿼리로 조회"""
+    with connection.cursor() as cursor:
+        cursor.execute(LATEST_RATES_SQL, (since,))
+        rows = cursor.fetchall()
+    latest = {}
+    for row in rows:
+        record = record_from_row(row)
+        latest[record.currency_code] = record
+    return latest
+
+
+class TTLCache:
+    """항목별 만료 시각을 두는 크기 제한 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, ttl_sec: float = RATE_CACHE_TTL_SEC, max_entries: int = RATE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl_sec
+        self.max_entries = max(max_entries, 1)
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def get(self, key: Hashable) -> Any:
+        """캐시 값 반환 (없거나 만료되면 _MISSING)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RateLookup:
+    """exchange_rates 읽기 전용 조회기 - 유니크 키(base_date, currency_code, announcement_sequence) 기준 캐시"""
+
+    def __init__(self, connect: Optional[Callable[[], Any]] = None, release: Optional[Callable[[Any], None]] = None,
+                 ttl_sec: float = RATE_CACHE_TTL_SEC, max_entries: int = RATE_CACHE_MAX_ENTRIES):
+        self._connect = connect
+        self._release = release
+        self.cache = TTLCache(ttl_sec, max_entries)
+        self._latest: Dict[str, RateRecord] = {}
+        self._latest_expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self.stats = {"latest_hits": 0, "latest_misses": 0, "bulk_refreshes": 0, "queries": 0}
+
+    def _connection_funcs(self) -> Tuple[Callable[[], Any], Callable[[Any], None]]:
+        if self._connect is None:
+            # 기본값은 crawler와 같은 DB_* 설정과 연결 풀
+            from crawler import get_db_connection
+            from db_pool import release_connection
+            self._connect, self._release = get_db_connection, release_connection
+        return self._connect, self._release or (lambda connection: connection.close())
+
+    def _with_connection(self, query: Callable[[Any], Any]):
+        connect, release = self._connection_funcs()
+        connection = connect()
+        if connection is None:
+            raise ConnectionError("DB 연결 실패")
+        self.stats["queries"] += 1
+        try:
+            return query(connection)
+        finally:
+            release(connection)
+
+    def _query(self, sql: str, params: tuple):
+        def fetch(connection):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        return self._with_connection(fetch)
+
+    def refresh_latest(self) -> int:
+        """통화별 최신 행을 한 번의 쿼리로 다시 읽어 캐시에 적재하고 통화 수 반환"""
+        since = date.today() - timedelta(days=RATE_LOOKUP_LOOKBACK_DAYS)
+        latest = self._with_connection(lambda connection: load_latest_rates(connection, since))
+        for record in latest.values():
+            self.cache.put((record.base_date, record.currency_code, record.announcement_sequence), record)
+        self._latest = latest
+        self._latest_expires_at = time.monotonic() + self.cache.ttl
+        self.stats["bulk_refreshes"] += 1
+        return len(latest)
+
+    def get_latest_rate(self, currency: str) -> Optional[RateRecord]:
+        """통화의 가장 최근 기준일·고시회차 환율 (없으면 None, DB 오류는 예외로 전달)"""
+        currency = currency.upper()
+        if time.monotonic() >= self._latest_expires_at:
+            # 동시에 만료를 본 스레드 중 하나만 일괄 조회
+            with self._refresh_lock:
+                if time.monotonic() >= self._latest_expires_at:
+                    self.refresh_latest()
+                    self.stats["latest_misses"] += 1
+                    return self._latest.get(currency)
+        self.stats["latest_hits"] += 1
+        return self._latest.get(currency)
+
+    def get_rate(self, currency: str, base_date: date, sequence: Optional[int] = None) -> Optional[RateRecord]:
+        """기준일의 통화 환율 (sequence가 없으면 그날 마지막 고시회차, 없으면 None, DB 오류는 예외로 전달)"""
+        currency = currency.upper()
+        key = (base_date, currency, LAST_SEQUENCE if sequence is None else sequence)
+        cached = self.cache.get(key)
+        if cached is not _MISSING:
+            return cached
+
+        if sequence is None:
+            rows = self._query(LAST_SEQUENCE_RATE_SQL, (base_date, currency))
+        else:
+            rows = self._query(RATE_SQL, (base_date, currency, sequence))
+        record = record_from_row(rows[0]) if rows else None
+        # 없는 행도 TTL 동안 캐시하여 반복 조회가 DB로 가지 않도록 함
+        self.cache.put(key, record)
+        if record is not None and sequence is None:
+            self.cache.put((record.base_date, record.currency_code, record.announcement_sequence), record)
+        return record
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """캐시 적중/미적중/만료/제거 횟수와 일괄 조회 횟수"""
+        lookups = self.cache.stats["hits"] + self.cache.stats["misses"]
+        return {
+            **self.cache.stats,
+            **self.stats,
+            "entries": len(self.cache),
+            "max_entries": self.cache.max_entries,
+            "hit_ratio": round(self.cache.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+    def invalidate(self, rates: RateBatch):
+        """저장한 행의 캐시 항목(회차 지정/마지막 회차)을 지우고 최신 환율은 다음 조회 때 다시 읽음
+
+        같은 프로세스의 저장만 반영되며, 다른 프로세스가 저장한 값은 TTL이 지나야 보인다.
+        """
+        if not rates:
+            return
+        for key in zip(rates.column("base_date"), rates.column("currency_code"), rates.column("announcement_sequence")):
+            self.cache.discard(key)
+            self.cache.discard((key[0], key[1], LAST_SEQUENCE))
+        self._latest_expires_at = 0.0
+
+    def clear(self):
+        self.cache.clear()
+        self._latest = {}
+        self._latest_expires_at = 0.0
+
+
+# 모듈 수준 조회기: 프로세스(웜 컨테이너) 간 캐시 유지
+_default = RateLookup()
+
+
+def get_latest_rate(currency: str) -> Optional[RateRecord]:
+    return _default.get_latest_rate(currency)
+
+
+def get_rate(currency: str, base_date: date, sequence: Optional[int] = None) -> Optional[RateRecord]:
+    return _default.get_rate(currency, base_date, sequence)
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    return _default.cache_stats()
+
+
+def invalidate_rates(rates: RateBatch):
+    _default.invalidate(rates)
+
+
+def clear_cache():
+    _default.clear()
@@ -0,0 +1,220 @@
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Union
+
+from rate_records import RateBatch
+
+ALL_CURRENCIES = "all"
+
+PARSER_FEATURES = 'lxml'
+
+DATE_PATTERN = re.compile(r'(\d{4})년\s*(\d{2})월\s*(\d{2})일')
+TIME_PATTERN = re.compile(r'(\d{2})시\s*(\d{2})분\s*(\d{2})초')
+SEQUENCE_PATTERN = re.compile(r'(\d+)\s*회차')
+# 통화 셀 텍스트(예: "미국 USD", "일본 JPY (100)")에서 통화코드 추출
+CURRENCY_CODE_PATTERN = re.compile(r'\b([A-Z]{3})\b')
+# 헤더(txtRateBox)와 환율표(tblBasic) 영역의 class (여러 class 중 하나로 붙어 있어도 일치)
+RATE_AREA_CLASS_PATTERN = re.compile(r'(?:^|\s)(?:txtRateBox|tblBasic)(?:\s|$)')
+
+# 빈값/특수값으로 취급하는 셀 텍스트
+EMPTY_CELL_VALUES = frozenset(['', '-', 'N/A', 'null', 'None'])
+
+# tblBasic 한 행의 최소 셀 수 (통화 + 환율 10개)
+RATE_ROW_CELLS = 11
+
+
+class RateHeader(NamedTuple):
+    """txtRateBox 헤더 정보"""
+    base_date: Optional[date]
+    announcement_datetime: Optional[datetime]
+    query_datetime: Optional[datetime]
+    announcement_sequence: Optional[int] = None
+
+
+class RateRow(NamedTuple):
+    """tblBasic 통화별 환율 행"""
+    currency_code: str
+    currency_text: str
+    cash_buy: float
+    cash_buy_spread: float
+    cash_sell: float
+    cash_sell_spread: float
+    remit_send: float
+    remit_receive: float
+    check_sell: float
+    base_rate: float
+    exchange_fee_rate: float
+    conversion_rate: float
+
+
+class RatePage(NamedTuple):
+    """환율 페이지 파싱 결과"""
+    header: RateHeader
+    rows: List[RateRow]
+
+
+@lru_cache(maxsize=None)
+def rate_page_strainer():
+    """문서 전체 대신 필요한 두 영역(txtRateBox 헤더, tblBasic 테이블)만 트리로 구성하는 SoupStrainer
+
+    bs4는 첫 파싱 때 import (변경 없음 경로 등 파싱하지 않는 실행의 콜드 스타트 단축)
+    """
+    from bs4 import SoupStrainer
+
+    # (name, attrs)를 받는 함수 필터는 bs4 4.13부터 태그 하나만 받아 TypeError가 나므로 태그 이름/class 필터로 지정.
+    # 파싱 중 class 값이 4.12는 공백 구분 문자열, 4.13부터는 class별로 비교되므로 정규식으로 둘 다 맞춤
+    return SoupStrainer(['p', 'table'], attrs={'class': RATE_AREA_CLASS_PATTERN})
+
+
+def parse_date_kr(text: str) -> Optional[date]:
+    """"2024년 01월 02일" 형식 날짜 파싱"""
+    m = DATE_PATTERN.search(text)
+    if not m:
+        return None
+    return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+
+
+def parse_time_kr(text: str) -> Optional[tuple]:
+    """"09시 05분 12초" 형식 시각 파싱"""
+    m = TIME_PATTERN.search(text)
+    if not m:
+        return None
+    return int(m.group(1)), int(m.group(2)), int(m.group(3))
+
+
+def parse_sequence_kr(text: str) -> Optional[int]:
+    """"(3회차)" 형식 고시회차 파싱"""
+    m = SEQUENCE_PATTERN.search(text)
+    return int(m.group(1)) if m else None
+
+
+def combine_datetime(d: Optional[date], t: Optional[tuple]) -> Optional[datetime]:
+    """날짜와 (시, 분, 초)를 datetime으로 결합"""
+    if d and t:
+        return datetime(d.year, d.month, d.day, t[0], t[1], t[2])
+    return None
+
+
+def parse_float(text: str) -> float:
+    """안전한 float 파싱 - 빈값, 특수값, 에러 시 0.0 반환"""
+    text = text.strip()
+    if text in EMPTY_CELL_VALUES:
+        return 0.0
+    try:
+        return float(text.replace(',', ''))
+    except ValueError:
+        return 0.0
+
+
+def _parse_header(rate_box) -> RateHeader:
+    """txtRateBox의 em 라벨별 strong 값을 한 번 순회로 모아 기준일/고시일시/조회시각 파싱"""
+    values: Dict[str, List[str]] = {}
+    label: Optional[str] = None
+    for tag in rate_box.find_all(('em', 'strong')):
+        if tag.name == 'em':
+            label = tag.get_text()
+            values[label] = []
+        elif label is not None:
+            values[label].append(tag.get_text())
+
+    def strongs_for(keyword: str) -> List[str]:
+        for key, texts in values.items():
+            if keyword in key:
+                return texts
+        return []
+
+    base_date = None
+    base_strongs = strongs_for('기준일')
+    if base_strongs:
+        base_date = parse_date_kr(base_strongs[0])
+
+    # 고시일시: 날짜 strong + 시간 strong (+ 회차 strong)
+    announcement_dt = None
+    announcement_sequence = None
+    ann_strongs = strongs_for('고시일시')
+    if len(ann_strongs) > 1:
+        announcement_dt = combine_datetime(parse_date_kr(ann_strongs[0]), parse_time_kr(ann_strongs[1]))
+    if len(ann_strongs) > 2:
+        announcement_sequence = parse_sequence_kr(ann_strongs[2])
+
+    # 조회시각: 한 strong에 날짜+시간
+    query_dt = None
+    query_strongs = strongs_for('조회시각')
+    if query_strongs:
+        query_dt = combine_datetime(parse_date_kr(query_strongs[0]), parse_time_kr(query_strongs[0]))
+
+    return RateHeader(base_date, announcement_dt, query_dt, announcement_sequence)
+
+
+def _parse_rows(rate_table, currencies: Union[str, Set[str]]) -> List[RateRow]:
+    """tblBasic에서 대상 통화 행 추출"""
+    want_all = currencies == ALL_CURRENCIES
+    rows: List[RateRow] = []
+    for tr in rate_table.find_all('tr'):
+        cells = tr.find_all('td', recursive=False)
+        if len(cells) < RATE_ROW_CELLS:
+            continue
+        currency_cell = cells[0]
+        currency_link = currency_cell.find('a')
+        currency_text = (currency_link or currency_cell).get_text().strip()
+        code_match = CURRENCY_CODE_PATTERN.search(currency_text)
+        if not code_match:
+            continue
+        currency_code = code_match.group(1)
+        if not want_all and currency_code not in currencies:
+            continue
+
+        rows.append(RateRow(currency_code, currency_text,
+                            *(parse_float(cell.get_text()) for cell in cells[1:RATE_ROW_CELLS])))
+        # 요청한 통화를 모두 찾으면 종료
+        if not want_all and len(rows) >= len(currencies):
+            break
+    return rows
+
+
+def parse_rate_page(html: str, currencies: Union[str, Set[str]] = ALL_CURRENCIES,
+                    on_tree: Optional[Callable[[], None]] = None) -> RatePage:
+    """환율 페이지 HTML에서 헤더와 대상 통화 행만 파싱
+
+    on_tree는 원본 HTML과 트리가 함께 있는 시점(트리 구성 직후)에 호출된다 (메모리 프로파일 스냅숏 등).
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, PARSER_FEATURES, parse_only=rate_page_strainer())
+    if on_tree is not None:
+        on_tree()
+
+    header = RateHeader(None, None, None)
+    rate_box = soup.find('p', class_='txtRateBox')
+    if rate_box is not None:
+        try:
+            header = _parse_header(rate_box)
+        except Exception as e:
+            print(f"날짜 파싱 중 오류 발생: {e}, 오늘 날짜를 사용합니다.")
+    else:
+        print("txtRateBox를 찾을 수 없어 오늘 날짜를 사용합니다.")
+
+    rate_table = soup.find('table', class_='tblBasic')
+    if rate_table is None:
+        print("환율 테이블(tblBasic)을 찾을 수 없습니다.")
+        return RatePage(header, [])
+
+    return RatePage(header, _parse_rows(rate_table, currencies))
+
+
+def build_rate_batch(page: RatePage, announcement_sequence: int, announcement_type: str,
+                     batch: Optional[RateBatch] = None, fallback_date: Optional[date] = None) -> RateBatch:
+    """파싱 결과를 저장용 열 지향 배치에 추가 (헤더의 고시회차가 있으면 그 회차)
+
+    헤더에 기준일이 없으면 fallback_date(과거 조회일 등), 그것도 없으면 오늘 날짜를 기준일로 쓴다.
+    """
+    header = page.header
+    base_date = header.base_date or fallback_date or date.today()
+    announcement_sequence = header.announcement_sequence or announcement_sequence
+    batch = batch if batch is not None else RateBatch()
+    for row in page.rows:
+        # RateRow의 환율 값 10개(cash_buy ~ conversion_rate)는 RateRecord와 같은 순서
+        batch.append((base_date, row.currency_code, announcement_sequence, announcement_type,
+                      *row[2:], header.announcement_datetime, header.query_datetime))
+    return batch
@@ -0,0 +1,135 @@
+from array import array
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class RateRecord(NamedTuple):
+    """exchange_rates 한 행 (필드 순서 = 저장 컬럼 순서)"""
+    base_date: date
+    currency_code: str
+    announcement_sequence: int
+    announcement_type: str
+    cash_buy: float
+    cash_buy_spread: float
+    cash_sell: float
+    cash_sell_spread: float
+    remit_send: float
+    remit_receive: float
+    check_sell: float
+    base_rate: float
+    exchange_fee_rate: float
+    conversion_rate: float
+    announcement_datetime: Optional[datetime]
+    query_datetime: Optional[datetime]
+
+
+RATE_COLUMNS: Tuple[str, ...] = RateRecord._fields
+# 유니크 키 컬럼 (base_date, currency_code, announcement_sequence)
+RATE_KEY_COLUMNS = RATE_COLUMNS[:3]
+# 환율 값 컬럼 (cash_buy ~ conversion_rate)
+RATE_VALUE_COLUMNS = RATE_COLUMNS[4:14]
+_VALUE_INDEXES = tuple(RATE_COLUMNS.index(name) for name in RATE_VALUE_COLUMNS)
+
+# 출력용 필드 이름
+RATE_FIELD_LABELS: Dict[str, str] = {
+    "base_date": "기준일",
+    "currency_code": "통화코드",
+    "announcement_sequence": "고시차수",
+    "announcement_type": "고시유형",
+    "cash_buy": "현찰 살 때 환율",
+    "cash_buy_spread": "현찰 살 때 Spread",
+    "cash_sell": "현찰 팔 때 환율",
+    "cash_sell_spread": "현찰 팔 때 Spread",
+    "remit_send": "송금 보낼 때 환율",
+    "remit_receive": "송금 받을 때 환율",
+    "check_sell": "외화 수표 팔 때 환율",
+    "base_rate": "매매기준율",
+    "exchange_fee_rate": "환가료율",
+    "conversion_rate": "미화 환산율",
+    "announcement_datetime": "고시일시",
+    "query_datetime": "조회시각",
+}
+
+
+def record_from_row(row: Sequence[Any]) -> RateRecord:
+    """exchange_rates 조회 행(RATE_COLUMNS 순서)을 RateRecord로 변환 (DECIMAL 환율 값은 float)"""
+    values = list(row)
+    for i in _VALUE_INDEXES:
+        if values[i] is not None:
+            values[i] = float(values[i])
+    return RateRecord._make(values)
+
+
+def _new_column(name: str):
+    # 환율 값은 double 배열, 고시회차는 int 배열, 나머지(날짜/문자열)는 같은 객체를 공유하는 list
+    if name in RATE_VALUE_COLUMNS:
+        return array('d')
+    if name == "announcement_sequence":
+        return array('i')
+    return []
+
+
+class RateBatch:
+    """환율 레코드를 필드별 배열에 모으는 열 지향 배치 (행마다 dict를 만들지 않음)"""
+
+    __slots__ = ("columns",)
+
+    def __init__(self, records: Iterable[Sequence[Any]] = ()):
+        self.columns: Dict[str, Any] = {name: _new_column(name) for name in RATE_COLUMNS}
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return len(self.columns["currency_code"])
+
+    def __iter__(self) -> Iterator[RateRecord]:
+        return self.records()
+
+    def append(self, values: Sequence[Any]):
+        """RATE_COLUMNS 순서의 값(RateRecord 또는 tuple) 한 행 추가"""
+        for column, value in zip(self.columns.values(), values):
+            column.append(value)
+
+    def append_rows(self, rows: Sequence[Sequence[Any]]):
+        """RATE_COLUMNS 순서의 행 목록을 열 단위로 한꺼번에 추가 (DB fetch 결과용)
+
+        NULL 환율 값은 파서의 빈 셀(-)과 같이 0.0으로 넣는다 (double 배열은 None을 담지 못함).
+        """
+        if not rows:
+            return
+        for column, values in zip(self.columns.values(), zip(*rows)):
+            if column.__class__ is array and None in values:
+                values = [0.0 if value is None else value for value in values]
+            column.extend(values)
+
+    def extend(self, other: 'RateBatch'):
+        for name, column in self.columns.items():
+            column.extend(other.columns[name])
+
+    def clear(self):
+        for column in self.columns.values():
+            del column[:]
+
+    def column(self, name: str):
+        """필드 하나의 배열 (복사 없이 반환)"""
+        return self.columns[name]
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[tuple]:
+        """RATE_COLUMNS 순서의 행 tuple (DB executemany 파라미터로 그대로 사용)"""
+        if start == 0 and stop is None:
+            return zip(*self.columns.values())
+        return zip(*(column[start:stop] for column in self.columns.values()))
+
+    def records(self) -> Iterator[RateRecord]:
+        return map(RateRecord._make, self.rows())
+
+    def chunks(self, size: int) -> Iterator[List[tuple]]:
+        """size 행씩 나눈 행 tuple 목록"""
+        size = max(size, 1)
+        for start in range(0, len(self), size):
+            yield list(self.rows(start, start + size))
+
+
+def format_record(record: RateRecord) -> List[str]:
+    """레코드를 "이름: 값" 줄 목록으로 변환 (상세 출력용)"""
+    return [f"{RATE_FIELD_LABELS[name]}: {value}" for name, value in zip(RATE_COLUMNS, record)]
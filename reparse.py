@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backfill import parse_date
+from crawler import (
+    ANNOUNCEMENT_SEQUENCE, DB_BATCH_SIZE, create_table_if_not_exists, get_db_connection, insert_exchange_rates_batch,
+)
+from db_pool import release_connection
+from metrics import log
+from page_archive import PAGE_ARCHIVE_DIR, iter_index, read_page
+from rate_parser import ALL_CURRENCIES, build_rate_batch, parse_rate_page
+from rate_records import RateBatch
+
+# 파싱 프로세스 수 (기본값: CPU 수)
+REPARSE_WORKERS = int(os.environ.get('REPARSE_WORKERS', str(os.cpu_count() or 1)))
+# 프로세스에 한 번에 넘기는 페이지 수 (작업 전달 비용 분산)
+REPARSE_CHUNK_PAGES = int(os.environ.get('REPARSE_CHUNK_PAGES', '8'))
+
+
+def unique_entries(entries: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """같은 페이지를 같은 조건으로 여러 번 조회한 색인 항목은 한 번만 (내용이 같으면 결과도 같음)"""
+    seen = set()
+    for entry in entries:
+        currencies = entry.get("currencies", ALL_CURRENCIES)
+        key = (entry["digest"], entry.get("announcement_type"), entry.get("sequence"),
+               currencies if isinstance(currencies, str) else tuple(currencies))
+        if key in seen:
+            continue
+        seen.add(key)
+        yield entry
+
+
+def reparse_entry(archive_dir: str, entry: Dict[str, Any]) -> Tuple[str, Optional[RateBatch]]:
+    """보관 페이지 하나를 현재 파서로 다시 파싱 (프로세스 풀에서 실행, 실패 시 None)"""
+    try:
+        html = read_page(entry["digest"], archive_dir)
+        currencies = entry.get("currencies", ALL_CURRENCIES)
+        page = parse_rate_page(html, currencies if isinstance(currencies, str) else set(currencies))
+        # 헤더에 기준일이 없으면 오늘이 아닌 조회일로 저장 (과거 페이지가 당일 행을 덮어쓰지 않음)
+        inquiry_date = entry.get("inquiry_date")
+        return entry["digest"], build_rate_batch(page, entry.get("sequence") or ANNOUNCEMENT_SEQUENCE,
+                                                 entry.get("announcement_type") or "FIRST",
+                                                 fallback_date=parse_date(inquiry_date) if inquiry_date else None)
+    except Exception as e:
+        print(f"재파싱 실패 {entry['digest'][:12]}: {e}")
+        return entry["digest"], None
+
+
+def _reparse_chunk(archive_dir: str, entries: List[Dict[str, Any]]) -> List[Tuple[str, Optional[RateBatch]]]:
+    return [reparse_entry(archive_dir, entry) for entry in entries]
+
+
+def _chunked(entries: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for entry in entries:
+        chunk.append(entry)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_reparse(archive_dir: str = PAGE_ARCHIVE_DIR, start_date: Optional[date] = None,
+                end_date: Optional[date] = None, workers: int = REPARSE_WORKERS,
+                batch_size: int = DB_BATCH_SIZE, dry_run: bool = False) -> Dict[str, Any]:
+    """보관된 원본 페이지를 프로세스 풀로 다시 파싱하여 배치 upsert로 저장 (dry_run이면 파싱만)"""
+    started = time.perf_counter()
+    summary: Dict[str, Any] = {
+        "archive_dir": archive_dir,
+        "pages": 0,
+        "failed": [],
+        "rows": 0,
+        "batches": 0,
+        "dry_run": dry_run,
+    }
+    if not archive_dir:
+        print("PAGE_ARCHIVE_DIR가 설정되지 않았습니다")
+        return summary
+
+    connection = None
+    if not dry_run:
+        connection = get_db_connection()
+        if not connection or not create_table_if_not_exists(connection):
+            print("DB 연결/테이블 확인 실패로 재파싱을 중단합니다")
+            if connection:
+                release_connection(connection)
+            return summary
+
+    buffer = RateBatch()
+
+    def flush() -> bool:
+        if buffer and not dry_run:
+            results = insert_exchange_rates_batch(connection, buffer, batch_size)
+            if results is None:
+                return False
+            summary["batches"] += len(results)
+        summary["rows"] += len(buffer)
+        buffer.clear()
+        return True
+
+    def consume(results: List[Tuple[str, Optional[RateBatch]]]) -> bool:
+        for digest, batch in results:
+            summary["pages"] += 1
+            if batch is None:
+                summary["failed"].append(digest)
+            else:
+                buffer.extend(batch)
+        if len(buffer) >= batch_size and not flush():
+            print("DB 저장 실패로 재파싱을 중단합니다")
+            return False
+        log(f"  진행: {summary['pages']}페이지, 저장 {summary['rows']}건")
+        return True
+
+    chunks = _chunked(unique_entries(iter_index(archive_dir, start_date, end_date)), max(REPARSE_CHUNK_PAGES, 1))
+    workers = max(workers, 1)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # 진행 중인 묶음을 프로세스 수의 2배로 제한하여 파싱 결과가 저장보다 앞서 쌓이지 않게 하고,
+            # 제출 순서대로 결과를 받아 저장 순서를 색인 순서와 같게 유지
+            in_flight: Deque[Future] = deque()
+            aborted = False
+            for chunk in chunks:
+                in_flight.append(pool.submit(_reparse_chunk, archive_dir, chunk))
+                if len(in_flight) >= workers * 2 and not consume(in_flight.popleft().result()):
+                    aborted = True
+                    break
+            while in_flight and not aborted:
+                aborted = not consume(in_flight.popleft().result())
+            if aborted:
+                pool.shutdown(wait=False, cancel_futures=True)
+            elif not flush():
+                print("DB 저장 실패로 남은 배치를 저장하지 못했습니다")
+    finally:
+        if connection:
+            release_connection(connection)
+
+    elapsed = time.perf_counter() - started
+    summary["workers"] = workers
+    summary["elapsed_sec"] = round(elapsed, 3)
+    summary["pages_per_sec"] = round(summary["pages"] / elapsed, 1) if elapsed else 0.0
+    summary["rows_per_sec"] = round(summary["rows"] / elapsed, 1) if elapsed else 0.0
+    log(f"재파싱 완료: {summary['pages']}페이지 ({summary['pages_per_sec']} 페이지/s), 저장 {summary['rows']}건")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="보관된 원본 페이지를 다시 파싱하여 환율 재저장")
+    parser.add_argument('--archive-dir', default=PAGE_ARCHIVE_DIR, help="원본 페이지 보관 위치")
+    parser.add_argument('--start', help="조회일 시작 (YYYY-MM-DD)")
+    parser.add_argument('--end', help="조회일 끝 (YYYY-MM-DD)")
+    parser.add_argument('--workers', type=int, default=REPARSE_WORKERS, help="파싱 프로세스 수")
+    parser.add_argument('--batch-size', type=int, default=DB_BATCH_SIZE, help="upsert 배치 크기")
+    parser.add_argument('--dry-run', action='store_true', help="파싱만 하고 저장하지 않음")
+    args = parser.parse_args()
+
+    summary = run_reparse(
+        args.archive_dir,
+        parse_date(args.start) if args.start else None,
+        parse_date(args.end) if args.end else None,
+        args.workers, args.batch_size, args.dry_run,
+    )
+    summary["failed"] = len(summary["failed"])
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
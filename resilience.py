@@ -0,0 +1,178 @@
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+# 저장과 응답을 위해 항상 남겨 둘 시간(초) - 단계별 제한 시간은 남은 예산에서 이만큼 뺀 뒤 나눔
+DEADLINE_RESERVE_SEC = float(os.environ.get('DEADLINE_RESERVE_SEC', '3'))
+# Lambda context가 없을 때(로컬 실행) 기본 예산(초, 0이면 제한 없음) - 이벤트의 deadline_ms가 우선
+RUN_DEADLINE_SEC = float(os.environ.get('RUN_DEADLINE_SEC', '0'))
+# 단계별로 쓸 수 있는 남은 예산 비율 (없는 단계는 1.0)
+# http_fetch는 실패 시 Selenium 대체 조회 몫을 남기고, 대체 조회를 못 하면 http_only로 남은 시간을 모두 사용
+PHASE_SHARES: Dict[str, float] = {
+    "http_fetch": 0.3,
+    "selenium": 0.9,
+    "db_connect": 0.5,
+}
+# 남은 예산이 이보다 적으면 Selenium 대체 조회를 시작하지 않음(초)
+SELENIUM_MIN_BUDGET_SEC = float(os.environ.get('SELENIUM_MIN_BUDGET_SEC', '20'))
+
+# HTTP 조회 재시도 횟수와 지수 백오프 기준/상한(초)
+FETCH_RETRIES = int(os.environ.get('FETCH_RETRIES', '2'))
+FETCH_RETRY_BASE_SEC = float(os.environ.get('FETCH_RETRY_BASE_SEC', '0.5'))
+FETCH_RETRY_MAX_SEC = float(os.environ.get('FETCH_RETRY_MAX_SEC', '4'))
+
+# 은행 사이트 연속 실패 시 조회를 쉬는 기준 횟수와 시간(초)
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', '3'))
+CIRCUIT_COOLDOWN_SEC = float(os.environ.get('CIRCUIT_COOLDOWN_SEC', '120'))
+
+
+def backoff_delay(attempt: int, base: float = FETCH_RETRY_BASE_SEC, cap: float = FETCH_RETRY_MAX_SEC) -> float:
+    """attempt번째 재시도 전 대기 시간 (지수 백오프 상한 내 무작위, full jitter)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class Deadline:
+    """한 번의 실행에 주어진 시간 예산 (budget_sec가 없으면 제한 없음)"""
+
+    __slots__ = ("budget", "expires_at", "partial")
+
+    def __init__(self, budget_sec: Optional[float] = None):
+        self.budget = budget_sec if budget_sec and budget_sec > 0 else None
+        self.expires_at = time.monotonic() + self.budget if self.budget else None
+        # 시간이 부족해 일부만 수행했는지 여부
+        self.partial = False
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return float('inf')
+        return self.expires_at - time.monotonic()
+
+    def usable(self) -> float:
+        """예약 시간을 뺀, 다음 단계들이 쓸 수 있는 시간"""
+        return self.remaining() - DEADLINE_RESERVE_SEC
+
+    def timeout(self, phase: str, default: float) -> float:
+        """단계 제한 시간 - 설정값과 남은 예산 중 단계 몫 가운데 작은 값"""
+        if self.expires_at is None:
+            return default
+        return max(0.0, min(default, self.usable() * PHASE_SHARES.get(phase, 1.0)))
+
+    def allows(self, seconds: float) -> bool:
+        """예약 시간을 남기고도 seconds 이상 쓸 수 있는지"""
+        return self.usable() >= seconds
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "budget_ms": round(self.budget * 1000) if self.budget else None,
+            "remaining_ms": round(self.remaining() * 1000) if self.budget else None,
+            "partial": self.partial,
+        }
+
+
+# 현재 실행의 예산 (동시 실행 시 스레드/태스크별로 분리)
+_current: ContextVar[Optional[Deadline]] = ContextVar('deadline', default=None)
+
+
+def budget_from(event: Optional[Dict[str, Any]] = None, context=None) -> Optional[float]:
+    """Lambda context의 남은 시간, 이벤트의 deadline_ms, RUN_DEADLINE_SEC 순으로 실행 예산(초) 결정"""
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        return context.get_remaining_time_in_millis() / 1000
+    if event and event.get("deadline_ms"):
+        return float(event["deadline_ms"]) / 1000
+    return RUN_DEADLINE_SEC or None
+
+
+def start_deadline(budget_sec: Optional[float] = None) -> Deadline:
+    """새 실행 예산을 현재 컨텍스트에 설정"""
+    deadline = Deadline(budget_sec)
+    _current.set(deadline)
+    return deadline
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+def phase_timeout(phase: str, default: float) -> float:
+    """현재 실행 예산 기준 단계 제한 시간 (예산이 없으면 default)"""
+    deadline = _current.get()
+    return default if deadline is None else deadline.timeout(phase, default)
+
+
+def time_allows(seconds: float) -> bool:
+    """현재 실행 예산에 seconds 이상 여유가 있는지 (예산이 없으면 항상 True)"""
+    deadline = _current.get()
+    return deadline is None or deadline.allows(seconds)
+
+
+def mark_partial():
+    """시간 부족으로 일부만 수행했음을 현재 실행 예산에 기록"""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.partial = True
+
+
+class CircuitBreaker:
+    """연속 실패가 threshold회에 이르면 cooldown 동안 호출을 막고, 이후 한 번 시도하여 성공하면 다시 허용
+
+    half_open 상태에서는 시험 호출 하나만 허용하고 그 결과가 나올 때까지 나머지는 막으며,
+    시험 호출이 실패하면 다시 열린다. 결과를 기록하지 못한 시험 호출은 cooldown이 지나면 새 시험으로 대체한다.
+    모듈 수준 인스턴스로 Lambda 웜 호출 간 상태를 유지한다.
+    """
+
+    def __init__(self, name: str, threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 cooldown_sec: float = CIRCUIT_COOLDOWN_SEC):
+        self.name = name
+        self.threshold = max(threshold, 1)
+        self.cooldown_sec = cooldown_sec
+        self.failures = 0
+        self.opened_at = 0.0
+        # half_open 시험 호출 시작 시각 (0이면 진행 중인 시험 없음)
+        self.trial_started = 0.0
+        self.stats = {"opened": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    def state(self) -> str:
+        if self.failures < self.threshold:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown_sec:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state()
+            if state == "closed":
+                return True
+            now = time.monotonic()
+            if state == "half_open" and (not self.trial_started or now - self.trial_started >= self.cooldown_sec):
+                self.trial_started = now
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def release(self):
+        """결과를 판정하지 않고 끝난 시험 호출(실행 시간 부족 등)을 반납하여 다음 호출이 다시 시험하게 함"""
+        with self._lock:
+            self.trial_started = 0.0
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.trial_started = 0.0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                # 처음 열리거나 half_open 시험 호출이 실패하면 다시 cooldown 시작
+                if self.failures == self.threshold or self.trial_started:
+                    self.stats["opened"] += 1
+                self.opened_at = time.monotonic()
+                self.trial_started = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state(), "failures": self.failures, **self.stats}
@@ -0,0 +1,458 @@
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from metrics import count, span
+from rate_parser import ALL_CURRENCIES
+from rate_records import RATE_COLUMNS, RATE_KEY_COLUMNS, RATE_VALUE_COLUMNS, RateBatch
+
+# 저장 경로에서 롤업 테이블(rate_rollups)을 함께 갱신 (켜기 전에 rebuild로 기존 이력을 한 번 집계할 것)
+RATE_ROLLUPS = os.environ.get('RATE_ROLLUPS', '0').lower() not in ('0', 'false', 'no')
+# 집계할 환율 값 필드 (쉼표 구분, 기본값: 매매기준율과 현찰/송금 환율)
+ROLLUP_FIELDS = tuple(
+    name.strip() for name in os.environ.get(
+        'ROLLUP_FIELDS', 'base_rate,cash_buy,cash_sell,remit_send,remit_receive').split(',')
+    if name.strip() in RATE_VALUE_COLUMNS
+)
+ROLLUP_PERIODS = ("day", "week", "month")
+# 재집계 시 서버 측 커서에서 한 번에 가져올 행 수
+ROLLUP_REBUILD_CHUNK_SIZE = int(os.environ.get('ROLLUP_REBUILD_CHUNK_SIZE', '50000'))
+
+# 기간(일/주(월요일 시작)/월) × 통화 × 필드별 시가/고가/저가/종가와 합계/건수 (평균 = value_sum / value_count)
+# open_key/close_key = 기준일(YYYYMMDD) × 10000 + 고시회차: 시가/종가가 어느 고시인지 (증분 병합 시 비교)
+CREATE_ROLLUP_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS rate_rollups (
+    period_type VARCHAR(5) NOT NULL,
+    currency_code VARCHAR(10) NOT NULL,
+    rate_field VARCHAR(20) NOT NULL,
+    period_start DATE NOT NULL,
+    open_value DECIMAL(15, 4) NOT NULL,
+    high_value DECIMAL(15, 4) NOT NULL,
+    low_value DECIMAL(15, 4) NOT NULL,
+    close_value DECIMAL(15, 4) NOT NULL,
+    value_sum DECIMAL(24, 4) NOT NULL,
+    value_count INT NOT NULL,
+    mean_value DECIMAL(19, 8) AS (value_sum / value_count) VIRTUAL,
+    open_key BIGINT NOT NULL,
+    close_key BIGINT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (period_type, currency_code, rate_field, period_start)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+ROLLUP_COLUMNS = (
+    "period_type", "currency_code", "rate_field", "period_start", "open_value", "high_value", "low_value",
+    "close_value", "value_sum", "value_count", "open_key", "close_key",
+)
+_INSERT_ROLLUP_SQL = (
+    "INSERT INTO rate_rollups (" + ", ".join(ROLLUP_COLUMNS) + ")\n"
+    "VALUES (" + ", ".join(["%s"] * len(ROLLUP_COLUMNS)) + ")\n"
+    "ON DUPLICATE KEY UPDATE\n    "
+)
+# 새 환율 행의 집계를 기존 롤업 행에 더함 (MySQL은 SET을 왼쪽부터 적용하므로 시가/종가를 키보다 먼저 갱신)
+MERGE_ROLLUP_SQL = _INSERT_ROLLUP_SQL + """open_value = IF(VALUES(open_key) < open_key, VALUES(open_value), open_value),
+    open_key = LEAST(open_key, VALUES(open_key)),
+    close_value = IF(VALUES(close_key) > close_key, VALUES(close_value), close_value),
+    close_key = GREATEST(close_key, VALUES(close_key)),
+    high_value = GREATEST(high_value, VALUES(high_value)),
+    low_value = LEAST(low_value, VALUES(low_value)),
+    value_sum = value_sum + VALUES(value_sum),
+    value_count = value_count + VALUES(value_count),
+    updated_at = CURRENT_TIMESTAMP"""
+# 다시 집계한 값으로 교체 (정정된 환율, rebuild)
+REPLACE_ROLLUP_SQL = _INSERT_ROLLUP_SQL + ",\n    ".join(
+    f"{name} = VALUES({name})" for name in ROLLUP_COLUMNS[4:]
+) + ",\n    updated_at = CURRENT_TIMESTAMP"
+# 정정 후 값이 하나도 남지 않은 기간 삭제
+DELETE_ROLLUP_SQL = (
+    "DELETE FROM rate_rollups WHERE period_type = %s AND currency_code = %s AND rate_field = %s AND period_start = %s"
+)
+
+_FIELD_INDEXES = tuple(RATE_COLUMNS.index(name) for name in ROLLUP_FIELDS)
+
+# (기간, 기간 시작일, 통화, 필드)
+RollupKey = Tuple[str, date, str, str]
+# [시가, 고가, 저가, 종가, 합계, 건수, open_key, close_key]
+_OPEN, _HIGH, _LOW, _CLOSE, _SUM, _COUNT, _OPEN_KEY, _CLOSE_KEY = range(8)
+
+
+class RollupRecord(NamedTuple):
+    """rate_rollups 한 행"""
+    period_type: str
+    currency_code: str
+    rate_field: str
+    period_start: date
+    open: float
+    high: float
+    low: float
+    close: float
+    mean: float
+    count: int
+
+
+def rollups_enabled() -> bool:
+    return RATE_ROLLUPS and bool(ROLLUP_FIELDS)
+
+
+def period_start(period: str, day: date) -> date:
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def period_end(period: str, day: date) -> date:
+    """day가 속한 기간의 마지막 날"""
+    if period == "week":
+        return period_start(period, day) + timedelta(days=6)
+    if period == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return day
+
+
+def _last_complete_start(period: str, before: date) -> date:
+    """before 전날까지 끝나는 마지막 기간의 시작일"""
+    last = period_start(period, before - timedelta(days=1))
+    if period_end(period, last) >= before:
+        last = period_start(period, last - timedelta(days=1))
+    return last
+
+
+def _combine(bucket: List[Any], other: List[Any]):
+    """같은 기간의 두 집계를 합침 (bucket을 갱신)"""
+    if other[_OPEN_KEY] < bucket[_OPEN_KEY]:
+        bucket[_OPEN], bucket[_OPEN_KEY] = other[_OPEN], other[_OPEN_KEY]
+    if other[_CLOSE_KEY] > bucket[_CLOSE_KEY]:
+        bucket[_CLOSE], bucket[_CLOSE_KEY] = other[_CLOSE], other[_CLOSE_KEY]
+    if other[_HIGH] > bucket[_HIGH]:
+        bucket[_HIGH] = other[_HIGH]
+    if other[_LOW] < bucket[_LOW]:
+        bucket[_LOW] = other[_LOW]
+    bucket[_SUM] += other[_SUM]
+    bucket[_COUNT] += other[_COUNT]
+
+
+def aggregate_rates(rates: RateBatch, fields: Tuple[str, ...] = ROLLUP_FIELDS,
+                    periods: Tuple[str, ...] = ROLLUP_PERIODS) -> Dict[RollupKey, List[Any]]:
+    """배치를 기간 × 통화 × 필드별 시가/고가/저가/종가/합계/건수로 집계
+
+    행마다 일 단위로 먼저 모은 뒤 일 집계를 주/월로 합치므로 행당 작업은 필드 수에만 비례한다.
+    값은 DB 저장 정밀도(소수 4자리)로 반올림하여 DB에서 다시 집계한 결과와 같게 한다.
+    빈 셀은 0.0으로 저장되므로(rate_parser.parse_float) 0과 결측값은 집계에서 뺀다 (저가/평균 왜곡 방지).
+    """
+    dates = rates.column("base_date")
+    codes = rates.column("currency_code")
+    sequences = rates.column("announcement_sequence")
+    day_keys: Dict[date, int] = {}
+    orders = []
+    for base_date, sequence in zip(dates, sequences):
+        day_key = day_keys.get(base_date)
+        if day_key is None:
+            day_key = (base_date.year * 10000 + base_date.month * 100 + base_date.day) * 10000
+            day_keys[base_date] = day_key
+        orders.append(day_key + sequence)
+
+    days: Dict[Tuple[date, str, str], List[Any]] = {}
+    for name in fields:
+        for base_date, code, order, value in zip(dates, codes, orders, rates.column(name)):
+            if not value or value != value:
+                continue
+            value = round(float(value), 4)
+            bucket = days.get((base_date, code, name))
+            if bucket is None:
+                days[(base_date, code, name)] = [value, value, value, value, value, 1, order, order]
+                continue
+            if order < bucket[_OPEN_KEY]:
+                bucket[_OPEN], bucket[_OPEN_KEY] = value, order
+            if order > bucket[_CLOSE_KEY]:
+                bucket[_CLOSE], bucket[_CLOSE_KEY] = value, order
+            if value > bucket[_HIGH]:
+                bucket[_HIGH] = value
+            if value < bucket[_LOW]:
+                bucket[_LOW] = value
+            bucket[_SUM] += value
+            bucket[_COUNT] += 1
+
+    rollups: Dict[RollupKey, List[Any]] = {}
+    for (base_date, code, name), bucket in days.items():
+        for period in periods:
+            key = (period, period_start(period, base_date), code, name)
+            current = rollups.get(key)
+            if current is None:
+                rollups[key] = list(bucket)
+            else:
+                _combine(current, bucket)
+    return rollups
+
+
+def _rollup_rows(rollups: Dict[RollupKey, List[Any]], keys: Optional[Iterable[RollupKey]] = None) -> List[tuple]:
+    """ROLLUP_COLUMNS 순서의 행 (기본 키 순 정렬: 동시 저장 시 같은 순서로 행 잠금)"""
+    rows = []
+    for key in sorted(rollups if keys is None else keys, key=lambda k: (k[0], k[2], k[3], k[1])):
+        period, start, code, name = key
+        bucket = rollups[key]
+        rows.append((period, code, name, start, bucket[_OPEN], bucket[_HIGH], bucket[_LOW], bucket[_CLOSE],
+                     round(bucket[_SUM], 4), bucket[_COUNT], bucket[_OPEN_KEY], bucket[_CLOSE_KEY]))
+    return rows
+
+
+def _write_rollups(cursor, sql: str, rows: List[tuple], chunk_size: int):
+    for i in range(0, len(rows), max(chunk_size, 1)):
+        cursor.executemany(sql, rows[i:i + chunk_size])
+
+
+def load_stored_rows(cursor, rates: RateBatch, chunk_size: int) -> Dict[tuple, tuple]:
+    """배치와 유니크 키가 같은 저장 행의 집계 필드 값 (upsert 전에 호출, 키 → 값 tuple)"""
+    stored: Dict[tuple, tuple] = {}
+    keys = list(dict.fromkeys(zip(*(rates.column(name) for name in RATE_KEY_COLUMNS))))
+    with span("rollup"):
+        for i in range(0, len(keys), max(chunk_size, 1)):
+            chunk = keys[i:i + chunk_size]
+            cursor.execute(
+                f"SELECT {', '.join(RATE_KEY_COLUMNS + ROLLUP_FIELDS)} FROM exchange_rates "
+                f"WHERE ({', '.join(RATE_KEY_COLUMNS)}) IN ({', '.join(['(%s, %s, %s)'] * len(chunk))})",
+                [value for key in chunk for value in key],
+            )
+            for row in cursor.fetchall():
+                stored[(row[0], row[1], row[2])] = tuple(None if v is None else float(v) for v in row[3:])
+    return stored
+
+
+def _same_values(stored: tuple, values: tuple) -> bool:
+    """저장 값과 새 값이 저장 정밀도(소수 4자리)에서 같은지"""
+    for old, new in zip(stored, values):
+        if new is not None and new != new:
+            new = None
+        if old is None or new is None:
+            if old is not new:
+                return False
+        elif abs(old - round(new, 4)) > 1e-9:
+            return False
+    return True
+
+
+def _recompute(cursor, keys: Set[RollupKey]) -> Dict[RollupKey, List[Any]]:
+    """정정된 기간의 롤업을 exchange_rates에서 다시 집계 (upsert 후, 같은 트랜잭션에서 호출)"""
+    from export import build_export_query
+
+    codes = {code for _, _, code, _ in keys}
+    start = min(period_start(period, day) for period, day, _, _ in keys)
+    end = max(period_end(period, day) for period, day, _, _ in keys)
+    sql, params = build_export_query(codes, start, end)
+    cursor.execute(sql, params)
+    batch = RateBatch()
+    batch.append_rows(cursor.fetchall())
+    rollups = aggregate_rates(batch, tuple({name for _, _, _, name in keys}),
+                              tuple({period for period, _, _, _ in keys}))
+    return {key: rollups[key] for key in keys if key in rollups}
+
+
+def update_rollups(cursor, rates: RateBatch, stored: Dict[tuple, tuple], chunk_size: int) -> Dict[str, int]:
+    """upsert한 배치를 롤업에 반영 (upsert와 같은 트랜잭션에서 호출)
+
+    새 키의 행은 배치 집계를 기존 롤업 행에 병합하고, 값이 같은 재저장은 건너뛰며,
+    값이 바뀐 기존 키(정정)는 고가/저가를 되돌릴 수 없으므로 해당 기간만 exchange_rates에서 다시 집계한다.
+    """
+    result = {"merged": 0, "recomputed": 0, "deleted": 0, "unchanged": 0}
+    if not rates:
+        return result
+    with span("rollup"):
+        latest: Dict[tuple, tuple] = {}
+        for row in rates.rows():
+            latest[row[:3]] = row
+        fresh = RateBatch()
+        dirty: Set[RollupKey] = set()
+        for key, row in latest.items():
+            previous = stored.get(key)
+            if previous is None:
+                fresh.append(row)
+            elif _same_values(previous, tuple(row[i] for i in _FIELD_INDEXES)):
+                result["unchanged"] += 1
+            else:
+                base_date, code, _ = key
+                dirty.update((period, period_start(period, base_date), code, name)
+                             for period in ROLLUP_PERIODS for name in ROLLUP_FIELDS)
+
+        if fresh:
+            rows = _rollup_rows(aggregate_rates(fresh))
+            _write_rollups(cursor, MERGE_ROLLUP_SQL, rows, chunk_size)
+            result["merged"] = len(rows)
+        if dirty:
+            # 병합 뒤에 다시 집계하므로 같은 기간의 새 행도 포함된 값으로 교체됨
+            recomputed = _recompute(cursor, dirty)
+            rows = _rollup_rows(recomputed)
+            _write_rollups(cursor, REPLACE_ROLLUP_SQL, rows, chunk_size)
+            result["recomputed"] = len(rows)
+            # 정정으로 값이 모두 빠진(0/결측) 기간은 이전 롤업이 남지 않도록 삭제
+            stale = [(period, code, name, start) for period, start, code, name in sorted(dirty - recomputed.keys())]
+            if stale:
+                _write_rollups(cursor, DELETE_ROLLUP_SQL, stale, chunk_size)
+                result["deleted"] = len(stale)
+    count("rollup_rows", result["merged"] + result["recomputed"])
+    return result
+
+
+def load_rollups(connection, currency_code: str, rate_field: str = "base_rate", period: str = "day",
+                 start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[RollupRecord]:
+    """통화/필드의 기간별 롤업 (기간 시작일 순)"""
+    where = ["period_type = %s", "currency_code = %s", "rate_field = %s"]
+    params: List[Any] = [period, currency_code, rate_field]
+    if start_date:
+        where.append("period_start >= %s")
+        params.append(start_date)
+    if end_date:
+        where.append("period_start <= %s")
+        params.append(end_date)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT period_type, currency_code, rate_field, period_start, open_value, high_value, low_value, "
+            "close_value, value_sum, value_count FROM rate_rollups WHERE " + " AND ".join(where)
+            + " ORDER BY period_start",
+            params,
+        )
+        rows = cursor.fetchall()
+    return [
+        RollupRecord(period_type, code, name, start, float(open_value), float(high), float(low), float(close),
+                     float(value_sum) / value_count, value_count)
+        for period_type, code, name, start, open_value, high, low, close, value_sum, value_count in rows
+    ]
+
+
+def rebuild_rollups(read_connection, write_connection, currencies: Union[str, Set[str]] = ALL_CURRENCIES,
+                    start_date: Optional[date] = None, end_date: Optional[date] = None,
+                    chunk_size: int = ROLLUP_REBUILD_CHUNK_SIZE, batch_size: int = 500) -> Dict[str, Any]:
+    """exchange_rates 이력을 기준일 순으로 읽어 롤업을 다시 집계하고 기존 값을 교체
+
+    기간 일부만 지정해도 걸치는 주/월 전체를 읽도록 범위를 넓히고, 넓힌 범위에 온전히 들어가는 기간만 기록한다.
+    읽은 기준일이 기간 끝을 지난 집계부터 기록하므로 메모리는 진행 중인 기간의 집계 분량으로 일정하다.
+    기록할 때마다 같은 트랜잭션에서 그때까지 끝난 기간의 기존 롤업 행을 먼저 지우므로,
+    원본 행이 없어지거나 값이 모두 0/결측인 기간의 이전 롤업은 남지 않는다.
+    읽기는 서버 측 커서라 쓰기는 별도 연결로 한다.
+    """
+    from export import build_export_query, stream_batches
+
+    if start_date:
+        start_date = min(period_start(period, start_date) for period in ROLLUP_PERIODS)
+    if end_date:
+        end_date = max(period_end(period, end_date) for period in ROLLUP_PERIODS)
+    summary: Dict[str, Any] = {
+        "start_date": start_date.isoformat() if start_date else None,
+        "end_date": end_date.isoformat() if end_date else None,
+        "rows_read": 0,
+        "rollup_rows": 0,
+    }
+    started = time.perf_counter()
+    pending: Dict[RollupKey, List[Any]] = {}
+
+    def complete(key: RollupKey) -> bool:
+        # 주가 월 경계에 걸쳐 범위를 넓히면 앞뒤 월은 일부만 읽게 됨
+        return ((start_date is None or key[1] >= start_date)
+                and (end_date is None or period_end(key[0], key[1]) <= end_date))
+
+    # 기간별로 기존 롤업을 지운 마지막 기간 시작일 (그 이후부터 이어서 지움)
+    cleared: Dict[str, date] = {}
+
+    def clear_statements(before: Optional[date]) -> List[Tuple[str, List[Any]]]:
+        """기간 끝이 before보다 이른 (None이면 범위 끝까지) 온전한 기간 중 아직 지우지 않은 기존 롤업 삭제문"""
+        statements = []
+        for period in ROLLUP_PERIODS:
+            upper = _last_complete_start(period, before) if before else None
+            if end_date:
+                last = _last_complete_start(period, end_date + timedelta(days=1))
+                upper = last if upper is None else min(upper, last)
+            first = None
+            if start_date:
+                first = period_start(period, start_date)
+                if first < start_date:
+                    first = period_end(period, start_date) + timedelta(days=1)
+            if upper is not None and (upper < (first or upper) or upper <= cleared.get(period, date.min)):
+                continue
+            where = ["period_type = %s", f"rate_field IN ({', '.join(['%s'] * len(ROLLUP_FIELDS))})"]
+            params: List[Any] = [period, *ROLLUP_FIELDS]
+            if first:
+                where.append("period_start >= %s")
+                params.append(first)
+            if period in cleared:
+                where.append("period_start > %s")
+                params.append(cleared[period])
+            if upper is not None:
+                where.append("period_start <= %s")
+                params.append(upper)
+            if currencies != ALL_CURRENCIES:
+                where.append(f"currency_code IN ({', '.join(['%s'] * len(currencies))})")
+                params.extend(sorted(currencies))
+            statements.append(("DELETE FROM rate_rollups WHERE " + " AND ".join(where), params))
+            if upper is not None:
+                cleared[period] = upper
+        return statements
+
+    def flush(before: Optional[date]):
+        """기간 끝이 before보다 이른(더 읽을 행이 없는) 집계를 기록 (None이면 전부)"""
+        done = [key for key in pending if before is None or period_end(key[0], key[1]) < before]
+        rows = _rollup_rows(pending, [key for key in done if complete(key)])
+        deletes = clear_statements(before)
+        if rows or deletes:
+            write_connection.begin()
+            with write_connection.cursor() as cursor:
+                for sql, params in deletes:
+                    cursor.execute(sql, params)
+                _write_rollups(cursor, REPLACE_ROLLUP_SQL, rows, batch_size)
+            write_connection.commit()
+        for key in done:
+            del pending[key]
+        summary["rollup_rows"] += len(rows)
+
+    with write_connection.cursor() as cursor:
+        cursor.execute(CREATE_ROLLUP_TABLE_SQL)
+    sql, params = build_export_query(currencies, start_date, end_date)
+    for batch in stream_batches(read_connection, sql, params, chunk_size):
+        summary["rows_read"] += len(batch)
+        for key, bucket in aggregate_rates(batch).items():
+            current = pending.get(key)
+            if current is None:
+                pending[key] = bucket
+            else:
+                _combine(current, bucket)
+        # 기준일 순으로 읽으므로 마지막 기준일은 다음 배치에 이어질 수 있음
+        flush(batch.column("base_date")[-1])
+    flush(None)
+    elapsed = time.perf_counter() - started
+    summary["elapsed_sec"] = round(elapsed, 3)
+    summary["rows_per_sec"] = round(summary["rows_read"] / elapsed, 1) if elapsed else 0.0
+    return summary
+
+
+def main():
+    from crawler import get_db_connection, resolve_currencies
+    from db_pool import release_connection
+
+    parser = argparse.ArgumentParser(description="exchange_rates 이력으로 일/주/월 롤업(rate_rollups) 재집계")
+    parser.add_argument('--currencies', default='all', help="쉼표 구분 통화코드 또는 all")
+    parser.add_argument('--start', help="시작 기준일 (YYYY-MM-DD, 걸치는 주/월 전체로 확장)")
+    parser.add_argument('--end', help="종료 기준일 (YYYY-MM-DD, 걸치는 주/월 전체로 확장)")
+    parser.add_argument('--chunk-size', type=int, default=ROLLUP_REBUILD_CHUNK_SIZE, help="서버 측 커서 fetch 단위")
+    args = parser.parse_args()
+
+    read_connection = get_db_connection()
+    write_connection = get_db_connection()
+    if read_connection is None or write_connection is None:
+        raise SystemExit("DB 연결 실패")
+    try:
+        summary = rebuild_rollups(
+            read_connection, write_connection, resolve_currencies(args.currencies),
+            datetime.strptime(args.start, "%Y-%m-%d").date() if args.start else None,
+            datetime.strptime(args.end, "%Y-%m-%d").date() if args.end else None,
+            args.chunk_size,
+        )
+    finally:
+        release_connection(read_connection)
+        release_connection(write_connection)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Union
+
+from backfill import FetchJob, execute_jobs, parse_date
+from crawler import DB_BATCH_SIZE, create_table_if_not_exists, get_db_connection, resolve_currencies
+from db_pool import release_connection
+from metrics import count, log
+from rate_parser import ALL_CURRENCIES
+
+# 동시에 진행하는 조회 작업 수 (전체 상한)
+SCHEDULER_CONCURRENCY = int(os.environ.get('SCHEDULER_CONCURRENCY', '8'))
+# 호스트별 초당 최대 요청 수 (0이면 제한 없음)
+SCHEDULER_RATE_PER_HOST = float(os.environ.get('SCHEDULER_RATE_PER_HOST', '4'))
+# 조회 실패 시 재시도 횟수와 지수 백오프(초) - 실제 대기는 0~백오프 사이 무작위(full jitter)
+SCHEDULER_MAX_RETRIES = int(os.environ.get('SCHEDULER_MAX_RETRIES', '3'))
+SCHEDULER_RETRY_BASE_SEC = float(os.environ.get('SCHEDULER_RETRY_BASE_SEC', '0.5'))
+SCHEDULER_RETRY_MAX_SEC = float(os.environ.get('SCHEDULER_RETRY_MAX_SEC', '8'))
+# 전체 작업 제한 시간(초, 0이면 없음) - 지나면 남은 작업은 시작하지 않고 expired로 집계
+SCHEDULER_DEADLINE_SEC = float(os.environ.get('SCHEDULER_DEADLINE_SEC', '0'))
+
+
+def build_jobs(currencies: Union[str, Set[str]], start_date: date, end_date: Optional[date] = None,
+               announcement_type: str = "FIRST", sequences: Iterable[int] = ()) -> Iterator[FetchJob]:
+    """기간 × 고시회차 작업 생성 (sequences가 있으면 회차 지정 조회)
+
+    조회 페이지 한 장에 모든 통화가 있으므로 작업은 (조회일, 고시회차)마다 하나이고, 대상 통화는 파싱에서 고른다.
+    """
+    codes = currencies if currencies == ALL_CURRENCIES else frozenset(currencies)
+    sequences = list(sequences)
+    day = start_date
+    while day <= (end_date or start_date):
+        if sequences:
+            for sequence in sequences:
+                yield FetchJob(codes, day, "SEQUENCE", sequence)
+        else:
+            yield FetchJob(codes, day, announcement_type)
+        day += timedelta(days=1)
+
+
+def run_jobs(jobs: Iterable[FetchJob], concurrency: int = SCHEDULER_CONCURRENCY,
+             rate_per_host: float = SCHEDULER_RATE_PER_HOST, max_retries: int = SCHEDULER_MAX_RETRIES,
+             deadline_sec: float = SCHEDULER_DEADLINE_SEC, batch_size: int = DB_BATCH_SIZE) -> Dict[str, Any]:
+    """조회 작업 목록을 백필과 같은 엔진(backfill.execute_jobs)으로 실행하고 요약 반환 (DB 연결 실패 시 전체 작업 실패)"""
+    connection = get_db_connection()
+    if not connection:
+        print("DB 연결 실패로 작업을 실행하지 않습니다")
+        return {"jobs": 0, "fetched": 0, "failed_jobs": [job.label() for job in jobs], "aborted": True}
+    try:
+        if not create_table_if_not_exists(connection):
+            return {"jobs": 0, "fetched": 0, "failed_jobs": [job.label() for job in jobs], "aborted": True}
+        result = execute_jobs(
+            connection, jobs, concurrency, rate_per_host, batch_size, max_retries=max_retries,
+            retry_base_sec=SCHEDULER_RETRY_BASE_SEC, retry_max_sec=SCHEDULER_RETRY_MAX_SEC,
+            deadline_sec=deadline_sec,
+        )
+    finally:
+        release_connection(connection)
+
+    elapsed = result["elapsed_sec"]
+    count("scheduler_jobs", result["jobs"])
+    count("scheduler_retries", result["retries"])
+    count("scheduler_expired", result["expired"])
+    summary = {
+        **result,
+        "failed_jobs": [job.label() for job in result["failed_jobs"]],
+        "concurrency": max(concurrency, 1),
+        "jobs_per_sec": round(result["fetched"] / elapsed, 1) if elapsed else 0.0,
+        "rows_per_sec": round(result["rows"] / elapsed, 1) if elapsed else 0.0,
+    }
+    log(f"스케줄러 완료: 작업 {summary['jobs']}건, 조회 {summary['fetched']}건, 재시도 {summary['retries']}회, "
+        f"기한 초과 {summary['expired']}건, 저장 {summary['rows']}건 ({summary['jobs_per_sec']} 작업/s)")
+    return summary
+
+
+def handler(event=None, context=None):
+    """Lambda 진입점 - event: start_date, end_date, currencies, announcement_type, sequences,
+    concurrency, rate_per_host, max_retries, deadline_sec"""
+    event = event or {}
+    start_date = parse_date(event.get("start_date") or date.today())
+    jobs = build_jobs(
+        resolve_currencies(event.get("currencies")), start_date,
+        parse_date(event["end_date"]) if event.get("end_date") else start_date,
+        event.get("announcement_type", "FIRST"), [int(s) for s in event.get("sequences", [])],
+    )
+    summary = run_jobs(
+        jobs,
+        concurrency=int(event.get("concurrency", SCHEDULER_CONCURRENCY)),
+        rate_per_host=float(event.get("rate_per_host", SCHEDULER_RATE_PER_HOST)),
+        max_retries=int(event.get("max_retries", SCHEDULER_MAX_RETRIES)),
+        deadline_sec=float(event.get("deadline_sec", SCHEDULER_DEADLINE_SEC)),
+    )
+    ok = not summary["failed_jobs"] and not summary.get("expired") and not summary["aborted"]
+    return {
+        "statusCode": 200 if ok else 207,
+        "message": "작업 완료" if ok else "작업 일부 실패",
+        **summary,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="(통화, 조회일, 고시회차) 조회 작업 동시 실행")
+    parser.add_argument('--start', required=True, help="시작일 (YYYY-MM-DD)")
+    parser.add_argument('--end', help="종료일 (YYYY-MM-DD, 기본값: 시작일)")
+    parser.add_argument('--currencies', default='all', help="쉼표 구분 통화코드 또는 all")
+    parser.add_argument('--type', default='FIRST', choices=['FIRST', 'LAST'], help="고시 구분")
+    parser.add_argument('--sequences', default='', help="조회할 고시회차 (쉼표 구분, 지정 시 --type 무시)")
+    parser.add_argument('--concurrency', type=int, default=SCHEDULER_CONCURRENCY, help="동시 조회 수")
+    parser.add_argument('--rate', type=float, default=SCHEDULER_RATE_PER_HOST, help="호스트별 초당 최대 요청 수")
+    parser.add_argument('--retries', type=int, default=SCHEDULER_MAX_RETRIES, help="작업별 재시도 횟수")
+    parser.add_argument('--deadline', type=float, default=SCHEDULER_DEADLINE_SEC, help="전체 제한 시간(초)")
+    parser.add_argument('--batch-size', type=int, default=DB_BATCH_SIZE, help="upsert 배치 크기")
+    args = parser.parse_args()
+
+    start_date = parse_date(args.start)
+    jobs = build_jobs(
+        resolve_currencies(args.currencies), start_date, parse_date(args.end) if args.end else start_date,
+        args.type, [int(s) for s in args.sequences.split(',') if s.strip()],
+    )
+    summary = run_jobs(jobs, args.concurrency, args.rate, args.retries, args.deadline, args.batch_size)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+from metrics import count, span
+from rate_parser import ALL_CURRENCIES
+from rate_records import RATE_COLUMNS, RATE_VALUE_COLUMNS, RateBatch
+
+# DB에 쓰지 못한 환율을 모아 둘 로컬 SQLite 파일 (빈 값이면 사용 안 함) - 웜 컨테이너 간 유지는 /tmp, 컨테이너 간 공유는 EFS 경로
+SPOOL_PATH = os.environ.get('SPOOL_PATH', '/tmp/exchange_rates_spool.db')
+# fallback: DB 연결/저장 실패 시에만 보관 / always: 항상 보관 후 남은 실행 시간에 DB로 반영 (크롤링이 DB 지연을 기다리지 않음)
+SPOOL_MODE = os.environ.get('SPOOL_MODE', 'fallback')
+# 보관분을 DB로 옮길 때 한 트랜잭션에 담는 최대 행 수
+SPOOL_FLUSH_ROWS = int(os.environ.get('SPOOL_FLUSH_ROWS', '2000'))
+# 기준일별 보관 고시회차 기록 유지 일수 (당일 고시 수집이 DB 없이 이어서 조회할 때 사용)
+SPOOL_SEQUENCE_RETENTION_DAYS = int(os.environ.get('SPOOL_SEQUENCE_RETENTION_DAYS', '7'))
+
+# 환율 값은 REAL, 고시회차는 INTEGER, 날짜/문자열은 TEXT(ISO 형식)
+_SQLITE_TYPES = {"announcement_sequence": "INTEGER"}
+# 유니크 키가 같은 행은 마지막 값만 남김 (DB upsert와 같은 결과), seq는 보관 순서 (AUTOINCREMENT로 재사용 안 함)
+CREATE_SPOOL_SQL = (
+    "CREATE TABLE IF NOT EXISTS spooled_rates (\n"
+    "    seq INTEGER PRIMARY KEY AUTOINCREMENT,\n    "
+    + ",\n    ".join(f"{name} {_SQLITE_TYPES.get(name, 'REAL' if name in RATE_VALUE_COLUMNS else 'TEXT')}"
+                     for name in RATE_COLUMNS)
+    + ",\n    spooled_at REAL NOT NULL,\n"
+    "    UNIQUE (base_date, currency_code, announcement_sequence) ON CONFLICT REPLACE\n"
+    ")"
+)
+CREATE_SEQUENCE_SQL = """
+CREATE TABLE IF NOT EXISTS spooled_sequences (
+    base_date TEXT NOT NULL,
+    currency_code TEXT NOT NULL,
+    announcement_sequence INTEGER NOT NULL,
+    PRIMARY KEY (base_date, currency_code)
+)
+"""
+INSERT_SPOOL_SQL = (
+    "INSERT INTO spooled_rates (" + ", ".join(RATE_COLUMNS) + ", spooled_at) "
+    "VALUES (" + ", ".join(["?"] * (len(RATE_COLUMNS) + 1)) + ")"
+)
+UPSERT_SEQUENCE_SQL = """
+INSERT INTO spooled_sequences (base_date, currency_code, announcement_sequence) VALUES (?, ?, ?)
+ON CONFLICT (base_date, currency_code)
+DO UPDATE SET announcement_sequence = MAX(announcement_sequence, excluded.announcement_sequence)
+"""
+SELECT_SPOOL_SQL = "SELECT seq, " + ", ".join(RATE_COLUMNS) + " FROM spooled_rates ORDER BY seq LIMIT ?"
+
+_DATE_INDEX = RATE_COLUMNS.index("base_date")
+_DATETIME_INDEXES = (RATE_COLUMNS.index("announcement_datetime"), RATE_COLUMNS.index("query_datetime"))
+
+# 모듈 수준 연결: Lambda 웜 호출 간 유지 (스케줄러 등 여러 스레드가 공유하므로 lock으로 직렬화)
+_connection: Optional[sqlite3.Connection] = None
+_lock = threading.RLock()
+_flush_lock = threading.Lock()
+_stats = {"spooled_rows": 0, "flushed_rows": 0, "flushes": 0, "flush_failures": 0, "flush_sec": 0.0}
+
+
+def spool_enabled() -> bool:
+    return bool(SPOOL_PATH) and SPOOL_MODE in ("fallback", "always")
+
+
+def _connect() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        os.makedirs(os.path.dirname(os.path.abspath(SPOOL_PATH)), exist_ok=True)
+        connection = sqlite3.connect(SPOOL_PATH, timeout=10, check_same_thread=False, isolation_level=None)
+        # WAL: 쓰는 동안에도 다른 프로세스(재시도 명령 등)가 읽을 수 있고, 커밋은 로그 append 한 번
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL은 프로세스 중단에는 안전하고 커밋마다 fsync하지 않음
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(CREATE_SPOOL_SQL)
+        connection.execute(CREATE_SEQUENCE_SQL)
+        _connection = connection
+    return _connection
+
+
+def _encode(row: tuple, spooled_at: float) -> tuple:
+    values = list(row)
+    values[_DATE_INDEX] = values[_DATE_INDEX].isoformat()
+    for i in _DATETIME_INDEXES:
+        if values[i] is not None:
+            values[i] = values[i].isoformat(sep=' ')
+    values.append(spooled_at)
+    return tuple(values)
+
+
+def _decode(row: tuple) -> tuple:
+    values = list(row)
+    values[_DATE_INDEX] = date.fromisoformat(values[_DATE_INDEX])
+    for i in _DATETIME_INDEXES:
+        if values[i] is not None:
+            values[i] = datetime.fromisoformat(values[i])
+    return tuple(values)
+
+
+def spool_rates(rates: RateBatch) -> bool:
+    """환율을 로컬 보관소에 한 트랜잭션으로 추가 (같은 유니크 키는 새 값으로 교체, 실패 시 False)"""
+    if not rates:
+        return True
+    if not SPOOL_PATH:
+        return False
+    with span("spool_write"):
+        try:
+            with _lock:
+                connection = _connect()
+                now = time.time()
+                with connection:
+                    connection.execute("BEGIN IMMEDIATE")
+                    connection.executemany(INSERT_SPOOL_SQL, (_encode(row, now) for row in rates.rows()))
+                    connection.executemany(UPSERT_SEQUENCE_SQL, (
+                        (base_date.isoformat(), code, sequence) for base_date, code, sequence in zip(
+                            rates.column("base_date"), rates.column("currency_code"),
+                            rates.column("announcement_sequence"))
+                    ))
+                    connection.execute(
+                        "DELETE FROM spooled_sequences WHERE base_date < date('now', ?)",
+                        (f"-{SPOOL_SEQUENCE_RETENTION_DAYS} days",),
+                    )
+                _stats["spooled_rows"] += len(rates)
+        except (sqlite3.Error, OSError) as e:
+            print(f"로컬 보관 실패: {e}")
+            return False
+    count("spooled_rows", len(rates))
+    return True
+
+
+def spooled_sequence(base_date: date, currencies: Union[str, Set[str]]) -> int:
+    """기준일에 로컬 보관한 마지막 고시회차 (get_latest_sequence와 같은 기준, 없으면 0)"""
+    if not SPOOL_PATH or not os.path.exists(SPOOL_PATH):
+        return 0
+    try:
+        with _lock:
+            rows = _connect().execute(
+                "SELECT currency_code, announcement_sequence FROM spooled_sequences WHERE base_date = ?",
+                (base_date.isoformat(),),
+            ).fetchall()
+    except sqlite3.Error as e:
+        print(f"보관 고시회차 조회 실패: {e}")
+        return 0
+    latest = dict(rows)
+    if not latest:
+        return 0
+    if currencies == ALL_CURRENCIES:
+        return max(latest.values())
+    return min(latest.get(code, 0) for code in currencies)
+
+
+def spool_depth() -> int:
+    """DB에 아직 반영하지 않은 보관 행 수"""
+    if not SPOOL_PATH or not os.path.exists(SPOOL_PATH):
+        return 0
+    try:
+        with _lock:
+            return _connect().execute("SELECT COUNT(*) FROM spooled_rates").fetchone()[0]
+    except sqlite3.Error:
+        return 0
+
+
+def flush_spool(connection, write_batch: Callable[[Any, RateBatch], Optional[List[Dict[str, int]]]],
+                batch_rows: int = SPOOL_FLUSH_ROWS,
+                should_continue: Callable[[], bool] = lambda: True) -> Dict[str, Any]:
+    """보관 행을 보관 순서대로 batch_rows씩 write_batch(배치 upsert)로 DB에 반영하고 반영한 만큼 삭제
+
+    write_batch가 실패(None)하거나 should_continue()가 False면 남은 행은 다음 호출로 미룬다.
+    반영하는 동안 같은 키가 다시 보관되면 새 seq를 받으므로 삭제되지 않고 다음 호출에 반영된다.
+    """
+    result: Dict[str, Any] = {"rows": 0, "batches": 0, "ok": True}
+    if not SPOOL_PATH or not os.path.exists(SPOOL_PATH):
+        return result
+    # 다른 스레드가 반영 중이면 그쪽에 맡김 (같은 행을 두 번 쓰지 않도록)
+    if not _flush_lock.acquire(blocking=False):
+        return result
+    started = time.perf_counter()
+    try:
+        with span("spool_flush"):
+            while should_continue():
+                with _lock:
+                    rows = _connect().execute(SELECT_SPOOL_SQL, (max(batch_rows, 1),)).fetchall()
+                if not rows:
+                    break
+                batch = RateBatch()
+                batch.append_rows([_decode(row[1:]) for row in rows])
+                # DB 왕복 동안은 보관 lock을 잡지 않아 크롤링의 보관이 DB 지연을 기다리지 않음
+                if write_batch(connection, batch) is None:
+                    result["ok"] = False
+                    break
+                # 읽은 행은 seq가 가장 작은 연속 구간이므로 마지막 seq 이하를 삭제
+                with _lock:
+                    _connect().execute("DELETE FROM spooled_rates WHERE seq <= ?", (rows[-1][0],))
+                result["rows"] += len(rows)
+                result["batches"] += 1
+    except sqlite3.Error as e:
+        print(f"로컬 보관분 반영 실패: {e}")
+        result["ok"] = False
+    finally:
+        _flush_lock.release()
+    elapsed = time.perf_counter() - started
+    _stats["flushes"] += 1
+    _stats["flushed_rows"] += result["rows"]
+    _stats["flush_sec"] += elapsed
+    if not result["ok"]:
+        _stats["flush_failures"] += 1
+    count("spool_flushed_rows", result["rows"])
+    result["elapsed_sec"] = round(elapsed, 3)
+    result["rows_per_sec"] = round(result["rows"] / elapsed, 1) if elapsed and result["rows"] else 0.0
+    return result
+
+
+def get_spool_stats() -> Dict[str, Any]:
+    """남은 보관 행 수, 가장 오래된 보관분 경과 시간(초), 누적 보관/반영 행 수와 반영 처리량"""
+    oldest_sec = None
+    depth = 0
+    if SPOOL_PATH and os.path.exists(SPOOL_PATH):
+        try:
+            with _lock:
+                depth, oldest = _connect().execute(
+                    "SELECT COUNT(*), MIN(spooled_at) FROM spooled_rates").fetchone()
+            oldest_sec = round(time.time() - oldest, 1) if oldest else None
+        except sqlite3.Error:
+            pass
+    flush_sec = _stats["flush_sec"]
+    return {
+        "mode": SPOOL_MODE if spool_enabled() else "off",
+        "depth": depth,
+        "oldest_sec": oldest_sec,
+        **{name: value for name, value in _stats.items() if name != "flush_sec"},
+        "flush_rows_per_sec": round(_stats["flushed_rows"] / flush_sec, 1) if flush_sec else 0.0,
+    }
+
+
+def close_spool():
+    global _connection
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
@@ -0,0 +1,56 @@
+"""테스트 공통 설정
+
+크롤러 모듈은 import 시점에 환경변수를 읽으므로 대역 서버(benchmarks/stub_site.py)를 먼저 띄우고
+환경변수를 채운 뒤 import한다. DB는 benchmarks/fake_db.py의 가짜 MySQL을 테스트마다 새로 연결한다.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'benchmarks')]
+
+from fake_db import FakeDatabase, install  # noqa: E402
+from stub_site import StubSite  # noqa: E402
+
+SITE = StubSite().start()
+os.environ.update(SITE.env())
+os.environ.update({
+    "DB_HOST": "127.0.0.1", "DB_USERNAME": "test", "DB_PASSWORD": "test", "DB_NAME": "test",
+    "FETCH_MODE": "http", "FETCH_RETRY_BASE_SEC": "0.01", "FETCH_RETRY_MAX_SEC": "0.02",
+    "VERBOSE": "0", "EMIT_METRICS": "0", "CHANGE_DETECTION": "0", "SPOOL_PATH": "",
+    "PAGE_ARCHIVE_DIR": "", "CHANGE_FEED_DIR": "", "RATE_ROLLUPS": "0",
+})
+
+
+@pytest.fixture
+def site():
+    """대역 서버 (테스트마다 고시 회차 수와 오류율을 초기화)"""
+    SITE.announcements = 1
+    SITE.error_rate = 0.0
+    yield SITE
+
+
+@pytest.fixture
+def db():
+    """가짜 MySQL (연결 풀의 이전 연결은 버림)"""
+    from db_pool import close_pool
+
+    close_pool()
+    database = install(FakeDatabase())
+    yield database
+    close_pool()
+
+
+@pytest.fixture(autouse=True)
+def reset_run_state():
+    """은행 사이트 차단기는 웜 컨테이너 상태이므로 테스트마다 닫힌 상태, 실행 예산 없이 시작"""
+    from crawler import SITE_BREAKER
+    from resilience import start_deadline
+
+    SITE_BREAKER.failures = 0
+    SITE_BREAKER.opened_at = 0.0
+    SITE_BREAKER.trial_started = 0.0
+    start_deadline(None)
+    yield
@@ -0,0 +1,62 @@
+"""기간별 백필 (날짜별 실패 처리와 체크포인트)"""
+from datetime import date
+
+import pytest
+
+import backfill
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(backfill, "BACKFILL_CHECKPOINT_DIR", str(tmp_path))
+
+
+def stored_dates(db):
+    return sorted({row["base_date"].isoformat() for row in db.rows("exchange_rates")})
+
+
+def test_backfill_stores_each_date(site, db):
+    summary = backfill.run_backfill(date(2026, 3, 2), date(2026, 3, 4), {"USD"}, workers=2, rate_per_sec=0)
+
+    assert summary["fetched"] == 3 and summary["failed_dates"] == []
+    assert stored_dates(db) == ["2026-03-02", "2026-03-03", "2026-03-04"]
+
+
+def test_parse_error_fails_only_that_date(site, db, monkeypatch):
+    parse = backfill.parse_rate_page
+    broken = {"2026년 03월 03일"}
+
+    def parse_rate_page(html, currencies):
+        if any(text in html for text in broken):
+            raise ValueError("broken table")
+        return parse(html, currencies)
+
+    monkeypatch.setattr(backfill, "parse_rate_page", parse_rate_page)
+
+    summary = backfill.run_backfill(date(2026, 3, 2), date(2026, 3, 4), {"USD"}, workers=2, rate_per_sec=0)
+
+    assert summary["failed_dates"] == ["2026-03-03"]
+    assert stored_dates(db) == ["2026-03-02", "2026-03-04"]
+
+    # 다시 실행하면 실패한 날짜만 조회
+    broken.clear()
+    again = backfill.run_backfill(date(2026, 3, 2), date(2026, 3, 4), {"USD"}, workers=2, rate_per_sec=0)
+
+    assert again["skipped"] == 2 and again["fetched"] == 1
+    assert stored_dates(db) == ["2026-03-02", "2026-03-03", "2026-03-04"]
+
+
+def test_page_without_header_date_is_stored_under_inquiry_date(site, db, monkeypatch):
+    parse = backfill.parse_rate_page
+
+    def parse_rate_page(html, currencies):
+        page = parse(html, currencies)
+        # 보관 페이지 등 헤더(txtRateBox)에 기준일이 없는 경우
+        return page._replace(header=page.header._replace(base_date=None))
+
+    monkeypatch.setattr(backfill, "parse_rate_page", parse_rate_page)
+
+    summary = backfill.run_backfill(date(2020, 1, 2), date(2020, 1, 3), {"USD"}, workers=2, rate_per_sec=0)
+
+    assert summary["failed_dates"] == []
+    assert stored_dates(db) == ["2020-01-02", "2020-01-03"]
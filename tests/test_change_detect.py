@@ -0,0 +1,93 @@
+"""변경 감지 (같은 환율표는 파싱/저장 생략, 콜드 컨테이너는 DB 지문 비교)"""
+import pytest
+
+import change_detect
+import crawler
+
+
+class RecordingCursor:
+    def __init__(self, statements):
+        self.statements = statements
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql.strip().split()[0])
+
+    def fetchone(self):
+        return None
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self):
+        return RecordingCursor(self.statements)
+
+
+@pytest.fixture
+def detection(monkeypatch):
+    """변경 감지를 켜고 웜 컨테이너 지문과 파싱 횟수를 새로 시작"""
+    monkeypatch.setattr(crawler, "CHANGE_DETECTION", True)
+    monkeypatch.setattr(change_detect, "_local_fingerprints", {})
+    monkeypatch.setattr(change_detect, "_table_ready", False)
+    parses = []
+    parse = crawler.parse_rate_page
+
+    def parse_rate_page(*args, **kwargs):
+        parses.append(1)
+        return parse(*args, **kwargs)
+
+    monkeypatch.setattr(crawler, "parse_rate_page", parse_rate_page)
+    return parses
+
+
+def test_unchanged_page_skips_parse_and_store(site, db, detection):
+    first = crawler.handler({"currencies": "USD,JPY"})
+    written = db.stats["rows_written"]
+
+    again = crawler.handler({"currencies": "USD,JPY"})
+
+    assert first["count"] == 2 and len(detection) == 1
+    assert (again["statusCode"], again["message"], again["count"]) == (200, "변경 없음", 0)
+    assert len(detection) == 1 and db.stats["rows_written"] == written
+
+
+def test_changed_page_is_parsed_and_stored(site, db, detection, monkeypatch):
+    crawler.handler({"currencies": "USD"})
+    monkeypatch.setattr(site, "fragment", site.fragment.replace("1,434.09", "1,436.50"))
+
+    result = crawler.handler({"currencies": "USD"})
+
+    assert result["count"] == 1 and len(detection) == 2
+    assert [row["base_rate"] for row in db.rows("exchange_rates")] == [1436.5]
+
+
+def test_cold_container_uses_db_fingerprint(site, db, detection, monkeypatch):
+    crawler.handler({"currencies": "USD"})
+    assert len(db.rows("crawl_fingerprints")) == 1
+    # 새 컨테이너: 로컬 지문 없음
+    monkeypatch.setattr(change_detect, "_local_fingerprints", {})
+
+    result = crawler.handler({"currencies": "USD"})
+
+    assert result["message"] == "변경 없음" and len(detection) == 1
+    # DB 지문과 같았던 환율표는 다음 웜 실행부터 로컬에서 비교
+    key = change_detect.fetch_key({"USD"}, crawler.ANNOUNCEMENT_TYPE)
+    assert change_detect._local_fingerprints[key] == db.rows("crawl_fingerprints")[0]["content_hash"]
+
+
+def test_fingerprint_table_is_created_once(monkeypatch):
+    monkeypatch.setattr(change_detect, "_table_ready", False)
+    connection = RecordingConnection()
+
+    change_detect.load_fingerprint(connection, "key")
+    change_detect.save_fingerprint(connection, "key", "hash")
+    change_detect.load_fingerprint(connection, "key")
+
+    assert connection.statements == ["CREATE", "SELECT", "INSERT", "SELECT"]
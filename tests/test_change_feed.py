@@ -0,0 +1,105 @@
+"""환율 변경 피드 (offset 연속성, 세그먼트, 끊긴 줄 복구, 직전 저장 행 비교)"""
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from change_feed import ChangeFeed, compute_changes, load_previous_rows
+from crawler import create_table_if_not_exists, get_db_connection, insert_exchange_rates_batch
+from db_pool import release_connection
+from rate_records import RATE_COLUMNS, RateBatch, record_from_row
+
+
+def rate_row(code, base_date, sequence, base_rate):
+    now = datetime(base_date.year, base_date.month, base_date.day, 9, sequence)
+    return (base_date, code, sequence, "SEQUENCE", base_rate * 1.0175, 1.75, base_rate * 0.9825, 1.75,
+            base_rate * 1.01, base_rate * 0.99, base_rate * 0.988, base_rate, 3.5, 1.0, now, now)
+
+
+def events(count):
+    return [{"op": "announcement", "currency_code": "USD", "n": i} for i in range(count)]
+
+
+@pytest.fixture
+def feed(tmp_path):
+    return ChangeFeed(str(tmp_path), segment_records=4)
+
+
+def test_offsets_are_contiguous_across_segments(feed):
+    assert feed.append(events(3)) == (0, 2)
+    assert feed.append(events(7)) == (3, 9)
+
+    assert [event["offset"] for event in feed.read()] == list(range(10))
+    assert feed._segments() == [0, 4, 8]
+    assert feed.next_offset() == 10
+
+
+def test_read_from_offset_with_limit(feed):
+    feed.append(events(10))
+
+    assert [event["offset"] for event in feed.read(5)] == [5, 6, 7, 8, 9]
+    assert [event["offset"] for event in feed.read(3, limit=2)] == [3, 4]
+    assert list(feed.read(10)) == []
+
+
+def test_torn_last_line_is_skipped_and_repaired(feed):
+    feed.append(events(2))
+    with open(feed._segment_path(0), 'ab') as f:
+        f.write(b'{"offset":2,"op":"ann')
+
+    assert [event["offset"] for event in feed.read()] == [0, 1]
+    assert feed.next_offset() == 2
+
+    assert feed.append(events(1)) == (2, 2)
+    assert [event["offset"] for event in feed.read()] == [0, 1, 2]
+
+
+def test_compute_changes_ops():
+    previous = {"USD": record_from_row(rate_row("USD", date(2026, 3, 2), 1, 1400.0))}
+    rates = RateBatch([
+        rate_row("USD", date(2026, 3, 2), 1, 1400.0),
+        rate_row("USD", date(2026, 3, 2), 2, 1402.0),
+        rate_row("JPY", date(2026, 3, 2), 1, 950.0),
+        rate_row("USD", date(2026, 3, 1), 3, 1390.0),
+    ])
+
+    ops = [(event["currency_code"], event["announcement_sequence"], event["op"])
+           for event in compute_changes(previous, rates)]
+
+    assert ops == [("JPY", 1, "insert"), ("USD", 2, "announcement")]
+
+
+def test_load_previous_rows_reads_latest_stored_rows(db):
+    connection = get_db_connection()
+    try:
+        create_table_if_not_exists(connection)
+        insert_exchange_rates_batch(connection, RateBatch([
+            rate_row("USD", date(2026, 3, 2), 1, 1400.0),
+            rate_row("USD", date(2026, 3, 2), 2, 1402.0),
+            rate_row("JPY", date(2026, 3, 2), 1, 950.0),
+        ]))
+
+        previous = load_previous_rows(connection, RateBatch([rate_row("USD", date(2026, 3, 3), 1, 1410.0)]))
+    finally:
+        release_connection(connection)
+
+    assert list(previous) == ["USD"]
+    assert previous["USD"].announcement_sequence == 2 and previous["USD"].base_rate == 1402.0
+
+
+def test_record_from_row_converts_decimal_values():
+    row = list(rate_row("USD", date(2026, 3, 2), 1, 1400.0))
+    row[RATE_COLUMNS.index("base_rate")] = Decimal("1400.5000")
+    row[RATE_COLUMNS.index("cash_buy")] = None
+
+    record = record_from_row(row)
+
+    assert record.base_rate == 1400.5 and isinstance(record.base_rate, float)
+    assert record.cash_buy is None
+
+
+def test_feed_dir_layout(feed):
+    feed.append(events(1))
+
+    assert os.listdir(feed.segment_dir) == [f"{0:020d}.ndjson"]
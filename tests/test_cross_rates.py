@@ -0,0 +1,96 @@
+"""교차환율 행렬 (100단위 통화, 회차 선택, 매매 방향)"""
+import math
+import subprocess
+import sys
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from conftest import ROOT
+from crawler import create_table_if_not_exists, get_db_connection, insert_exchange_rates_batch
+from cross_rates import compute_cross_rate_stack, compute_cross_rates, load_rates
+from db_pool import release_connection
+from rate_records import RateBatch
+
+BASE_DATE = date(2026, 3, 2)
+
+
+def rate_row(code, base_rate, sequence=1, base_date=BASE_DATE, spread=0.0175):
+    now = datetime(base_date.year, base_date.month, base_date.day, 9, sequence)
+    return (base_date, code, sequence, "SEQUENCE", base_rate * (1 + spread), 1.75, base_rate * (1 - spread), 1.75,
+            base_rate * (1 + spread / 2), base_rate * (1 - spread / 2), base_rate * 0.988, base_rate, 3.5, 1.0,
+            now, now)
+
+
+def test_mid_rates_use_per_unit_krw_prices():
+    # JPY는 100엔 기준으로 고시
+    rates = compute_cross_rates(RateBatch([rate_row("USD", 1400.0), rate_row("JPY", 950.0),
+                                           rate_row("EUR", 1520.0)]))
+
+    assert rates.codes == ("EUR", "JPY", "USD", "KRW")
+    assert rates.rate("USD", "JPY") == pytest.approx(1400.0 / 9.5)
+    assert rates.rate("EUR", "USD") == pytest.approx(1520.0 / 1400.0)
+    assert rates.rate("JPY", "KRW") == pytest.approx(9.5)
+    assert rates.rate("KRW", "USD") == pytest.approx(1 / 1400.0)
+    assert rates.rate("USD", "USD") == 1.0
+
+
+def test_bid_ask_bracket_mid():
+    rates = compute_cross_rates(RateBatch([rate_row("USD", 1400.0), rate_row("JPY", 950.0)]))
+
+    for kind in ("cash", "remit"):
+        bid, ask = rates.rate("USD", "JPY", f"{kind}_bid"), rates.rate("USD", "JPY", f"{kind}_ask")
+        assert bid < rates.rate("USD", "JPY") < ask
+    # 현찰: USD를 현찰 매도 가격에 팔고 JPY를 현찰 매입 가격에 사는 경우
+    assert rates.rate("USD", "JPY", "cash_bid") == pytest.approx(1400.0 * 0.9825 / (9.5 * 1.0175))
+
+
+def test_latest_or_requested_sequence_and_missing_rates():
+    batch = RateBatch([rate_row("USD", 1400.0, 1), rate_row("USD", 1410.0, 2), rate_row("JPY", 950.0, 1),
+                       rate_row("CNH", 0.0, 2)])
+
+    latest = compute_cross_rates(batch, include_home=False)
+    first = compute_cross_rates(batch, sequence=1, include_home=False)
+
+    assert latest.rate("USD", "JPY") == pytest.approx(1410.0 / 9.5)
+    assert first.rate("USD", "JPY") == pytest.approx(1400.0 / 9.5)
+    # 고시 없음(0)과 선택한 회차에 행이 없는 통화는 NaN
+    assert math.isnan(latest.rate("CNH", "USD")) and math.isnan(latest.rate("USD", "CNH"))
+    assert math.isnan(first.rate("CNH", "JPY"))
+
+
+def test_stack_has_one_matrix_per_day():
+    next_day = BASE_DATE + timedelta(days=1)
+    batch = RateBatch([rate_row("USD", 1400.0), rate_row("JPY", 950.0),
+                       rate_row("USD", 1420.0, base_date=next_day), rate_row("JPY", 940.0, base_date=next_day)])
+
+    stack = compute_cross_rate_stack(batch)
+
+    assert stack.mid.shape == (2, 3, 3)
+    assert [stack.at(i).base_date for i in range(2)] == [BASE_DATE, next_day]
+    assert stack.at(1).rate("USD", "JPY") == pytest.approx(1420.0 / 9.4)
+    with pytest.raises(ValueError):
+        compute_cross_rates(batch)
+
+
+def test_load_rates_reads_stored_range(db):
+    connection = get_db_connection()
+    try:
+        create_table_if_not_exists(connection)
+        insert_exchange_rates_batch(connection, RateBatch([
+            rate_row("USD", 1400.0), rate_row("JPY", 950.0),
+            rate_row("USD", 1420.0, base_date=BASE_DATE + timedelta(days=1))]))
+
+        rates = compute_cross_rates(load_rates(connection, BASE_DATE))
+    finally:
+        release_connection(connection)
+
+    assert rates.rate("USD", "JPY") == pytest.approx(1400.0 / 9.5)
+
+
+def test_module_imports_without_numpy():
+    code = ("import sys; sys.modules['numpy'] = None; import cross_rates; from rate_records import RateBatch\n"
+            "try:\n    cross_rates.compute_cross_rates(RateBatch())\nexcept RuntimeError:\n    sys.exit(0)\n"
+            "sys.exit(1)")
+
+    assert subprocess.run([sys.executable, "-c", code], cwd=ROOT).returncode == 0
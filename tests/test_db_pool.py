@@ -0,0 +1,107 @@
+"""웜 컨테이너 DB 연결 풀 (재사용, 재접속, 폐기, 대기 시간 초과)"""
+import threading
+
+import pytest
+
+import db_pool
+from db_pool import acquire_connection, close_pool, get_pool_stats, release_connection
+
+
+class StubConnection:
+    """ping 결과를 지정할 수 있는 연결 (alive=False면 재접속 없는 ping 실패, reconnects=False면 재접속도 실패)"""
+
+    def __init__(self):
+        self.open = True
+        self.alive = True
+        self.reconnects = True
+        self.closed = False
+
+    def ping(self, reconnect=True):
+        if self.alive:
+            return
+        if not reconnect or not self.reconnects:
+            raise ConnectionError("MySQL server has gone away")
+        self.alive = True
+
+    def close(self):
+        self.open = False
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def empty_pool():
+    close_pool()
+    yield
+    close_pool()
+
+
+def stat_delta(before, name):
+    return get_pool_stats()[name] - before[name]
+
+
+def test_released_connection_is_reused():
+    before = get_pool_stats()
+    created = []
+
+    def factory():
+        created.append(StubConnection())
+        return created[-1]
+
+    first = acquire_connection(factory)
+    release_connection(first)
+    second = acquire_connection(factory)
+
+    assert second is first and len(created) == 1
+    assert (stat_delta(before, "misses"), stat_delta(before, "hits")) == (1, 1)
+    assert get_pool_stats()["in_use"] == before["in_use"] + 1
+    release_connection(second)
+    assert get_pool_stats()["idle"] == 1
+
+
+def test_dropped_connection_reconnects_in_place():
+    before = get_pool_stats()
+    connection = StubConnection()
+    release_connection(acquire_connection(lambda: connection))
+    connection.alive = False
+
+    assert acquire_connection(StubConnection) is connection
+    assert stat_delta(before, "reconnects") == 1
+    release_connection(connection)
+
+
+def test_dead_connection_is_discarded_and_replaced():
+    before = get_pool_stats()
+    dead = StubConnection()
+    release_connection(acquire_connection(lambda: dead))
+    dead.alive = dead.reconnects = False
+
+    replacement = acquire_connection(StubConnection)
+
+    assert replacement is not dead and dead.closed
+    assert stat_delta(before, "discards") == 1
+    # discard로 반환하면 풀에 남기지 않음
+    release_connection(replacement, discard=True)
+    assert replacement.closed and get_pool_stats()["idle"] == 0
+
+
+def test_acquire_times_out_when_every_slot_is_in_use(monkeypatch):
+    monkeypatch.setattr(db_pool, "_slots", threading.BoundedSemaphore(1))
+    monkeypatch.setattr(db_pool, "DB_POOL_TIMEOUT", 0.01)
+    before = get_pool_stats()
+    held = acquire_connection(StubConnection)
+
+    assert acquire_connection(StubConnection) is None
+    assert stat_delta(before, "timeouts") == 1
+    release_connection(held)
+    assert acquire_connection(StubConnection) is held
+    release_connection(held)
+
+
+def test_failed_factory_frees_the_slot(monkeypatch):
+    monkeypatch.setattr(db_pool, "_slots", threading.BoundedSemaphore(1))
+    monkeypatch.setattr(db_pool, "DB_POOL_TIMEOUT", 0.01)
+
+    assert acquire_connection(lambda: None) is None
+    connection = acquire_connection(StubConnection)
+    assert connection is not None
+    release_connection(connection)
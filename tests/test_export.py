@@ -0,0 +1,58 @@
+"""환율 이력 내보내기 (서버 측 커서 스트리밍, NULL 환율 값)"""
+import csv
+import gzip
+from datetime import date, datetime
+
+import pytest
+
+from crawler import UPSERT_SQL, create_table_if_not_exists, get_db_connection
+from db_pool import release_connection
+from export import export_rates
+from rate_records import RATE_COLUMNS
+
+CASH_BUY = RATE_COLUMNS.index("cash_buy")
+
+
+def rate_row(code, base_date, base_rate, cash_buy):
+    now = datetime(base_date.year, base_date.month, base_date.day, 9, 0)
+    return (base_date, code, 1, "FIRST", cash_buy, 1.75, base_rate * 0.9825, 1.75, base_rate * 1.01,
+            base_rate * 0.99, base_rate * 0.988, base_rate, 3.5, 1.0, now, now)
+
+
+@pytest.fixture
+def connection(db):
+    connection = get_db_connection()
+    create_table_if_not_exists(connection)
+    with connection.cursor() as cursor:
+        # 고시되지 않은 환율은 NULL로 저장된 이력
+        cursor.execute(UPSERT_SQL, rate_row("USD", date(2026, 3, 2), 1400.0, None))
+        cursor.execute(UPSERT_SQL, rate_row("JPY", date(2026, 3, 2), 950.0, 966.63))
+        cursor.execute(UPSERT_SQL, rate_row("USD", date(2026, 3, 3), 1410.0, 1434.68))
+    yield connection
+    release_connection(connection)
+
+
+def test_csv_export_streams_rows_with_null_rates(connection, tmp_path):
+    path = str(tmp_path / "rates.csv.gz")
+
+    summary = export_rates(connection, path, "csv", chunk_size=2)
+
+    assert (summary["rows"], summary["chunks"]) == (3, 2)
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(RATE_COLUMNS)
+    assert [(row[0], row[1], row[CASH_BUY]) for row in rows[1:]] == [
+        ("2026-03-02", "JPY", "966.63"), ("2026-03-02", "USD", "0.0"), ("2026-03-03", "USD", "1434.68")]
+
+
+def test_parquet_export_filters_currency_and_range(connection, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "rates.parquet")
+
+    summary = export_rates(connection, path, "parquet", {"USD"}, date(2026, 3, 2), date(2026, 3, 2))
+
+    assert summary["rows"] == 1
+    table = pq.read_table(path)
+    assert table.column("currency_code").to_pylist() == ["USD"]
+    assert table.column("cash_buy").to_pylist() == [0.0]
+    assert table.column("base_rate").to_pylist() == [1400.0]
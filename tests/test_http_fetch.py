@@ -0,0 +1,50 @@
+"""HTTP 조회 경로 (대역 서버의 조회 폼 응답)"""
+import pytest
+
+import crawler
+from http_fetcher import fetch_rate_page
+from rate_parser import ALL_CURRENCIES, parse_rate_page
+
+
+def test_fetch_rate_page_returns_rate_form_fragment(site):
+    html = fetch_rate_page("USD")
+
+    assert html is not None
+    assert 'txtRateBox' in html and 'tblBasic' in html
+    page = parse_rate_page(html, {"USD"})
+    assert [row.currency_code for row in page.rows] == ["USD"]
+    assert page.header.announcement_sequence == 1
+
+
+def test_fetch_rate_page_returns_none_on_server_error(site):
+    site.error_rate = 1.0
+
+    assert fetch_rate_page("USD", timeout=5) is None
+
+
+def test_fetch_page_http_follows_requested_sequence(site):
+    site.announcements = 3
+
+    html = crawler.fetch_page_http(ALL_CURRENCIES, "SEQUENCE", sequence=2)
+
+    page = parse_rate_page(html, ALL_CURRENCIES)
+    assert page.header.announcement_sequence == 2
+    assert len(page.rows) > 1
+
+
+def test_handler_stores_rates_fetched_over_http(site, db):
+    result = crawler.handler({"currencies": "USD,JPY"})
+
+    assert result["statusCode"] == 200
+    assert result["count"] == 2
+    assert sorted(row["currency_code"] for row in db.rows("exchange_rates")) == ["JPY", "USD"]
+
+
+@pytest.mark.parametrize("mode", ["first", "intraday"])
+def test_handler_reports_failure_when_rates_cannot_be_stored(site, db, monkeypatch, mode):
+    monkeypatch.setattr(crawler, "write_rates", lambda connection, rates: None)
+
+    result = crawler.handler({"currencies": "USD,JPY", "mode": mode})
+
+    assert result["statusCode"] == 500
+    assert result["count"] == 0
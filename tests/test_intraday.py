@@ -0,0 +1,66 @@
+"""당일 고시 회차 수집 (빠진 회차부터 다음 실행에서 이어서 조회)"""
+import crawler
+
+
+def stored_sequences(db):
+    return sorted({row["announcement_sequence"] for row in db.rows("exchange_rates")})
+
+
+def failing_sequences(monkeypatch, sequences):
+    """지정한 회차 조회만 실패하는 fetch_rate_page"""
+    fetch = crawler.fetch_rate_page
+
+    def fetch_rate_page(currency, announcement_type="FIRST", sequence=None, **kwargs):
+        if sequence in sequences:
+            return None
+        return fetch(currency, announcement_type, sequence=sequence, **kwargs)
+
+    monkeypatch.setattr(crawler, "fetch_rate_page", fetch_rate_page)
+
+
+def test_intraday_stores_every_sequence(site, db):
+    site.announcements = 3
+
+    result = crawler.handler({"currencies": "USD,JPY", "mode": "intraday"})
+
+    assert result["announcement_sequences"] == [1, 2, 3]
+    assert stored_sequences(db) == [1, 2, 3]
+    again = crawler.handler({"currencies": "USD,JPY", "mode": "intraday"})
+    assert again["message"] == "변경 없음"
+
+
+def test_failed_sequence_leaves_gap_for_next_run(site, db, monkeypatch):
+    site.announcements = 4
+    failing_sequences(monkeypatch, {2})
+
+    result = crawler.handler({"currencies": "USD", "mode": "intraday"})
+
+    # 2회차에서 멈추고 최종 고시(4회차)도 저장하지 않아야 다음 실행이 2회차부터 조회
+    assert result["announcement_sequences"] == [1]
+    assert stored_sequences(db) == [1]
+
+    monkeypatch.undo()
+    crawler.SITE_BREAKER.record_success()
+    result = crawler.handler({"currencies": "USD", "mode": "intraday"})
+
+    assert result["announcement_sequences"] == [2, 3, 4]
+    assert stored_sequences(db) == [1, 2, 3, 4]
+
+
+def test_sequence_falls_back_to_requested_sequence(site, db, monkeypatch):
+    site.announcements = 3
+    parse = crawler.parse_rate_page
+
+    def parse_rate_page(html, currencies, on_tree=None):
+        page = parse(html, currencies, on_tree)
+        if page.header.announcement_sequence == 3:
+            return page
+        # 회차 조회 응답에 회차 표시가 없는 경우
+        return page._replace(header=page.header._replace(announcement_sequence=None))
+
+    monkeypatch.setattr(crawler, "parse_rate_page", parse_rate_page)
+
+    crawler.handler({"currencies": "USD", "mode": "intraday"})
+
+    rows = {row["announcement_sequence"]: row["announcement_type"] for row in db.rows("exchange_rates")}
+    assert rows == {1: "FIRST", 2: "SEQUENCE", 3: "SEQUENCE"}
@@ -0,0 +1,105 @@
+"""환율 조회 캐시 (TTL, LRU 제거, 저장 후 무효화)"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import rate_lookup
+from crawler import create_table_if_not_exists, get_db_connection, insert_exchange_rates_batch
+from db_pool import release_connection
+from rate_lookup import RateLookup, TTLCache
+from rate_records import RateBatch
+
+TODAY = date.today()
+
+
+def rate_row(code, base_date, sequence, base_rate):
+    now = datetime(base_date.year, base_date.month, base_date.day, 9, sequence)
+    return (base_date, code, sequence, "SEQUENCE", base_rate * 1.0175, 1.75, base_rate * 0.9825, 1.75,
+            base_rate * 1.01, base_rate * 0.99, base_rate * 0.988, base_rate, 3.5, 1.0, now, now)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_lookup.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def store(db):
+    """환율을 저장하는 함수 (크롤러 저장 경로)"""
+    rate_lookup.clear_cache()
+    connection = get_db_connection()
+    create_table_if_not_exists(connection)
+
+    def store(*rows):
+        assert insert_exchange_rates_batch(connection, RateBatch(rows)) is not None
+
+    yield store
+    release_connection(connection)
+    rate_lookup.clear_cache()
+
+
+def test_cache_hit_expiry_and_lru_eviction(clock):
+    cache = TTLCache(ttl_sec=10, max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # 최근에 읽은 a는 남고 가장 오래 쓰지 않은 b가 제거
+    assert cache.get("b") is rate_lookup._MISSING and cache.get("a") == 1
+    clock.now += 10
+    assert cache.get("c") is rate_lookup._MISSING
+    assert cache.stats == {"hits": 2, "misses": 2, "expired": 1, "evictions": 1}
+
+
+def test_get_rate_caches_rows_and_missing_rows(store):
+    store(rate_row("USD", TODAY, 1, 1400.0), rate_row("USD", TODAY, 2, 1410.0))
+    lookup = RateLookup()
+
+    assert lookup.get_rate("usd", TODAY).base_rate == 1410.0
+    assert lookup.get_rate("USD", TODAY, 2).base_rate == 1410.0
+    assert lookup.get_rate("USD", TODAY, 1).base_rate == 1400.0
+    assert lookup.get_rate("EUR", TODAY) is None
+    assert lookup.get_rate("EUR", TODAY) is None
+
+    # 마지막 회차 조회가 회차 2도 함께 캐시하고, 없는 행도 캐시
+    assert lookup.stats["queries"] == 3
+
+
+def test_latest_rates_load_in_one_query_until_ttl(store, clock):
+    store(rate_row("USD", TODAY - timedelta(days=1), 1, 1400.0), rate_row("USD", TODAY, 1, 1420.0),
+          rate_row("JPY", TODAY - timedelta(days=1), 2, 950.0))
+    lookup = RateLookup(ttl_sec=30)
+
+    assert lookup.get_latest_rate("USD").base_rate == 1420.0
+    assert lookup.get_latest_rate("JPY").announcement_sequence == 2
+    assert lookup.get_latest_rate("EUR") is None
+    assert lookup.stats["bulk_refreshes"] == 1
+
+    clock.now += 30
+    lookup.get_latest_rate("USD")
+    assert lookup.stats["bulk_refreshes"] == 2
+
+
+def test_write_invalidates_cached_rates(store):
+    store(rate_row("USD", TODAY, 1, 1400.0))
+    assert rate_lookup.get_rate("USD", TODAY).base_rate == 1400.0
+    assert rate_lookup.get_rate("USD", TODAY, 1).base_rate == 1400.0
+    assert rate_lookup.get_latest_rate("USD").base_rate == 1400.0
+
+    # 정정과 새 회차 저장
+    store(rate_row("USD", TODAY, 1, 1401.0), rate_row("USD", TODAY, 2, 1405.0))
+
+    assert rate_lookup.get_rate("USD", TODAY, 1).base_rate == 1401.0
+    assert rate_lookup.get_rate("USD", TODAY).base_rate == 1405.0
+    assert rate_lookup.get_latest_rate("USD").base_rate == 1405.0
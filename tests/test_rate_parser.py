@@ -0,0 +1,44 @@
+"""환율 페이지 파서 (녹화 페이지 benchmarks/fixtures/rate_page.html)"""
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+from rate_parser import ALL_CURRENCIES, parse_rate_page
+
+with open(os.path.join(ROOT, 'benchmarks', 'fixtures', 'rate_page.html'), encoding='utf-8') as f:
+    RATE_PAGE = f.read()
+
+
+def test_on_tree_hook_runs_once_per_parse():
+    calls = []
+
+    page = parse_rate_page(RATE_PAGE, {"USD"}, on_tree=lambda: calls.append(1))
+
+    assert calls == [1]
+    assert [row.currency_code for row in page.rows] == ["USD"]
+
+
+def test_parser_does_not_import_profiler():
+    code = "import sys, rate_parser; sys.exit('memory_profile' in sys.modules)"
+
+    assert subprocess.run([sys.executable, "-c", code], cwd=ROOT).returncode == 0
+
+
+def test_parses_all_currencies_with_header():
+    page = parse_rate_page(RATE_PAGE, ALL_CURRENCIES)
+
+    assert page.header.base_date is not None and page.header.announcement_sequence == 1
+    assert len(page.rows) == len({row.currency_code for row in page.rows}) > 40
+
+
+def test_strainer_keeps_only_rate_areas():
+    from bs4 import BeautifulSoup
+
+    from rate_parser import PARSER_FEATURES, rate_page_strainer
+
+    html = ('<div><p class="notice">공지</p><p class="txtRateBox">헤더</p><table class="summary"></table>'
+            '<table class="tblBasic leftNone"><tr><td>USD</td></tr></table></div>')
+    soup = BeautifulSoup(html, PARSER_FEATURES, parse_only=rate_page_strainer())
+
+    assert [(tag.name, tag.get_text()) for tag in soup.find_all(['p', 'table'])] == [("p", "헤더"), ("table", "USD")]
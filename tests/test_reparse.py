@@ -0,0 +1,38 @@
+"""보관 원본 페이지 재파싱 (조회일 기준 저장)"""
+import os
+import re
+from datetime import date
+
+from conftest import ROOT
+from page_archive import archive_page
+from reparse import run_reparse
+
+with open(os.path.join(ROOT, 'benchmarks', 'fixtures', 'rate_page.html'), encoding='utf-8') as f:
+    RATE_PAGE = f.read()
+# 헤더(txtRateBox)의 기준일이 없는 보관 페이지
+UNDATED_PAGE = re.sub(r'<p class="txtRateBox">.*?</p>', '', RATE_PAGE, flags=re.S)
+
+
+def stored(db):
+    return sorted({(row["base_date"].isoformat(), row["announcement_sequence"]) for row in db.rows("exchange_rates")})
+
+
+def test_reparse_stores_archived_pages(db, tmp_path):
+    archive_page(RATE_PAGE, "http", {"USD", "JPY"}, "FIRST", inquiry_date=date(2026, 10, 16), archive_dir=str(tmp_path))
+    archive_page(UNDATED_PAGE, "http", {"USD"}, "SEQUENCE", 3, date(2020, 1, 2), archive_dir=str(tmp_path))
+
+    summary = run_reparse(str(tmp_path), workers=1)
+
+    assert summary["pages"] == 2 and summary["failed"] == [] and summary["rows"] == 3
+    # 기준일이 없는 페이지는 오늘이 아닌 조회일, 요청한 회차로 저장
+    assert stored(db) == [("2020-01-02", 3), ("2026-10-16", 1)]
+
+
+def test_reparse_filters_by_inquiry_date_and_dry_run(db, tmp_path):
+    archive_page(RATE_PAGE, "http", {"USD"}, "FIRST", inquiry_date=date(2026, 10, 16), archive_dir=str(tmp_path))
+    archive_page(UNDATED_PAGE, "http", {"USD"}, "FIRST", inquiry_date=date(2020, 1, 2), archive_dir=str(tmp_path))
+
+    summary = run_reparse(str(tmp_path), start_date=date(2026, 1, 1), workers=1, dry_run=True)
+
+    assert (summary["pages"], summary["rows"]) == (1, 1)
+    assert db.rows("exchange_rates") == []
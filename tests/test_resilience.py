@@ -0,0 +1,100 @@
+"""실행 예산과 은행 사이트 차단기"""
+import time
+
+import crawler
+from resilience import CIRCUIT_FAILURE_THRESHOLD, CircuitBreaker, start_deadline
+
+
+def test_site_failures_open_breaker(site):
+    site.error_rate = 1.0
+
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        assert crawler.fetch_page_source("USD") is None
+
+    assert crawler.SITE_BREAKER.state() == "open"
+    assert crawler.fetch_page_source("USD") is None
+    assert crawler.SITE_BREAKER.stats["rejected"] >= 1
+
+
+def test_retry_budget_abort_marks_partial_without_tripping_breaker(site):
+    site.error_rate = 1.0
+    # 첫 시도는 할 수 있지만 백오프 후 재시도할 시간은 없는 예산
+    deadline = start_deadline(crawler.HTTP_TIMEOUT - 2)
+
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        assert crawler.fetch_page_source("USD") is None
+
+    assert deadline.partial
+    assert crawler.SITE_BREAKER.failures == 0
+    assert crawler.SITE_BREAKER.state() == "closed"
+
+
+def test_site_failure_after_earlier_partial_still_counts(site):
+    # 앞선 단계가 시간 부족으로 중단되었어도 시간이 남은 조회의 실패는 사이트 장애로 집계
+    deadline = start_deadline(600)
+    crawler.mark_partial()
+    site.error_rate = 1.0
+
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        assert crawler.fetch_page_source("USD") is None
+
+    assert deadline.partial
+    assert crawler.SITE_BREAKER.state() == "open"
+
+
+def opened_breaker(cooldown_sec=0.05):
+    breaker = CircuitBreaker("test", threshold=2, cooldown_sec=cooldown_sec)
+    breaker.record_failure()
+    assert breaker.state() == "closed"
+    breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_at_threshold_and_rejects():
+    breaker = opened_breaker(cooldown_sec=60)
+
+    assert breaker.state() == "open"
+    assert not breaker.allow()
+    assert breaker.snapshot()["opened"] == 1
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_half_open_allows_single_trial():
+    breaker = opened_breaker()
+    time.sleep(0.06)
+
+    assert breaker.state() == "half_open"
+    assert breaker.allow()
+    # 시험 호출 결과가 나오기 전의 호출은 막음
+    assert not breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state() == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_reopens_breaker():
+    breaker = opened_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state() == "open"
+    assert not breaker.allow()
+    assert breaker.snapshot()["opened"] == 2
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_released_trial_lets_next_call_try():
+    breaker = opened_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.release()
+
+    assert breaker.state() == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
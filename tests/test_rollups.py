@@ -0,0 +1,128 @@
+"""일/주/월 롤업 (병합 계산, 정정, 재집계 범위 교체)"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import rollups
+from crawler import create_table_if_not_exists, get_db_connection, insert_exchange_rates_batch
+from db_pool import release_connection
+from rate_records import RATE_COLUMNS, RateBatch
+
+BASE_RATE = RATE_COLUMNS.index("base_rate")
+
+
+def rate_row(code, base_date, sequence, base_rate, cash_buy=None):
+    now = datetime(base_date.year, base_date.month, base_date.day, 9, sequence)
+    return (base_date, code, sequence, "SEQUENCE", base_rate * 1.0175 if cash_buy is None else cash_buy, 1.75,
+            base_rate * 0.9825, 1.75, base_rate * 1.01, base_rate * 0.99, base_rate * 0.988, base_rate, 3.5, 1.0,
+            now, now)
+
+
+def stored_rollups(db, period="day", field="base_rate"):
+    return {(row["currency_code"], row["period_start"]): row for row in db.rows("rate_rollups")
+            if row["period_type"] == period and row["rate_field"] == field}
+
+
+@pytest.fixture
+def connection(db, monkeypatch):
+    monkeypatch.setattr(rollups, "RATE_ROLLUPS", True)
+    connection = get_db_connection()
+    create_table_if_not_exists(connection)
+    yield connection
+    release_connection(connection)
+
+
+def test_aggregate_open_high_low_close_mean():
+    day = date(2026, 3, 2)
+    rates = RateBatch([rate_row("USD", day, 2, 1410.0), rate_row("USD", day, 1, 1400.0),
+                       rate_row("USD", day, 3, 1395.0), rate_row("USD", day + timedelta(days=1), 1, 1420.0)])
+
+    result = rollups.aggregate_rates(rates, ("base_rate",))
+
+    open_, high, low, close, total, count = result[("day", day, "USD", "base_rate")][:6]
+    assert (open_, high, low, close, count) == (1400.0, 1410.0, 1395.0, 1395.0, 3)
+    assert total / count == pytest.approx(1401.6667, abs=1e-4)
+    week = result[("week", day, "USD", "base_rate")]
+    assert week[:6] == [1400.0, 1420.0, 1395.0, 1420.0, 5625.0, 4]
+
+
+def test_aggregate_skips_zero_and_missing_values():
+    day = date(2026, 3, 2)
+    # 빈 셀(-)은 0.0으로 파싱됨
+    rates = RateBatch([rate_row("USD", day, 1, 1400.0, cash_buy=0.0), rate_row("USD", day, 2, 1410.0),
+                       rate_row("USD", day, 3, 1420.0, cash_buy=float('nan'))])
+
+    result = rollups.aggregate_rates(rates, ("cash_buy",), ("day",))
+
+    open_, high, low, close, total, count = result[("day", day, "USD", "cash_buy")][:6]
+    assert count == 1
+    assert open_ == high == low == close == total == round(1410.0 * 1.0175, 4)
+
+
+def test_incremental_rollups_match_rebuild(db, connection):
+    day = date(2026, 3, 30)
+    for offset in range(4):
+        for sequence in (1, 2):
+            insert_exchange_rates_batch(connection, RateBatch([
+                rate_row("USD", day + timedelta(days=offset), sequence, 1400.0 + offset * 3 - sequence),
+                rate_row("JPY", day + timedelta(days=offset), sequence, 950.0 + offset + sequence),
+            ]))
+    incremental = {key: dict(row) for key, row in db.tables["rate_rollups"].items()}
+
+    db.tables["rate_rollups"].clear()
+    read_connection = get_db_connection()
+    try:
+        rollups.rebuild_rollups(read_connection, connection)
+    finally:
+        release_connection(read_connection)
+
+    assert set(db.tables["rate_rollups"]) == set(incremental)
+    for key, row in db.tables["rate_rollups"].items():
+        for name in ("open_value", "high_value", "low_value", "close_value", "value_sum", "value_count"):
+            assert row[name] == pytest.approx(incremental[key][name]), (key, name)
+
+
+def test_correction_recomputes_and_drops_emptied_periods(db, connection):
+    day = date(2026, 3, 2)
+    insert_exchange_rates_batch(connection, RateBatch([rate_row("USD", day, 1, 1400.0),
+                                                       rate_row("USD", day, 2, 1380.0)]))
+    assert stored_rollups(db)[("USD", day)]["low_value"] == 1380.0
+
+    insert_exchange_rates_batch(connection, RateBatch([rate_row("USD", day, 2, 1405.0)]))
+    row = stored_rollups(db)[("USD", day)]
+    assert (row["low_value"], row["high_value"], row["value_count"]) == (1400.0, 1405.0, 2)
+
+    # 값이 모두 빈 셀로 정정되면 해당 기간의 롤업은 삭제
+    insert_exchange_rates_batch(connection, RateBatch([rate_row("USD", day, 1, 1400.0, cash_buy=0.0),
+                                                       rate_row("USD", day, 2, 1405.0, cash_buy=0.0)]))
+    assert ("USD", day) not in stored_rollups(db, field="cash_buy")
+    assert ("USD", day) in stored_rollups(db)
+
+
+def test_rebuild_replaces_rebuilt_range_only(db, connection):
+    day = date(2026, 3, 2)
+    insert_exchange_rates_batch(connection, RateBatch([rate_row("USD", day + timedelta(days=i), 1, 1400.0 + i)
+                                                       for i in range(3)]))
+    # 원본이 사라진 날짜와 범위 밖 날짜의 오래된 롤업
+    stale = [(day + timedelta(days=5), "USD"), (date(2026, 2, 27), "USD"), (day + timedelta(days=1), "JPY")]
+    for start, code in stale:
+        db.upsert("rate_rollups", {
+            "period_type": "day", "currency_code": code, "rate_field": "base_rate", "period_start": start,
+            "open_value": 1.0, "high_value": 1.0, "low_value": 1.0, "close_value": 1.0, "value_sum": 1.0,
+            "value_count": 1, "open_key": 0, "close_key": 0,
+        })
+
+    read_connection = get_db_connection()
+    try:
+        rollups.rebuild_rollups(read_connection, connection, {"USD"}, day, day + timedelta(days=6))
+    finally:
+        release_connection(read_connection)
+
+    days = stored_rollups(db)
+    assert ("USD", day + timedelta(days=5)) not in days
+    # 범위 밖 날짜와 다른 통화는 그대로
+    assert ("USD", date(2026, 2, 27)) in days and ("JPY", day + timedelta(days=1)) in days
+    assert [days[("USD", day + timedelta(days=i))]["close_value"] for i in range(3)] == [1400.0, 1401.0, 1402.0]
+    # 일부만 읽은 2월은 기록/삭제하지 않고, 온전한 3월 주는 다시 집계
+    assert ("USD", date(2026, 2, 1)) not in stored_rollups(db, "month")
+    assert stored_rollups(db, "week")[("USD", day)]["value_count"] == 3
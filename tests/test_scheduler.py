@@ -0,0 +1,66 @@
+"""조회 작업 스케줄러 (백필 엔진 위의 작업 목록 실행)"""
+import time
+from datetime import date
+
+import scheduler
+from backfill import RateLimiter, parse_date
+
+
+def test_build_jobs_fetches_all_currencies_once_per_date_and_sequence():
+    jobs = list(scheduler.build_jobs({"USD", "JPY"}, date(2026, 3, 2), date(2026, 3, 3), sequences=[1, 2]))
+
+    assert [job.label() for job in jobs] == [
+        "JPY,USD/2026-03-02/SEQUENCE:1", "JPY,USD/2026-03-02/SEQUENCE:2",
+        "JPY,USD/2026-03-03/SEQUENCE:1", "JPY,USD/2026-03-03/SEQUENCE:2",
+    ]
+
+
+def test_run_jobs_stores_every_currency_from_one_page(site, db):
+    jobs = scheduler.build_jobs({"USD", "JPY", "EUR"}, date(2026, 3, 2))
+
+    summary = scheduler.run_jobs(jobs, concurrency=2, rate_per_host=0)
+
+    assert (summary["jobs"], summary["fetched"], summary["rows"]) == (1, 1, 3)
+    assert sorted(row["currency_code"] for row in db.rows("exchange_rates")) == ["EUR", "JPY", "USD"]
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = RateLimiter(20)
+    started = time.monotonic()
+
+    for host in ("a", "b", "a", "b", "a"):
+        limiter.acquire(host)
+
+    # 호스트 a 3회 = 간격 2번(0.1초), 호스트 b는 a를 기다리지 않음
+    assert 0.09 <= time.monotonic() - started < 0.2
+
+
+def test_run_jobs_stores_requested_sequences(site, db):
+    site.announcements = 3
+    jobs = scheduler.build_jobs({"USD"}, date(2026, 3, 2), sequences=[1, 2, 3])
+
+    summary = scheduler.run_jobs(jobs, concurrency=2, rate_per_host=0)
+
+    assert summary["jobs"] == 3 and summary["fetched"] == 3 and summary["failed_jobs"] == []
+    assert not summary["aborted"]
+    assert sorted(row["announcement_sequence"] for row in db.rows("exchange_rates")) == [1, 2, 3]
+
+
+def test_run_jobs_reports_failed_and_expired_jobs(site, db):
+    site.error_rate = 1.0
+    jobs = scheduler.build_jobs("all", date(2026, 3, 2), date(2026, 3, 3))
+
+    summary = scheduler.run_jobs(jobs, concurrency=1, rate_per_host=0, max_retries=0)
+
+    assert summary["failed_jobs"] == ["all/2026-03-02/FIRST", "all/2026-03-03/FIRST"]
+
+    jobs = scheduler.build_jobs("all", date(2026, 3, 2), date(2026, 3, 31))
+    summary = scheduler.run_jobs(jobs, concurrency=1, rate_per_host=0, deadline_sec=0.001)
+
+    assert summary["jobs"] == 30
+    assert summary["expired"] + len(summary["failed_jobs"]) == 30
+
+
+def test_parse_date_accepts_text_and_dates():
+    assert parse_date("2026-03-02") == date(2026, 3, 2)
+    assert parse_date(date(2026, 3, 2)) == date(2026, 3, 2)
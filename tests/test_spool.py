@@ -0,0 +1,89 @@
+"""DB 장애 시 로컬 보관과 보관분 반영"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import crawler
+import spool
+from crawler import get_db_connection, write_rates
+from db_pool import release_connection
+from rate_parser import ALL_CURRENCIES
+from rate_records import RateBatch
+
+# 보관 고시회차는 최근 SPOOL_SEQUENCE_RETENTION_DAYS일만 유지하므로 오늘 기준일로 보관
+BASE_DATE = date.today()
+
+
+def rate_row(code, sequence, base_rate):
+    now = datetime(BASE_DATE.year, BASE_DATE.month, BASE_DATE.day, 9, sequence)
+    return (BASE_DATE, code, sequence, "SEQUENCE", base_rate * 1.0175, 1.75, base_rate * 0.9825, 1.75,
+            base_rate * 1.01, base_rate * 0.99, base_rate * 0.988, base_rate, 3.5, 1.0, now, now)
+
+
+@pytest.fixture
+def spool_path(tmp_path, monkeypatch):
+    spool.close_spool()
+    monkeypatch.setattr(spool, "SPOOL_PATH", str(tmp_path / "spool.db"))
+    yield spool.SPOOL_PATH
+    spool.close_spool()
+
+
+@pytest.fixture
+def connection(db):
+    connection = get_db_connection()
+    crawler.create_table_if_not_exists(connection)
+    yield connection
+    release_connection(connection)
+
+
+def test_flush_replays_latest_spooled_values(spool_path, db, connection):
+    assert spool.spool_rates(RateBatch([rate_row("USD", 1, 1400.0), rate_row("JPY", 1, 950.0)]))
+    # 같은 키를 다시 보관하면 기존 보관 행을 새 값으로 교체하고 보관 순서는 뒤로
+    assert spool.spool_rates(RateBatch([rate_row("USD", 1, 1405.0)]))
+    assert spool.spool_depth() == 2
+
+    result = spool.flush_spool(connection, write_rates, batch_rows=1)
+
+    assert result["ok"] and result["rows"] == 2 and result["batches"] == 2
+    assert spool.spool_depth() == 0
+    stored = {row["currency_code"]: row for row in db.rows("exchange_rates")}
+    assert stored["USD"]["base_rate"] == 1405.0 and stored["JPY"]["base_rate"] == 950.0
+    assert stored["USD"]["base_date"] == BASE_DATE
+
+
+def test_failed_flush_keeps_rows_for_next_call(spool_path, db, connection):
+    spool.spool_rates(RateBatch([rate_row("USD", 1, 1400.0)]))
+
+    result = spool.flush_spool(connection, lambda connection, rates: None)
+
+    assert not result["ok"] and result["rows"] == 0
+    assert spool.spool_depth() == 1
+    assert spool.flush_spool(connection, write_rates)["rows"] == 1
+    assert spool.spool_depth() == 0
+
+
+def test_spooled_sequence_outlives_flush(spool_path, db, connection):
+    spool.spool_rates(RateBatch([rate_row("USD", 3, 1400.0), rate_row("JPY", 2, 950.0)]))
+    spool.flush_spool(connection, write_rates)
+
+    assert spool.spooled_sequence(BASE_DATE, ALL_CURRENCIES) == 3
+    assert spool.spooled_sequence(BASE_DATE, {"USD", "JPY"}) == 2
+    assert spool.spooled_sequence(BASE_DATE, {"USD", "EUR"}) == 0
+    assert spool.spooled_sequence(BASE_DATE - timedelta(days=1), {"USD"}) == 0
+
+
+def test_handler_spools_on_db_failure_and_replays_next_run(site, db, spool_path, monkeypatch):
+    monkeypatch.setattr(crawler, "write_rates", lambda connection, rates: None)
+
+    result = crawler.handler({"currencies": "USD,JPY"})
+
+    assert (result["statusCode"], result["count"]) == (202, 2)
+    assert spool.spool_depth() == 2 and db.rows("exchange_rates") == []
+
+    monkeypatch.undo()
+    monkeypatch.setattr(spool, "SPOOL_PATH", spool_path)
+    result = crawler.handler({"currencies": "USD,JPY", "mode": "flush"})
+
+    assert result["statusCode"] == 200
+    assert spool.spool_depth() == 0
+    assert sorted(row["currency_code"] for row in db.rows("exchange_rates")) == ["JPY", "USD"]
@@ -0,0 +1,118 @@
+import os
+from typing import Optional
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.select import Select
+from selenium.webdriver.support.ui import WebDriverWait
+
+from http_fetcher import ANNOUNCEMENT_TYPE_CODES
+from resilience import phase_timeout
+
+# 단계별 최대 대기 시간(초) - 조건이 충족되는 즉시 다음 단계로 진행
+WAIT_TIMEOUTS = {
+    "page_load": float(os.environ.get('WAIT_TIMEOUT_PAGE_LOAD', '10')),
+    "iframe": float(os.environ.get('WAIT_TIMEOUT_IFRAME', '10')),
+    "form": float(os.environ.get('WAIT_TIMEOUT_FORM', '5')),
+    "refresh": float(os.environ.get('WAIT_TIMEOUT_REFRESH', '2')),
+    "rate_table": float(os.environ.get('WAIT_TIMEOUT_RATE_TABLE', '10')),
+}
+WAIT_POLL_INTERVAL = float(os.environ.get('WAIT_POLL_INTERVAL', '0.1'))
+
+# 고시 구분 라디오: 라벨로 감싼 경우 라벨, 아니면 input (값으로 찾아 폼 레이아웃 변경에 영향받지 않음)
+ANNOUNCEMENT_RADIO_XPATH = (
+    '//*[@id="inqFrm"]//label[input[@name="pbldDvCd" and @value="{code}"]]'
+    ' | //*[@id="inqFrm"]//input[@name="pbldDvCd" and @value="{code}"]'
+)
+
+
+def wait_for(driver, step: str) -> WebDriverWait:
+    """WAIT_TIMEOUTS의 단계별 제한 시간(실행 예산이 부족하면 남은 시간)으로 WebDriverWait 생성"""
+    return WebDriverWait(driver, phase_timeout("selenium", WAIT_TIMEOUTS[step]), poll_frequency=WAIT_POLL_INTERVAL)
+
+
+class rate_table_ready:
+    """tblBasic 행과 txtRateBox 고시일시가 표시되고, 선택한 통화 행이 있는지 확인하는 조건"""
+
+    def __init__(self, currency_value: str = ""):
+        self.currency_value = currency_value
+
+    def __call__(self, driver):
+        try:
+            if self.currency_value:
+                rows = driver.find_elements(
+                    By.XPATH,
+                    f"//table[contains(@class, 'tblBasic')]/tbody/tr[td[1][contains(., '{self.currency_value}')]]",
+                )
+            else:
+                rows = driver.find_elements(By.CSS_SELECTOR, "table.tblBasic tbody tr")
+            if not rows:
+                return False
+            rate_box = driver.find_elements(By.CSS_SELECTOR, "#searchContentDiv p.txtRateBox")
+            if not rate_box or '고시일시' not in rate_box[0].text:
+                return False
+            return rows
+        except StaleElementReferenceException:
+            return False
+
+
+def find_rate_table(driver):
+    """현재 표시 중인 tblBasic 요소 (없으면 None)"""
+    tables = driver.find_elements(By.CSS_SELECTOR, "table.tblBasic")
+    return tables[0] if tables else None
+
+
+def wait_for_rate_form(driver):
+    """조회 폼(curCd)이 나타날 때까지 대기"""
+    return wait_for(driver, "form").until(EC.presence_of_element_located((By.NAME, "curCd")))
+
+
+def wait_for_bank_iframe(driver):
+    """메인 페이지의 bankIframe이 준비되면 전환하고 조회 폼(curCd)이 나타날 때까지 대기"""
+    wait_for(driver, "iframe").until(EC.frame_to_be_available_and_switch_to_it((By.ID, "bankIframe")))
+    return wait_for_rate_form(driver)
+
+
+def wait_for_rate_table(driver, currency_value: str = "", previous_table=None) -> bool:
+    """조회 결과 테이블이 선택한 통화/고시로 갱신될 때까지 대기"""
+    if previous_table is not None:
+        try:
+            # 조회 결과로 기존 테이블이 교체되는 시점을 기다림
+            wait_for(driver, "refresh").until(EC.staleness_of(previous_table))
+        except TimeoutException:
+            # 결과가 같아 DOM이 교체되지 않은 경우 현재 테이블로 판단
+            pass
+    try:
+        wait_for(driver, "rate_table").until(rate_table_ready(currency_value))
+        return True
+    except TimeoutException:
+        return False
+
+
+def find_clickable(driver, xpath: str, step: str = "form") -> Optional[object]:
+    """클릭 가능한 요소가 될 때까지 대기 후 반환 (시간 초과 시 None)"""
+    try:
+        return wait_for(driver, step).until(EC.element_to_be_clickable((By.XPATH, xpath)))
+    except TimeoutException:
+        return None
+
+
+def select_announcement(driver, announcement_type: str = "FIRST", sequence: Optional[int] = None) -> bool:
+    """고시 구분 라디오(pbldDvCd)를 선택하고 회차 지정이면 고시회차(pbldSqn) 입력"""
+    code = ANNOUNCEMENT_TYPE_CODES.get(announcement_type, ANNOUNCEMENT_TYPE_CODES["FIRST"])
+    radio = find_clickable(driver, ANNOUNCEMENT_RADIO_XPATH.format(code=code))
+    if radio is None:
+        return False
+    try:
+        radio.click()
+        if sequence and announcement_type == "SEQUENCE":
+            field = driver.find_element(By.NAME, "pbldSqn")
+            if field.tag_name == 'select':
+                Select(field).select_by_value(str(sequence))
+            else:
+                field.clear()
+                field.send_keys(str(sequence))
+        return True
+    except Exception:
+        return False